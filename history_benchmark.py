@@ -0,0 +1,80 @@
+"""
+Benchmark of the time the main thread spends on storing history.
+
+A number of events is stored, each consisting of records similar in size to
+those created by editing a dense mesh (packed vertex positions and normals,
+plus a small dict of other property data). For every event, the time taken
+to pickle its records and hand them over to the history writer is measured.
+The benchmark fails if the time per event exceeds the given budget for more
+than one percent of the events (allowing for the occasional garbage
+collection or scheduling hiccup).
+
+Usage: python history_benchmark.py [event_count [budget_ms [vertex_count]]]
+
+"""
+
+from src.core.history import HistoryStore
+from panda3d.core import Filename
+from timeit import default_timer
+from array import array
+import tempfile
+import shutil
+import sys
+import os
+
+
+def run(event_count=1000, budget_ms=5., vertex_count=10000):
+
+    temp_dir = tempfile.mkdtemp()
+    path = Filename.from_os_specific(os.path.join(temp_dir, "hist.dat")).get_fullpath()
+    store = HistoryStore(path)
+    store.open(new=True)
+    positions = array("f", xrange(vertex_count * 3))
+    normals = array("f", [0., 0., 1.] * vertex_count)
+    times = []
+
+    try:
+
+        for i in xrange(event_count):
+
+            start_time = default_timer()
+            store.store("{}/geom/positions".format(i), positions)
+            store.store("{}/geom/normals".format(i), normals)
+            store.store("{}/geom/selection".format(i), {"vert": range(i % 100)})
+            store.flush()
+            times.append((default_timer() - start_time) * 1000.)
+
+        start_time = default_timer()
+        store.wait()
+        wait_time = (default_timer() - start_time) * 1000.
+        name = "{}/geom/positions".format(event_count - 1)
+        store.get_cache().clear()
+        assert store.load(name) == positions, "History record not read back correctly"
+
+    finally:
+
+        store.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    times.sort()
+    percentile = times[min(event_count - 1, int(event_count * .99))]
+    print("Events stored: {:d}".format(event_count))
+    print("Main thread time per event (ms): mean {:.3f}, 99th percentile {:.3f}, max {:.3f}".format(
+          sum(times) / event_count, percentile, times[-1]))
+    print("Time spent waiting for the writer afterwards (ms): {:.3f}".format(wait_time))
+
+    return percentile <= budget_ms
+
+
+if __name__ == "__main__":
+
+    args = sys.argv[1:]
+    event_count = int(args[0]) if args else 1000
+    budget_ms = float(args[1]) if len(args) > 1 else 5.
+    vertex_count = int(args[2]) if len(args) > 2 else 10000
+
+    if not run(event_count, budget_ms, vertex_count):
+        print("FAILED: main thread time per event exceeds the budget of {} ms".format(budget_ms))
+        sys.exit(1)
+
+    print("OK")
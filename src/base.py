@@ -2,6 +2,9 @@ from direct.showbase.DirectObject import DirectObject
 import logging
 import re
 import cPickle
+import heapq
+import json
+from timeit import default_timer
 
 logging.basicConfig(filename='p3ds.log', filemode='w',
                     format='%(asctime)s - %(levelname)s: %(message)s',
@@ -134,6 +137,10 @@ class ObjectName(object):
 def get_unique_name(requested_name, namelist, default_search_pattern="",
                     default_naming_pattern="", default_min_index=1):
 
+    if isinstance(namelist, NameRegistry) and not default_search_pattern:
+        return namelist.get_unique_name(requested_name, "", default_naming_pattern,
+                                        default_min_index)
+
     namestring = "\n".join(namelist)
     search_pattern = default_search_pattern
     naming_pattern = default_naming_pattern
@@ -186,6 +193,533 @@ def get_unique_name(requested_name, namelist, default_search_pattern="",
     return naming_pattern.format(max_index)
 
 
+# The following class keeps track of a collection of names, indexed by the
+# basename and the numeric index (either "<basename> <index>" or
+# "<basename> (<index>)") each of them ends with, such that unique names can be
+# generated without having to search through all of the names.
+# It can be used instead of a list of names when calling get_unique_name().
+class NameRegistry(object):
+
+    _index_pattern = re.compile(r"(.*?)(\s*)(\d*)$")
+    _paren_index_pattern = re.compile(r"(.*?)(\s*)(?:\((\d*)\))*$")
+
+    def __init__(self, names=()):
+
+        self._names = {}
+        # the (counted) numeric indices used with each (basename, index form) key
+        self._indices = {}
+        # the lowest index that might be available for a given key and minimum index
+        self._free_index_hints = {}
+
+        for name in names:
+            self.add(name)
+
+    def __contains__(self, name):
+
+        return name in self._names
+
+    def __iter__(self):
+
+        for name, count in self._names.iteritems():
+            for i in xrange(count):
+                yield name
+
+    def __len__(self):
+
+        return sum(self._names.itervalues())
+
+    def __add__(self, names):
+
+        registry = self.copy()
+
+        for name in names:
+            registry.add(name)
+
+        return registry
+
+    def copy(self):
+
+        registry = NameRegistry()
+        registry._names = self._names.copy()
+        registry._indices = dict((k, v.copy()) for k, v in self._indices.iteritems())
+
+        return registry
+
+    def __get_key(self, name):
+
+        basename, space, index_str = self._index_pattern.search(name).groups()
+
+        if index_str:
+            return (basename, ""), int(index_str)
+
+        basename, space, index_str = self._paren_index_pattern.search(name).groups()
+
+        if index_str:
+            return (basename, "()"), int(index_str)
+
+        return None, None
+
+    def add(self, name):
+
+        names = self._names
+        names[name] = names.get(name, 0) + 1
+        key, index = self.__get_key(name)
+
+        if key:
+            indices = self._indices.setdefault(key, {})
+            indices[index] = indices.get(index, 0) + 1
+
+    append = add
+
+    def remove(self, name):
+
+        names = self._names
+
+        if name not in names:
+            raise ValueError('Name "{}" is not registered.'.format(name))
+
+        if names[name] == 1:
+            del names[name]
+        else:
+            names[name] -= 1
+
+        key, index = self.__get_key(name)
+
+        if not key:
+            return
+
+        indices = self._indices[key]
+
+        if indices[index] == 1:
+
+            del indices[index]
+
+            if not indices:
+                del self._indices[key]
+
+            hints = self._free_index_hints.get(key)
+
+            if hints:
+                for min_index, hint in hints.items():
+                    if min_index <= index < hint:
+                        hints[min_index] = index
+
+        else:
+
+            indices[index] -= 1
+
+    def discard(self, name):
+
+        if name in self._names:
+            self.remove(name)
+
+    def __get_free_index(self, key, min_index):
+
+        indices = self._indices.get(key, {})
+        hints = self._free_index_hints.setdefault(key, {})
+        index = max(min_index, hints.get(min_index, min_index))
+
+        while index in indices:
+            index += 1
+
+        hints[min_index] = index
+
+        return index
+
+    def get_unique_name(self, requested_name, default_basename="", default_naming_pattern="",
+                        default_min_index=1):
+        """
+        Return a name based on the requested name that is not registered yet.
+        If no name is requested, the name will consist of the given default
+        basename followed by an index, formatted using the given default naming
+        pattern.
+
+        """
+
+        key = (default_basename, "")
+        naming_pattern = default_naming_pattern
+        min_index = default_min_index
+
+        if requested_name:
+
+            basename, space, index_str = self._index_pattern.search(requested_name).groups()
+
+            if index_str:
+
+                key = (basename, "")
+                min_index = int(index_str)
+                zero_padding = len(index_str) if index_str.startswith("0") else 0
+                naming_pattern = basename + space + "{:0" + str(zero_padding) + "d}"
+
+            else:
+
+                # also check for "(<index>)" at the end
+                pattern = self._paren_index_pattern
+                basename, space, index_str = pattern.search(requested_name).groups()
+
+                if index_str:
+
+                    key = (basename, "()")
+                    min_index = int(index_str)
+                    zero_padding = len(index_str) if index_str.startswith("0") else 0
+                    naming_pattern = basename + space + "({:0" + str(zero_padding) + "d})"
+
+                elif basename in self._names:
+
+                    key = (basename, "()")
+                    min_index = 2
+                    naming_pattern = basename + " ({:d})"
+
+                else:
+
+                    return basename
+
+        index = self.__get_free_index(key, min_index)
+        name = naming_pattern.format(index)
+
+        # a differently formatted name can still be identical to one that has an
+        # ambiguous index (e.g. "a12" is indexed as "a" 12, not as "a1" 2)
+        while name in self._names:
+            index = self.__get_free_index(key, index + 1)
+            name = naming_pattern.format(index)
+
+        return name
+
+
+# The following class implements a queue of tasks that are to be handled later,
+# each of them identified by a type, a sort value and an ID; adding a task with
+# the same type, sort value and ID as a pending task replaces the latter.
+# The tasks of each type are kept in a heap, ordered by sort value and then by
+# the order in which they were added; replaced and removed tasks are discarded
+# lazily, when they reach the top of their heap.
+# Optionally, the number of calls to, and the time spent in, the handled tasks
+# can be recorded per task ID, for all queues at once.
+class PendingTaskQueue(object):
+
+    _is_instrumented = False
+    _stats = {}
+
+    @classmethod
+    def enable_instrumentation(cls, enable=True):
+
+        cls._is_instrumented = enable
+
+    @classmethod
+    def is_instrumented(cls):
+
+        return cls._is_instrumented
+
+    @classmethod
+    def clear_instrumentation_data(cls):
+
+        cls._stats = {}
+
+    @classmethod
+    def get_instrumentation_report(cls):
+        """
+        Return a report of the recorded call counts and times of the handled tasks,
+        listed by decreasing total time.
+
+        """
+
+        lines = ["{:<40} {:>8} {:>12} {:>10}".format("task ID", "calls", "total (ms)", "avg (ms)")]
+        stats = sorted(cls._stats.iteritems(), key=lambda item: item[1][1], reverse=True)
+
+        for task_id, (call_count, total_time) in stats:
+            total_time *= 1000.
+            avg_time = total_time / call_count
+            lines.append("{:<40} {:>8d} {:>12.3f} {:>10.3f}".format(task_id, call_count,
+                         total_time, avg_time))
+
+        return "\n".join(lines)
+
+    @classmethod
+    def log_instrumentation_report(cls):
+
+        logging.info("Pending task statistics:\n" + cls.get_instrumentation_report())
+
+    def __init__(self):
+
+        self._heaps = {}
+        # maps (task_type, sort, task_id) keys to (index, task, stat_id) tuples
+        self._entries = {}
+        self._index = 0
+
+    def __len__(self):
+
+        return len(self._entries)
+
+    def add(self, task, task_id, task_type="", sort=0, stat_id=None):
+        """
+        Add a task, replacing any pending task with the same ID, type and sort value.
+        The stat_id is the ID under which instrumentation data is recorded for the
+        task; it defaults to task_id.
+
+        """
+
+        self._index += 1
+        key = (task_type, sort, task_id)
+        self._entries[key] = (self._index, task, task_id if stat_id is None else stat_id)
+        heap = self._heaps.setdefault(task_type, [])
+        heapq.heappush(heap, (sort, self._index, task_id))
+
+        if len(heap) > 2 * len(self._entries) + 64:
+            self.__compact(task_type)
+
+    def __compact(self, task_type):
+
+        entries = self._entries
+        heap = [(sort, entries[(t_type, sort, task_id)][0], task_id)
+                for t_type, sort, task_id in entries if t_type == task_type]
+        heapq.heapify(heap)
+        self._heaps[task_type] = heap
+
+    def remove(self, task_id, task_type="", sort=0):
+        """
+        Remove the task with the given ID, type and sort value and return it (or None
+        if not found).
+
+        """
+
+        entry = self._entries.pop((task_type, sort, task_id), None)
+
+        if entry:
+            return entry[1]
+
+    def clear(self, task_type=None):
+
+        if task_type is None:
+            self._heaps.clear()
+            self._entries.clear()
+            return
+
+        self._heaps.pop(task_type, None)
+        entries = self._entries
+
+        for key in [key for key in entries if key[0] == task_type]:
+            del entries[key]
+
+    def __get_top(self, task_type):
+
+        heap = self._heaps.get(task_type)
+
+        if not heap:
+            return
+
+        entries = self._entries
+
+        while heap:
+
+            sort, index, task_id = top = heap[0]
+            entry = entries.get((task_type, sort, task_id))
+
+            if entry and entry[0] == index:
+                return top
+
+            heapq.heappop(heap)
+
+    def handle_next(self, task_types=None, sort_by_type=False):
+        """
+        Remove the next task from the queue and call it; return this task, or None
+        if there are no pending tasks.
+
+        If a list of task_types is given, only those types of tasks are considered.
+
+        If sort_by_type is True, the next task is taken from the first type in the
+        list of task_types that has pending tasks, as the one with the lowest sort
+        value. Otherwise, it is the task with the lowest sort value of all types.
+
+        """
+
+        next_type = None
+        next_top = None
+
+        for task_type in (self._heaps.keys() if task_types is None else task_types):
+
+            top = self.__get_top(task_type)
+
+            if top is None:
+                continue
+
+            if sort_by_type:
+                next_type = task_type
+                break
+
+            if next_top is None or top < next_top:
+                next_type = task_type
+                next_top = top
+
+        if next_type is None:
+            return
+
+        sort, index, task_id = heapq.heappop(self._heaps[next_type])
+        index, task, stat_id = self._entries.pop((next_type, sort, task_id))
+
+        is_profiled = FrameProfiler.enabled
+
+        if is_profiled:
+            FrameProfiler.begin("pending {}".format(stat_id))
+
+        try:
+            if not self._is_instrumented:
+                task()
+            else:
+                start_time = default_timer()
+                task()
+                stats = self._stats.setdefault(stat_id, [0, 0.])
+                stats[0] += 1
+                stats[1] += default_timer() - start_time
+        finally:
+            if is_profiled:
+                FrameProfiler.end()
+
+        return task
+
+
+# The following class records named spans of time, e.g. around task handlers
+# and app updates, grouped per frame; the spans of the last completed frame
+# can be summarized, while all recorded spans can be exported as a file in the
+# Chrome trace event format (which can be viewed at chrome://tracing).
+# Instrumented code checks the "enabled" flag before recording anything, so
+# profiling costs next to nothing while disabled.
+class FrameProfiler(object):
+
+    enabled = False
+    # the maximum number of spans kept around for exporting
+    max_span_count = 500000
+    _span_stack = []
+    # (name, category, start time, end time) tuples
+    _spans = []
+    _frame_start_time = 0.
+    _frame_start_index = 0
+    _frame_time = 0.
+    _frame_totals = {}
+
+    @classmethod
+    def enable(cls, enable=True):
+
+        cls.enabled = enable
+        cls._span_stack = []
+
+        if enable:
+            cls._spans = []
+            cls._frame_start_time = default_timer()
+            cls._frame_start_index = 0
+            cls._frame_time = 0.
+            cls._frame_totals = {}
+
+    @classmethod
+    def begin(cls, name, category=""):
+
+        cls._span_stack.append((name, category, default_timer()))
+
+    @classmethod
+    def end(cls):
+
+        # the profiler could have been enabled while the span was open
+        if cls._span_stack:
+            name, category, start_time = cls._span_stack.pop()
+            cls._spans.append((name, category, start_time, default_timer()))
+
+    @classmethod
+    def wrap(cls, func, name, category=""):
+        """
+        Return a callable that records a span with the given name around each call
+        to the given function while profiling is enabled.
+
+        """
+
+        def wrapper(*args, **kwargs):
+
+            if not cls.enabled:
+                return func(*args, **kwargs)
+
+            cls.begin(name, category)
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                cls.end()
+
+        return wrapper
+
+    @classmethod
+    def wrap_task(cls, func, category="", task_name=None):
+        """
+        Return a wrapper around the given task function that records a span named
+        after the given task name (or after that function, if no name is given)
+        while profiling is enabled.
+        Task objects (as opposed to functions) are returned unchanged.
+
+        """
+
+        if not (callable(func) and hasattr(func, "__name__")):
+            return func
+
+        return cls.wrap(func, "task " + (task_name if task_name else func.__name__), category)
+
+    @classmethod
+    def start_frame(cls):
+        """
+        Mark the start of a new frame, summarizing the spans of the previous one.
+
+        """
+
+        cur_time = default_timer()
+        spans = cls._spans
+        totals = {}
+
+        for i in xrange(cls._frame_start_index, len(spans)):
+            name, category, start_time, end_time = spans[i]
+            totals[name] = totals.get(name, 0.) + end_time - start_time
+
+        cls._frame_totals = totals
+        cls._frame_time = cur_time - cls._frame_start_time
+        spans.append(("frame", "frame", cls._frame_start_time, cur_time))
+        cls._frame_start_time = cur_time
+
+        if len(spans) > cls.max_span_count * 1.1:
+            del spans[:len(spans) - cls.max_span_count]
+
+        cls._frame_start_index = len(spans)
+
+    @classmethod
+    def get_frame_summary(cls, max_entries=10):
+        """
+        Return a text summarizing the time taken by the previous frame and by the
+        spans that took the most time during that frame.
+
+        """
+
+        lines = ["frame: {:.2f} ms".format(cls._frame_time * 1000.)]
+        totals = sorted(cls._frame_totals.iteritems(), key=lambda item: item[1], reverse=True)
+
+        for name, total_time in totals[:max_entries]:
+            lines.append("{:8.2f} ms  {}".format(total_time * 1000., name))
+
+        return "\n".join(lines)
+
+    @classmethod
+    def export_trace(cls, filename):
+        """
+        Write all recorded spans to the file with the given name, in the Chrome
+        trace event format.
+
+        """
+
+        spans = cls._spans
+        ref_time = spans[0][2] if spans else 0.
+        events = []
+
+        for name, category, start_time, end_time in spans:
+            events.append({"name": name, "cat": category if category else "app", "ph": "X",
+                           "ts": (start_time - ref_time) * 1000000.,
+                           "dur": (end_time - start_time) * 1000000., "pid": 1, "tid": 1})
+
+        with open(filename, "w") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file)
+
+
 # The following class allows predefining specific bindings of events to their
 # handlers.
 # Multiple bindings can be set active at once, with the option to stop listening
@@ -1,5 +1,7 @@
 from .base import *
 from .base.base import _PendingTask
+import heapq
+import atexit
 from . import (cam, nav, view, history, scene, import_, export, create, select, transform,
                transf_center, coord_sys, geom, hierarchy, helpers, texmap, material)
 
@@ -14,12 +16,22 @@ class Core(object):
         self._listeners = {"main": KeyEventListener()}
         self._gizmo_root = NodePath("gizmo_root")
         self._long_process_id = ""
+        # long processes waiting for the running one to end, as a heap of
+        # (negated priority, queue index, process data) tuples
+        self._long_process_queue = []
+        self._long_process_index = 0
 
         def handle_pending_tasks(task):
 
+            if FrameProfiler.enabled:
+                FrameProfiler.begin("PendingTasks", "CORE")
+
             PendingTasks.handle(["object", "ui"], True)
             Mgr.update_remotely("pending_tasks")
 
+            if FrameProfiler.enabled:
+                FrameProfiler.end()
+
             return task.cont
 
         base = app_mgr.get_base()
@@ -40,6 +52,14 @@ class Core(object):
         GlobalData.set_default("alt_down", False)
         GlobalData.set_default("long_process_running", False)
         GlobalData.set_default("progress_steps", 0)
+        # the maximum time (in seconds) spent per frame on handling a long process
+        GlobalData.set_default("long_process_time_budget", .012)
+
+        if GlobalData["config"].get("pending_task_stats"):
+            # record how often and for how long each type of pending task is handled,
+            # and write a report to the log file when the application exits
+            PendingTaskQueue.enable_instrumentation()
+            atexit.register(PendingTaskQueue.log_instrumentation_report)
 
         def enter_suppressed_state(*args):
 
@@ -81,33 +101,89 @@ class Core(object):
         task_id = "remove_screenshot"
         PendingTasks.add(task, task_id, "ui", sort=100)
 
-    def do_gradually(self, process, process_id="", descr="", cancellable=False):
+    def do_gradually(self, process, process_id="", descr="", cancellable=False, priority=0):
 
         # The given process is expected to be a Python generator object;
         # it will be handled over multiple frames while a progressbar gives an indication
         # of when it will finish.
+        # If another long process is already running, the given process is queued
+        # and will be started when all processes with a higher priority, as well as
+        # those with the same priority that were queued earlier, have ended.
+        # The number of progress steps set up for the given process is kept along
+        # with it, so it cannot affect the progress rate of a process that is already
+        # running.
+
+        progress_steps = GlobalData["progress_steps"]
+        GlobalData["progress_steps"] = 0
 
         if GlobalData["long_process_running"]:
-            return False
+            self._long_process_index += 1
+            process_data = (process, process_id, descr, cancellable, progress_steps)
+            entry = (-priority, self._long_process_index, process_data)
+            heapq.heappush(self._long_process_queue, entry)
+            logging.debug('****** Long-running process queued: {}.'.format(process_id))
+            return True
+
+        self.__start_long_process(process, process_id, descr, cancellable, progress_steps)
+
+        return True
+
+    def __start_long_process(self, process, process_id, descr, cancellable, progress_steps):
+
+        # Each frame, the process is stepped through until the time budget for that
+        # frame would be exceeded by another step, as estimated from the (running
+        # average of the) time taken by previous steps, or until the process yields
+        # WAIT_FOR_NEXT_FRAME. At least one step is taken every frame.
+        # The process itself can change its number of progress steps while it runs,
+        # by setting GlobalData["progress_steps"].
 
         PendingTasks.suspend()
         GlobalData["long_process_running"] = True
         self._long_process_id = process_id
         task_mgr = self._app_mgr.get_base().task_mgr
+        clock = ClockObject.get_global_clock()
         Mgr.update_remotely("progress", "start", descr, cancellable)
+        step_data = {"cost": 0.}
+        GlobalData["progress_steps"] = progress_steps
 
         def progress(task):
 
-            progress_steps = GlobalData["progress_steps"]
+            start_time = prev_time = clock.get_real_time()
+            time_budget = GlobalData["long_process_time_budget"]
+            step_count = 0
+
+            while True:
+
+                progress_steps = GlobalData["progress_steps"]
+
+                if progress_steps:
+                    Mgr.update_remotely("progress", "set_rate", 1. / progress_steps)
+                    logging.debug('Long-running process to be handled in {:d} steps.'.format(progress_steps))
+                    GlobalData["progress_steps"] = 0
+
+                result = process.next()
+
+                if not result:
+                    break
 
-            if progress_steps:
-                Mgr.update_remotely("progress", "set_rate", 1. / progress_steps)
-                logging.debug('Long-running process to be handled over {:d} frames.'.format(progress_steps))
-                GlobalData["progress_steps"] = 0
+                if result is WAIT_FOR_NEXT_FRAME:
+                    if step_count:
+                        Mgr.update_remotely("progress", "advance", step_count)
+                    return task.cont
 
-            if process.next():
-                Mgr.update_remotely("progress", "advance")
-                return task.cont
+                step_count += 1
+                cur_time = clock.get_real_time()
+                step_cost = cur_time - prev_time
+                prev_time = cur_time
+                avg_cost = step_data["cost"]
+                step_data["cost"] = avg_cost = (avg_cost + step_cost) * .5 if avg_cost else step_cost
+
+                if cur_time - start_time + avg_cost > time_budget:
+                    Mgr.update_remotely("progress", "advance", step_count)
+                    return task.cont
+
+            if step_count:
+                Mgr.update_remotely("progress", "advance", step_count)
 
             self.__end_long_process()
             logging.debug('****** Long-running process finished: {}.'.format(process_id))
@@ -115,6 +191,14 @@ class Core(object):
         task_mgr.add(progress, "progress")
         logging.debug('****** Long-running process started: {}.'.format(process_id))
 
+    def __start_next_long_process(self):
+
+        if not self._long_process_queue:
+            return False
+
+        process_data = heapq.heappop(self._long_process_queue)[2]
+        self.__start_long_process(*process_data)
+
         return True
 
     def __end_long_process(self):
@@ -122,17 +206,46 @@ class Core(object):
         Mgr.update_remotely("progress", "end")
         GlobalData["long_process_running"] = False
         self._long_process_id = ""
-        PendingTasks.suspend(False)
+
+        if not self.__start_next_long_process():
+            PendingTasks.suspend(False)
+
+    def __discard_cancellable_long_processes(self):
+
+        # The handlers of a long process cancellation are notified of every cancellation
+        # and restore backups of shared state (e.g. object registries and picking color
+        # IDs) that queued processes may depend on, so the queued processes that could
+        # have been cancelled themselves are discarded along with the cancelled one.
+        # Processes that cannot be cancelled are kept, as they are expected to always
+        # run to completion.
+
+        queue = []
+
+        for entry in self._long_process_queue:
+
+            process, process_id, descr, cancellable, progress_steps = entry[2]
+
+            if cancellable:
+                process.close()
+                logging.debug('****** Queued long-running process discarded: {}.'.format(process_id))
+            else:
+                queue.append(entry)
+
+        heapq.heapify(queue)
+        self._long_process_queue = queue
 
     def __cancel_long_process(self, info=""):
 
         Mgr.update_remotely("screenshot", "remove")
         GlobalData["long_process_running"] = False
+        GlobalData["progress_steps"] = 0
         self._long_process_id = ""
         PendingTasks.suspend(False)
         PendingTasks.clear()
         Mgr.remove_task("progress")
         logging.debug('****** Long-running process cancelled.')
+        self.__discard_cancellable_long_processes()
+        self.__start_next_long_process()
 
     def suppress_mouse_events(self, suppress=True, interface_id=None):
 
@@ -1,6 +1,8 @@
-from ...base import logging, re, cPickle, GlobalData, ObjectName, get_unique_name, DirectObject
+from ...base import logging, re, cPickle, GlobalData, ObjectName, NameRegistry, get_unique_name, \
+                   PendingTaskQueue, FrameProfiler, DirectObject
 from panda3d.core import *
 from collections import OrderedDict
+from array import array as PyArray
 import weakref
 import sys
 import os
@@ -11,6 +13,11 @@ import datetime
 import copy
 
 GFX_PATH = "res/"
+# a long-process generator (see Core.do_gradually) can yield this value instead of
+# True while it is waiting for something to happen outside of the process itself, so
+# it is not stepped through any further during the current frame; such a step does
+# not count towards the progress of the process
+WAIT_FOR_NEXT_FRAME = "wait_for_next_frame"
 
 
 # All objects that need access to core variables should derive from the
@@ -177,8 +184,7 @@ class _PendingTask(object):
 
 class PendingTasks(object):
 
-    _tasks = {}
-    _sorted_tasks = []
+    _queue = PendingTaskQueue()
     _task_ids = {
         "object": (
             "set_geom_obj",
@@ -229,6 +235,8 @@ class PendingTasks(object):
     }
     _is_handling_tasks = False
     _is_suspended = False
+    # the arguments of a call to handle() that was interrupted by a gradual task
+    _interrupted_handling = None
 
     @classmethod
     def add(cls, task, task_id, task_type="", sort=None, id_prefix=None,
@@ -255,11 +263,13 @@ class PendingTasks(object):
             else:
                 sort = 0
 
+        stat_id = task_id
+
         if id_prefix:
             task_id = "{}_{}".format(id_prefix, task_id)
 
         pending_task = _PendingTask(task, gradual, process_id, descr, cancellable)
-        cls._tasks.setdefault(task_type, {}).setdefault(sort, {})[task_id] = pending_task
+        cls._queue.add(pending_task, task_id, task_type, sort, stat_id)
 
         return True
 
@@ -283,7 +293,7 @@ class PendingTasks(object):
             else:
                 sort = 0
 
-        return cls._tasks.get(task_type, {}).get(sort, {}).pop(task_id, None)
+        return cls._queue.remove(task_id, task_type, sort)
 
     @classmethod
     def clear(cls, task_type=None):
@@ -293,14 +303,23 @@ class PendingTasks(object):
 
         """
 
-        if cls._sorted_tasks:
-            cls._sorted_tasks = []
+        if cls._interrupted_handling:
+
+            # the remaining tasks of the interrupted handling are discarded
+            task_types = cls._interrupted_handling[0]
+            cls._interrupted_handling = None
             cls._is_handling_tasks = False
 
+            if task_types is None:
+                cls._queue.clear()
+            else:
+                for t_type in task_types:
+                    cls._queue.clear(t_type)
+
         if cls._is_handling_tasks:
             return
 
-        (cls._tasks if task_type is None else cls._tasks.get(task_type, {})).clear()
+        cls._queue.clear(task_type)
 
     @classmethod
     def handle(cls, task_types=None, sort_by_type=False):
@@ -320,48 +339,27 @@ class PendingTasks(object):
         if cls._is_suspended:
             return
 
-        if cls._is_handling_tasks and not cls._sorted_tasks:
+        if cls._is_handling_tasks and not cls._interrupted_handling:
             return
 
         cls._is_handling_tasks = True
 
-        if cls._sorted_tasks:
+        if cls._interrupted_handling:
+            task_types, sort_by_type = cls._interrupted_handling
+            cls._interrupted_handling = None
 
-            sorted_tasks = cls._sorted_tasks
-            cls._sorted_tasks = []
+        handle_next = cls._queue.handle_next
 
-        else:
+        while True:
 
-            if not cls._tasks:
-                cls._is_handling_tasks = False
-                return
-
-            pending_tasks = cls._tasks
+            task = handle_next(task_types, sort_by_type)
 
-            if task_types is None:
-                task_types = pending_tasks.keys()
-
-            if sort_by_type:
-                sorted_tasks = [task for task_type in task_types for sort, tasks in
-                                sorted(pending_tasks.pop(task_type, {}).iteritems())
-                                for task in tasks.itervalues()]
-            else:
-                sorted_tasks = [task for sort, tasks in sorted([i for task_type in task_types
-                                for i in pending_tasks.pop(task_type, {}).iteritems()])
-                                for task in tasks.itervalues()]
-
-        while sorted_tasks:
-
-            task = sorted_tasks.pop(0)
-            task()
+            if task is None:
+                break
 
             if task.gradual:
-
-                if not sorted_tasks:
-                    dummy_task = _PendingTask(lambda: None)
-                    sorted_tasks.append(dummy_task)
-
-                cls._sorted_tasks = sorted_tasks
+                # the remaining tasks will be handled after the long process ends
+                cls._interrupted_handling = (task_types, sort_by_type)
                 return
 
         cls._is_handling_tasks = False
@@ -444,6 +442,149 @@ def id_generator():
         yield (cur_time, index)
 
 
+# When raw index data is written directly into a GeomPrimitive (instead of
+# through add_vertex() calls), the index type needs to be chosen the same way
+# Panda3D would elevate it when adding the vertices one by one.
+def get_index_format(max_index):
+    """
+    Return a (Panda3D numeric type, array typecode) tuple suitable for storing
+    vertex indices up to max_index.
+
+    """
+
+    if max_index < 0xffff:
+        return Geom.NT_uint16, "H"
+
+    return Geom.NT_uint32, "I"
+
+
+# Tangent space generation works on the raw vertex data columns of the "full"
+# vertex format (see GeomDataObject), read into flat float arrays, so that no
+# GeomVertexReader/Writer calls or Vec3 operations are needed per vertex.
+def compute_tangent_space(pos_data, normal_data, uv_data, tri_rows, tan_data,
+                          flip_tangent=False, flip_bitangent=False):
+    """
+    Compute a tangent and a bitangent for each vertex row referenced by tri_rows,
+    a flat sequence of row indices (3 per triangle), and store them into tan_data,
+    an interleaved tangent-bitangent float array (6 values per row).
+    The positions and normals in pos_data and normal_data consist of 3 values per
+    row, the texture coordinates in uv_data of 2 values per row.
+    The tangent space of a vertex row is computed from the first triangle that
+    defines it properly; rows for which this fails retain their previous values.
+
+    """
+
+    epsilon = 1.e-010
+    tan_sign = -1. if flip_tangent else 1.
+    bitan_sign = -1. if flip_bitangent else 1.
+    processed_rows = bytearray(len(tan_data) // 6)
+    other_corners = ((1, 2), (0, 2), (0, 1))
+
+    for i in xrange(0, len(tri_rows), 3):
+
+        rows = (tri_rows[i], tri_rows[i + 1], tri_rows[i + 2])
+
+        for row, (j1, j2) in zip(rows, other_corners):
+
+            if processed_rows[row]:
+                continue
+
+            row1 = rows[j1]
+            row2 = rows[j2]
+
+            k = row * 3
+            x = pos_data[k]
+            y = pos_data[k + 1]
+            z = pos_data[k + 2]
+            k1 = row1 * 3
+            x1 = pos_data[k1] - x
+            y1 = pos_data[k1 + 1] - y
+            z1 = pos_data[k1 + 2] - z
+            k2 = row2 * 3
+            x2 = pos_data[k2] - x
+            y2 = pos_data[k2 + 1] - y
+            z2 = pos_data[k2 + 2] - z
+
+            k = row * 2
+            u = uv_data[k]
+            v = uv_data[k + 1]
+            k1 = row1 * 2
+            u1 = uv_data[k1] - u
+            v1 = uv_data[k1 + 1] - v
+            k2 = row2 * 2
+            u2 = uv_data[k2] - u
+            v2 = uv_data[k2 + 1] - v
+
+            # compute a vector pointing in the +U direction, in texture space
+            # and in world space
+
+            if abs(v1) < epsilon:
+                u_local = u1
+                tx, ty, tz = x1, y1, z1
+            elif abs(v2) < epsilon:
+                u_local = u2
+                tx, ty, tz = x2, y2, z2
+            else:
+                # the texture-space vector (u_local, 0.) will point in the -/+U
+                # direction; the same combination of the corresponding world-space
+                # vectors will therefore yield a world-space U-vector
+                scale = v1 / v2
+                u_local = u1 - u2 * scale
+                tx, ty, tz = x1 - x2 * scale, y1 - y2 * scale, z1 - z2 * scale
+
+            if u_local < 0.:
+                tx, ty, tz = -tx, -ty, -tz
+
+            # compute a vector pointing in the +V direction, in texture space
+            # and in world space
+
+            if abs(u1) < epsilon:
+                v_local = v1
+                bx, by, bz = x1, y1, z1
+            elif abs(u2) < epsilon:
+                v_local = v2
+                bx, by, bz = x2, y2, z2
+            else:
+                scale = u1 / u2
+                v_local = v1 - v2 * scale
+                bx, by, bz = x1 - x2 * scale, y1 - y2 * scale, z1 - z2 * scale
+
+            if v_local < 0.:
+                bx, by, bz = -bx, -by, -bz
+
+            # the tangent and bitangent vectors are the world-space U- and V-vectors
+            # projected onto the tangent plane
+
+            k = row * 3
+            nx = normal_data[k]
+            ny = normal_data[k + 1]
+            nz = normal_data[k + 2]
+            n_len_sq = nx * nx + ny * ny + nz * nz
+
+            if n_len_sq:
+                dot = (tx * nx + ty * ny + tz * nz) / n_len_sq
+                tx, ty, tz = tx - nx * dot, ty - ny * dot, tz - nz * dot
+                dot = (bx * nx + by * ny + bz * nz) / n_len_sq
+                bx, by, bz = bx - nx * dot, by - ny * dot, bz - nz * dot
+
+            t_len_sq = tx * tx + ty * ty + tz * tz
+
+            if not t_len_sq:
+                continue
+
+            b_len_sq = bx * bx + by * by + bz * bz
+
+            if not b_len_sq:
+                continue
+
+            t_scale = tan_sign / t_len_sq ** .5
+            b_scale = bitan_sign / b_len_sq ** .5
+            k = row * 6
+            tan_data[k:k + 6] = PyArray("f", (tx * t_scale, ty * t_scale, tz * t_scale,
+                                              bx * b_scale, by * b_scale, bz * b_scale))
+            processed_rows[row] = 1
+
+
 def get_color_vec(color_id, alpha):
 
     r = (color_id >> 16)
@@ -474,6 +615,47 @@ class PosObj(object):
         return self._pos[index]
 
 
+def _unpack_vector_map(vec_type, id_data, coord_data):
+
+    ids = PyArray("i")
+    ids.fromstring(id_data)
+    coords = PyArray("f")
+    coords.fromstring(coord_data)
+    vec_map = VectorMap(vec_type)
+
+    if ids:
+        n = len(coords) // len(ids)
+        vecs = (vec_type(*coords[i:i+n]) for i in xrange(0, len(coords), n))
+        vec_map.update(zip(ids, vecs))
+
+    return vec_map
+
+
+# The following dict subclass maps integer IDs (e.g. of vertices) to vectors
+# (e.g. positions or normals). When pickled, its contents are packed into two
+# contiguous arrays - one with the IDs, the other with the vector components -
+# instead of pickling each vector as a separate object, so history data for
+# large numbers of subobjects takes up a lot less space.
+class VectorMap(dict):
+
+    def __init__(self, vec_type=Point3, *args, **kwargs):
+
+        dict.__init__(self, *args, **kwargs)
+
+        self._vec_type = vec_type
+
+    def __reduce__(self):
+
+        ids = PyArray("i")
+        coords = PyArray("f")
+
+        for obj_id, vec in self.iteritems():
+            ids.append(obj_id)
+            coords.extend(vec)
+
+        return _unpack_vector_map, (self._vec_type, ids.tostring(), coords.tostring())
+
+
 # The following class is a wrapper around Vec3 that uses operator overloading
 # to allow concise vector math
 class V3D(Vec3):
@@ -131,16 +131,26 @@ class CoreManager(object):
 
         task_handler = cls._task_handlers.get(task_id, cls._defaults["task_handler"])
 
-        return task_handler(*args, **kwargs)
+        if not FrameProfiler.enabled:
+            return task_handler(*args, **kwargs)
+
+        FrameProfiler.begin("do " + task_id, "CORE")
+
+        try:
+            return task_handler(*args, **kwargs)
+        finally:
+            FrameProfiler.end()
 
     @classmethod
-    def do_gradually(cls, process, process_id="", descr="", cancellable=False):
+    def do_gradually(cls, process, process_id="", descr="", cancellable=False, priority=0):
         """
         Spread a time-consuming process over multiple frames.
+        If another such process is already running, the given process is queued and
+        started later, in order of decreasing priority.
 
         """
 
-        return cls._core.do_gradually(process, process_id, descr, cancellable)
+        return cls._core.do_gradually(process, process_id, descr, cancellable, priority)
 
     @classmethod
     def expose(cls, data_id, retriever):
@@ -300,6 +310,16 @@ class CoreManager(object):
 
         """
 
+        # profiling spans are named after the task, since many unrelated task
+        # functions share the same name
+        if isinstance(args[0], (int, float)):
+            delay, func = args[:2]
+            task_name = args[2] if len(args) > 2 else kwargs.get("name")
+            args = (delay, FrameProfiler.wrap_task(func, "CORE", task_name)) + args[2:]
+        else:
+            task_name = args[1] if len(args) > 1 else kwargs.get("name")
+            args = (FrameProfiler.wrap_task(args[0], "CORE", task_name),) + args[1:]
+
         if isinstance(args[0], (int, float)) or "delayTime" in kwargs:
             cls._task_mgr.do_method_later(*args, **kwargs)
         else:
@@ -309,7 +329,9 @@ class CoreManager(object):
     def do_next_frame(cls, *args, **kwargs):
         """ Convenience wrapper around ShowBase.task_mgr.do_method_later(0., ...) """
 
-        cls._task_mgr.do_method_later(0., *args, **kwargs)
+        task_name = args[1] if len(args) > 1 else kwargs.get("name")
+        func = FrameProfiler.wrap_task(args[0], "CORE", task_name)
+        cls._task_mgr.do_method_later(0., func, *args[1:], **kwargs)
 
     @classmethod
     def remove_task(cls, task_name):
@@ -23,7 +23,7 @@ class GeneralObjectManager(BaseObject):
         GlobalData.set_default("temp_toplevel", False)
         GlobalData.set_default("render_mode", "shaded")
         GlobalData.set_default("next_obj_color", None)
-        GlobalData.set_default("obj_names", [], lambda l: l[:])
+        GlobalData.set_default("obj_names", NameRegistry(), lambda r: r.copy())
 
         Mgr.expose("object_root", lambda: self._obj_root)
         Mgr.expose("object_type_data", lambda: self._obj_types)
@@ -184,10 +184,9 @@ class GeneralObjectManager(BaseObject):
 
         custom_name = Mgr.get("custom_{}_name".format(obj_type))
         namelist = GlobalData["obj_names"]
-        search_pattern = r"^{}\s*(\d+)$".format(obj_type)
         naming_pattern = obj_type + " {:04d}"
 
-        return get_unique_name(custom_name, namelist, search_pattern, naming_pattern)
+        return namelist.get_unique_name(custom_name, obj_type, naming_pattern)
 
     @staticmethod
     def __set_object_name(name):
@@ -197,7 +196,7 @@ class GeneralObjectManager(BaseObject):
         if not selection:
             return
 
-        namelist = [obj.get_name() for obj in Mgr.get("objects") if obj not in selection]
+        namelist = NameRegistry(obj.get_name() for obj in Mgr.get("objects") if obj not in selection)
         old_names = [obj.get_name() for obj in selection]
         new_names = []
         objs_by_name = dict(zip(old_names, selection))
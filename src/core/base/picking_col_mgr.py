@@ -1,5 +1,9 @@
 from .mgr import CoreManager as Mgr
 from .base import logging, PendingTasks
+from bisect import bisect_left, bisect_right
+
+
+MAX_PICKING_COLOR_ID = 2 ** 24 - 1
 
 
 # All managers of pickable objects should derive from the following class
@@ -14,6 +18,8 @@ class PickingColorIDManager(object):
         Mgr.accept("reset_picking_col_id_ranges", cls.__reset_id_ranges)
         Mgr.accept("update_picking_col_id_ranges", cls.__update_id_ranges)
         Mgr.accept("create_id_range_backups", cls.__create_id_range_backups)
+        Mgr.accept("get_next_picking_color_ids", cls.__get_next_picking_color_ids)
+        Mgr.accept("recover_picking_color_ids", cls.__recover_picking_color_ids)
         Mgr.add_notification_handler("long_process_cancelled", "picking_col_mgr",
                                      cls.__restore_id_range_backups)
 
@@ -34,6 +40,16 @@ class PickingColorIDManager(object):
         task_id = "update_picking_col_id_ranges"
         PendingTasks.add(task, task_id, "object")
 
+    @classmethod
+    def __get_next_picking_color_ids(cls, obj_type, count):
+
+        return cls._mgrs[obj_type].get_next_picking_color_ids(count)
+
+    @classmethod
+    def __recover_picking_color_ids(cls, obj_type, color_ids):
+
+        cls._mgrs[obj_type].recover_picking_color_ids(color_ids)
+
     @classmethod
     def __create_id_range_backups(cls):
 
@@ -76,78 +92,155 @@ class PickingColorIDManager(object):
 
         self._mgrs[self.get_managed_object_type()] = self
 
-        self._id_ranges = [(1, 2 ** 24)]
+        # the available IDs are stored as sorted, disjoint, non-adjacent ranges,
+        # with the (inclusive) starts and (exclusive) ends of those ranges kept in
+        # separate lists, such that ranges can be looked up through bisection
+        self._id_range_starts = [1]
+        self._id_range_ends = [MAX_PICKING_COLOR_ID + 1]
         self._ids_to_recover = set()
         self._ids_to_discard = set()
         self._id_ranges_backup = None
 
     def reset(self):
 
-        self._id_ranges = [(1, 2 ** 24)]
+        self._id_range_starts = [1]
+        self._id_range_ends = [MAX_PICKING_COLOR_ID + 1]
         self._ids_to_recover = set()
         self._ids_to_discard = set()
         self._id_ranges_backup = None
         logging.debug('"{}" picking color IDs reset.'.format(self.get_managed_object_type()))
 
     def __get_ranges(self, lst):
+        """ Return the (start, end) ranges spanned by the IDs in the given sorted list """
 
-        l = iter([None] + lst[:-1])
-        m = iter(lst[1:] + [None])
+        ranges = []
 
-        return zip(filter(lambda i: i - 1 != next(l), lst),
-                   map(lambda i: i + 1, filter(lambda i: i + 1 != next(m), lst)))
+        if not lst:
+            return ranges
 
-    def __merge_ranges(self, range_list, next_range):
+        range_start = range_end = lst[0]
 
-        if range_list:
+        for i in lst:
+            if i > range_end:
+                ranges.append((range_start, range_end))
+                range_start = i
+            range_end = i + 1
 
-            prev_range_start, prev_range_end = range_list[-1]
-            next_range_start, next_range_end = next_range
+        ranges.append((range_start, range_end))
 
-            if prev_range_end == next_range_start:
-                del range_list[-1]
-                range_list.append((prev_range_start, next_range_end))
-                return range_list
+        return ranges
 
-        return range_list + [next_range]
+    def __get_id_ranges(self):
 
-    def __split_ranges(self, range_list, next_range):
+        return zip(self._id_range_starts, self._id_range_ends)
 
-        if range_list:
+    def __add_range(self, range_start, range_end):
+        """ Make the IDs in the given range available, merging it with existing ranges """
 
-            prev_range_start, prev_range_end = range_list[-1]
-            next_range_start, next_range_end = next_range
+        starts = self._id_range_starts
+        ends = self._id_range_ends
+        # the ranges from index i up to (but not including) index j either overlap
+        # or are adjacent to the given range
+        i = bisect_left(ends, range_start)
+        j = bisect_right(starts, range_end)
 
-            if next_range_start < prev_range_end:
+        if i < j:
+            range_start = min(range_start, starts[i])
+            range_end = max(range_end, ends[j - 1])
 
-                del range_list[-1]
+        starts[i:j] = [range_start]
+        ends[i:j] = [range_end]
 
-                if prev_range_start != next_range_start:
-                    range_list.append((prev_range_start, next_range_start))
+    def __remove_range(self, range_start, range_end):
+        """ Make the IDs in the given range unavailable, splitting existing ranges """
 
-                if prev_range_end != next_range_end:
-                    min_range_end = min(prev_range_end, next_range_end)
-                    max_range_end = max(prev_range_end, next_range_end)
-                    range_list.append((min_range_end, max_range_end))
+        starts = self._id_range_starts
+        ends = self._id_range_ends
+        # the ranges from index i up to (but not including) index j overlap the
+        # given range
+        i = bisect_right(ends, range_start)
+        j = bisect_left(starts, range_end)
 
-                return range_list
+        if i >= j:
+            return
 
-        return range_list + [next_range]
+        new_starts = []
+        new_ends = []
+
+        if starts[i] < range_start:
+            new_starts.append(starts[i])
+            new_ends.append(range_start)
+
+        if ends[j - 1] > range_end:
+            new_starts.append(range_end)
+            new_ends.append(ends[j - 1])
+
+        starts[i:j] = new_starts
+        ends[i:j] = new_ends
 
     def get_next_picking_color_id(self):
 
-        if not self._id_ranges:
+        starts = self._id_range_starts
+
+        if not starts:
             # TODO: pop up a message notifying the user that no more objects
             # can be created
             return
 
-        next_id, range_end = self._id_ranges.pop(0)
+        next_id = starts[0]
 
-        if next_id + 1 < range_end:
-            self._id_ranges.insert(0, (next_id + 1, range_end))
+        if next_id + 1 < self._id_range_ends[0]:
+            starts[0] = next_id + 1
+        else:
+            del starts[0]
+            del self._id_range_ends[0]
 
         return next_id
 
+    def get_next_picking_color_ids(self, count):
+        """
+        Return a list of the given number of unused picking color IDs, taken from as
+        few contiguous blocks as possible.
+        Return None if not enough IDs are available.
+
+        """
+
+        starts = self._id_range_starts
+        ends = self._id_range_ends
+        available = 0
+        range_count = 0
+
+        for range_start, range_end in zip(starts, ends):
+
+            if available >= count:
+                break
+
+            available += range_end - range_start
+            range_count += 1
+
+        if available < count:
+            # TODO: pop up a message notifying the user that no more objects
+            # can be created
+            return
+
+        ids = []
+        next_id = 0
+
+        for index in xrange(range_count):
+            range_start = starts[index]
+            next_id = min(ends[index], range_start + count - len(ids))
+            ids.extend(xrange(range_start, next_id))
+
+        # the last of the used ranges might not be depleted
+        if range_count and next_id < ends[range_count - 1]:
+            range_count -= 1
+            starts[range_count] = next_id
+
+        del starts[:range_count]
+        del ends[:range_count]
+
+        return ids
+
     def recover_picking_color_id(self, color_id):
         """ Recover the given color ID, so it can be used again """
 
@@ -174,7 +267,6 @@ class PickingColorIDManager(object):
 
     def update_picking_color_id_ranges(self):
 
-        id_ranges = self._id_ranges
         set_to_recover = self._ids_to_recover
         set_to_discard = self._ids_to_discard
 
@@ -182,7 +274,7 @@ class PickingColorIDManager(object):
             return
 
         logging.debug('++++++ Updating {} picking color IDs ranges, starting with:\n{}'.format(
-                      self.get_managed_object_type(), id_ranges))
+                      self.get_managed_object_type(), self.__get_id_ranges()))
 
         # remove the common IDs from both sets
         if not set_to_recover.isdisjoint(set_to_discard):
@@ -191,23 +283,26 @@ class PickingColorIDManager(object):
             set_to_recover -= set_to_discard
 
         if set_to_recover:
+
             id_ranges_to_recover = self.__get_ranges(sorted(set_to_recover))
             logging.debug('++++++ Recovering {} picking color IDs:\n{}'.format(
                           self.get_managed_object_type(), id_ranges_to_recover))
-            id_ranges += id_ranges_to_recover
-            id_ranges.sort()
-            id_ranges[:] = reduce(self.__merge_ranges, id_ranges[:], [])
+
+            for range_start, range_end in id_ranges_to_recover:
+                self.__add_range(range_start, range_end)
 
         if set_to_discard:
+
             id_ranges_to_discard = self.__get_ranges(sorted(set_to_discard))
             logging.debug('++++++ Discarding {} picking color IDs:\n{}'.format(
                           self.get_managed_object_type(), id_ranges_to_discard))
-            id_ranges += id_ranges_to_discard
-            id_ranges.sort()
-            id_ranges[:] = reduce(self.__split_ranges, id_ranges[:], [])
+
+            for range_start, range_end in id_ranges_to_discard:
+                self.__remove_range(range_start, range_end)
 
         self._ids_to_recover = set()
         self._ids_to_discard = set()
+        id_ranges = self.__get_id_ranges()
         logging.debug('++++++ New {} picking color ID ranges:\n{}'.format(
                       self.get_managed_object_type(), id_ranges))
 
@@ -227,15 +322,15 @@ class PickingColorIDManager(object):
 
     def create_id_ranges_backup(self):
 
-        self._id_ranges_backup = self._id_ranges[:]
+        self._id_ranges_backup = (self._id_range_starts[:], self._id_range_ends[:])
         logging.debug('"{}" picking color IDs backup created:\n{}'.format(self.get_managed_object_type(),
-                      self._id_ranges_backup))
+                      self.__get_id_ranges()))
 
     def restore_id_ranges_backup(self):
 
-        self._id_ranges = self._id_ranges_backup
+        self._id_range_starts, self._id_range_ends = self._id_ranges_backup
         logging.debug('"{}" picking color IDs backup restored:\n{}'.format(self.get_managed_object_type(),
-                      self._id_ranges))
+                      self.__get_id_ranges()))
 
     def remove_id_ranges_backup(self):
 
@@ -334,9 +334,11 @@ class PickingCamera(BaseObject):
         mask_ortho = BitMask32.bit(16)
         self._masks = {"persp": mask_persp, "ortho": mask_ortho, "all": mask_persp | mask_ortho}
         self._pixel_color = VBase4()
+        self._region_cam = None
 
         Mgr.expose("picking_masks", lambda: self._masks)
         Mgr.expose("pixel_under_mouse", lambda: VBase4(self._pixel_color))
+        Mgr.expose("region_color_ids", self.__get_region_color_ids)
         Mgr.add_app_updater("viewport", self.__update_frustum)
 
     def setup(self):
@@ -382,10 +384,30 @@ class PickingCamera(BaseObject):
         state = state_np.get_state()
         node.set_initial_state(state)
 
+        # Create an inactive camera to render the picking pass for a screen region
+        # (used for region selection); it gets its own buffer whenever needed.
+
+        region_cam_node = Camera("region_picking_cam")
+        region_cam_node.set_initial_state(state)
+        region_cam_node.set_active(False)
+        self._region_cam = self._np.get_parent().attach_new_node(region_cam_node)
+
         # For rendering BasicGeoms as pickable geometry
         node.set_tag_state_key("picking_color")
-        Mgr.accept("set_basic_geom_picking_color", node.set_tag_state)
-        Mgr.accept("clear_basic_geom_picking_color", node.clear_tag_state)
+        region_cam_node.set_tag_state_key("picking_color")
+
+        def set_tag_state(tag_state, state):
+
+            node.set_tag_state(tag_state, state)
+            region_cam_node.set_tag_state(tag_state, state)
+
+        def clear_tag_state(tag_state):
+
+            node.clear_tag_state(tag_state)
+            region_cam_node.clear_tag_state(tag_state)
+
+        Mgr.accept("set_basic_geom_picking_color", set_tag_state)
+        Mgr.accept("clear_basic_geom_picking_color", clear_tag_state)
 
         # Create a secondary camera and DisplayRegion to render gizmos on top of the
         # 3D scene.
@@ -493,6 +515,104 @@ class PickingCamera(BaseObject):
 
         return task.cont
 
+    def __get_region_color_ids(self, start_pos, end_pos):
+        """
+        Render the picking pass for the screen rectangle with the given opposite
+        corners (in normalized viewport coordinates) and return a dict mapping
+        pickable type IDs (picking color alpha values) to sets of the picking color
+        IDs found inside that rectangle.
+
+        The color buffer is only read once; all of its unique pixel values are
+        obtained in a single step by treating the RAM image as an array of packed
+        32-bit RGBA values.
+
+        """
+
+        w, h = GlobalData["viewport"]["size_aux" if GlobalData["viewport"][2] == "main" else "size"]
+        x1, x2 = sorted((max(-1., min(1., start_pos[0])), max(-1., min(1., end_pos[0]))))
+        y1, y2 = sorted((max(-1., min(1., start_pos[1])), max(-1., min(1., end_pos[1]))))
+        region_w = int(round((x2 - x1) * .5 * w))
+        region_h = int(round((y2 - y1) * .5 * h))
+
+        if region_w < 1 or region_h < 1:
+            return {}
+
+        # Narrow the frustum of (a copy of) the main camera lens down to the region
+
+        lens = self.cam.lens.make_copy()
+        film_w, film_h = lens.get_film_size()
+        film_offset = lens.get_film_offset()
+        focal_length = lens.get_focal_length()
+        lens.set_film_size(film_w * (x2 - x1) * .5, film_h * (y2 - y1) * .5)
+        lens.set_film_offset(film_offset[0] + film_w * (x1 + x2) * .25,
+                             film_offset[1] + film_h * (y1 + y2) * .25)
+
+        if self.cam.lens_type == "persp":
+            lens.set_focal_length(focal_length)
+
+        base = Mgr.get("base")
+        tex = Texture("region_picking_texture")
+        props = FrameBufferProperties()
+        props.set_rgba_bits(8, 8, 8, 8)
+        props.set_depth_bits(16)
+        bfr = base.win.make_texture_buffer("region_picking_buffer",
+                                           region_w, region_h,
+                                           tex,
+                                           to_ram=True,
+                                           fbp=props)
+
+        if not bfr:
+            return {}
+
+        bfr.set_clear_color(VBase4())
+        bfr.set_clear_color_active(True)
+        bfr.set_sort(-100)
+        dr = bfr.make_display_region()
+        cam_node = self._region_cam.node()
+        cam_node.set_lens(lens)
+        cam_node.set_camera_mask(self._masks[self.cam.lens_type])
+        cam_node.set_active(True)
+        dr.set_camera(self._region_cam)
+        Mgr.render_frame()
+
+        if not tex.has_ram_image():
+            Mgr.render_frame()
+
+        cam_node.set_active(False)
+        data = tex.get_ram_image_as("RGBA").get_data()
+        component_width = tex.get_component_width()
+        base.graphicsEngine.remove_window(bfr)
+
+        if component_width == 2:
+            # keep only the most significant byte of each 16-bit color component
+            data = data[1::2] if sys.byteorder == "little" else data[::2]
+
+        pixels = PyArray("I")
+
+        if pixels.itemsize != 4:
+            pixels = PyArray("L")
+
+        pixels.fromstring(data)
+
+        if sys.byteorder == "big":
+            pixels.byteswap()
+
+        color_ids = {}
+
+        for pixel in set(pixels):
+
+            # each pixel value is packed as (alpha, blue, green, red) from most to
+            # least significant byte
+            # (pickable type IDs start at 0, so only the clear color is skipped,
+            # through its zero color ID)
+            obj_type_id = pixel >> 24
+            color_id = (pixel & 0xff) << 16 | (pixel & 0xff00) | (pixel >> 16 & 0xff)
+
+            if color_id:
+                color_ids.setdefault(obj_type_id, set()).add(color_id)
+
+        return color_ids
+
 
 # the following camera is used to detect temporary geometry created to allow subobject
 # picking via polygon
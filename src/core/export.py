@@ -1,70 +1,114 @@
 from .base import *
 
 
+# when welding duplicate vertices for export, vertex attribute values are rounded
+# to multiples of this amount before being compared
+WELD_EPSILON = 1.e-6
+# the number of vertex rows or triangles formatted at once when exporting to OBJ
+OBJ_BLOCK_ROW_COUNT = 10000
+OBJ_WRITE_BUFFER_SIZE = 1 << 20
+
+
 class ExportManager(BaseObject):
 
     def __init__(self):
 
+        # The vertex data of exported models is converted to the following format,
+        # whose columns are in the same order as the corresponding OBJ statements.
+        array_format = GeomVertexArrayFormat()
+        array_format.add_column(InternalName.make("vertex"), 3, Geom.NT_float32, Geom.C_point)
+        array_format.add_column(InternalName.make("texcoord"), 2, Geom.NT_float32, Geom.C_texcoord)
+        array_format.add_column(InternalName.make("normal"), 3, Geom.NT_float32, Geom.C_normal)
+        self._obj_vertex_format = GeomVertexFormat.register_format(array_format)
+
         Mgr.add_app_updater("export", self.__export)
 
-    def __merge_duplicate_vertices(self, geom_data_obj):
+    def __merge_duplicate_vertices(self, geom_data_obj, epsilon=WELD_EPSILON):
+        """
+        Return a NodePath with a copy of the geometry of the given geom data object,
+        in which vertices that are merged together and whose positions, normals,
+        UVs and colors are equal (after rounding them to multiples of the given
+        epsilon, if it is greater than zero) are welded.
+
+        """
 
         verts = geom_data_obj.get_subobjects("vert")
         merged_verts = set(geom_data_obj.get_merged_vertex(v_id) for v_id in verts)
-        rows = range(len(verts))
-        dupes = {}
+        row_count = len(verts)
+        # the row each row is merged into
+        dest_rows = range(row_count)
+
+        if epsilon > 0.:
+            quantize = lambda values: tuple(int(round(x / epsilon)) for x in values)
+        else:
+            quantize = tuple
 
         for merged_vert in merged_verts:
 
-            verts1 = [verts[v_id] for v_id in merged_vert]
-            verts2 = verts1[:]
+            if len(merged_vert) == 1:
+                continue
 
-            for vert1 in verts1:
+            rows_by_key = {}
 
-                pos1 = vert1.get_pos()
-                normal1 = vert1.get_normal()
-                uv1 = vert1.get_uvs()
-                col1 = vert1.get_color()
-                row1 = vert1.get_row_index()
+            for v_id in merged_vert:
 
-                if row1 in dupes:
-                    continue
+                vert = verts[v_id]
+                uvs = vert.get_uvs()
+                key = (quantize(vert.get_pos()), quantize(vert.get_normal()),
+                       tuple((uv_set_id, quantize(uvs[uv_set_id])) for uv_set_id in sorted(uvs)),
+                       quantize(vert.get_color()))
+                row = vert.get_row_index()
 
-                for vert2 in verts2[:]:
+                if key in rows_by_key:
+                    dest_rows[row] = rows_by_key[key]
+                else:
+                    rows_by_key[key] = row
 
-                    if vert2 is vert1:
-                        continue
+        # build the remap array from old to new row indices
+        rows = [r for r in xrange(row_count) if dest_rows[r] == r]
+        new_rows = PyArray("i", [0]) * row_count
 
-                    pos2 = vert2.get_pos()
-                    normal2 = vert2.get_normal()
-                    uv2 = vert2.get_uvs()
-                    col2 = vert2.get_color()
+        for new_row, row in enumerate(rows):
+            new_rows[row] = new_row
 
-                    if pos2 == pos1 and normal2 == normal1 and uv2 == uv1 and col2 == col1:
-                        row2 = vert2.get_row_index()
-                        rows.remove(row2)
-                        verts2.remove(vert2)
-                        dupes[row2] = row1
+        remap = PyArray("i", (new_rows[row] for row in dest_rows))
 
         geom = geom_data_obj.get_toplevel_node().get_geom(0)
         vdata_src = geom.get_vertex_data()
         vdata_dest = GeomVertexData(vdata_src)
-        vdata_dest.unclean_set_num_rows(len(rows))
-        thread = Thread.get_main_thread()
 
-        for row_dest, row_src in enumerate(rows):
-            vdata_dest.copy_row_from(row_dest, vdata_src, row_src, thread)
+        if len(rows) < row_count:
+
+            # copy the data of the remaining rows, one contiguous block at a time
 
-        for row2, row1 in dupes.items():
-            dupes[row2] = rows.index(row1)
+            blocks = []
+            block_start = block_end = rows[0]
+
+            for row in rows:
+                if row > block_end:
+                    blocks.append((block_start, block_end))
+                    block_start = row
+                block_end = row + 1
+
+            blocks.append((block_start, block_end))
+            vdata_dest.unclean_set_num_rows(len(rows))
+
+            for i in xrange(vdata_src.get_num_arrays()):
+                array_src = vdata_src.get_array(i)
+                stride = array_src.get_array_format().get_stride()
+                data = array_src.get_handle().get_data()
+                data = "".join([data[start * stride:end * stride] for start, end in blocks])
+                vdata_dest.modify_array(i).modify_handle().set_data(data)
 
         prim_src = geom.get_primitive(0)
+        typecodes = {Geom.NT_uint8: "B", Geom.NT_uint16: "H", Geom.NT_uint32: "I"}
+        typecode_src = typecodes[prim_src.get_index_type()]
+        rows_src = PyArray(typecode_src, prim_src.get_vertices().get_handle().get_data())
+        index_type, typecode = get_index_format(len(rows) - 1)
+        rows_dest = PyArray(typecode, (remap[row] for row in rows_src))
         prim_dest = GeomTriangles(Geom.UH_static)
-        rows_src = prim_src.get_vertex_list()
-        rows_dest = [dupes[row] if row in dupes else rows.index(row) for row in rows_src]
-
-        for indices in (rows_dest[i:i + 3] for i in xrange(0, len(rows_dest), 3)):
-            prim_dest.add_vertices(*indices)
+        prim_dest.set_index_type(index_type)
+        prim_dest.modify_vertices().modify_handle().set_data(rows_dest.tostring())
 
         geom_dest = Geom(vdata_dest)
         geom_dest.add_primitive(prim_dest)
@@ -455,6 +499,54 @@ class ExportManager(BaseObject):
         root.write_bam_file(fullpath)
         root.remove_node()
 
+    def __write_obj_vertices(self, obj_file, vertex_data):
+        """
+        Write the positions, UVs and normals of the given vertex data to the given
+        OBJ file.
+
+        Instead of reading the vertex data row by row, it is converted to a single
+        array with the needed columns in the order in which they are written; the
+        raw data of this array is then formatted one block of rows at a time, by
+        applying a repeated line template to all of the values in that block at
+        once.
+
+        """
+
+        vertex_data = vertex_data.convert_to(self._obj_vertex_format)
+        data = PyArray("f", vertex_data.get_array(0).get_handle().get_data())
+        template = "v %.6f %.6f %.6f\nvt %.6f %.6f\nvn %.6f %.6f %.6f\n"
+        block_size = OBJ_BLOCK_ROW_COUNT * 8
+
+        for i in xrange(0, len(data), block_size):
+            block = data[i:i + block_size]
+            obj_file.write(template * (len(block) // 8) % tuple(block))
+
+    def __write_obj_faces(self, obj_file, prim, row_offset):
+        """
+        Write the triangles of the given primitive to the given OBJ file, with
+        vertex indices offset by the given amount.
+
+        """
+
+        if prim.is_indexed():
+            typecodes = {Geom.NT_uint8: "B", Geom.NT_uint16: "H", Geom.NT_uint32: "I"}
+            indices = PyArray(typecodes[prim.get_index_type()],
+                              prim.get_vertices().get_handle().get_data())
+        else:
+            indices = prim.get_vertex_list()
+
+        template = "f %d/%d/%d %d/%d/%d %d/%d/%d\n"
+        block_size = OBJ_BLOCK_ROW_COUNT * 3
+
+        for i in xrange(0, len(indices), block_size):
+            block = PyArray("i", (j + row_offset for j in indices[i:i + block_size]))
+            # each vertex index is used for the position, UVs and normal alike
+            face_data = PyArray("i", [0]) * (len(block) * 3)
+            face_data[0::3] = block
+            face_data[1::3] = block
+            face_data[2::3] = block
+            obj_file.write(template * (len(block) // 3) % tuple(face_data))
+
     def __export_to_obj(self, filename):
 
         objs = list(set(obj.get_root() for obj in Mgr.get("selection_top")))
@@ -467,7 +559,7 @@ class ExportManager(BaseObject):
         row_offset = 1
         namelist = []
 
-        with open(filename, "w") as obj_file:
+        with open(filename, "w", OBJ_WRITE_BUFFER_SIZE) as obj_file:
 
             obj_file.write("# Created with Panda3D Studio\n\n")
             fname = os.path.basename(filename)
@@ -560,29 +652,14 @@ class ExportManager(BaseObject):
                     origin = obj.get_origin()
                     mat = origin.get_net_transform().get_mat() * convert_mat
                     vertex_data.transform_vertices(mat)
-                    pos_reader = GeomVertexReader(vertex_data, "vertex")
-                    uv_reader = GeomVertexReader(vertex_data, "texcoord")
-                    normal_reader = GeomVertexReader(vertex_data, "normal")
                     row_count = vertex_data.get_num_rows()
-
-                    for i in xrange(row_count):
-                        x, y, z = pos_reader.get_data3f()
-                        u, v = uv_reader.get_data2f()
-                        xn, yn, zn = normal_reader.get_data3f()
-                        obj_file.write("v {:.6f} {:.6f} {:.6f}\n".format(x, y, z))
-                        obj_file.write("vt {:.6f} {:.6f}\n".format(u, v))
-                        obj_file.write("vn {:.6f} {:.6f} {:.6f}\n".format(xn, yn, zn))
+                    self.__write_obj_vertices(obj_file, vertex_data)
 
                     obj_file.write("\nusemtl {}\n".format(material_alias))
                     obj_file.write("# {}\n".format(material_name))
 
-                    index_list = node.node().get_geom(0).get_primitive(0).get_vertex_list()
-                    index_count = len(index_list)
-
-                    for i in xrange(0, index_count, 3):
-                        i1, i2, i3 = [j + row_offset for j in index_list[i:i+3]]
-                        indices = (i1, i1, i1, i2, i2, i2, i3, i3, i3)
-                        obj_file.write("f {:d}/{:d}/{:d} {:d}/{:d}/{:d} {:d}/{:d}/{:d}\n".format(*indices))
+                    prim = node.node().get_geom(0).get_primitive(0)
+                    self.__write_obj_faces(obj_file, prim, row_offset)
 
                     row_offset += row_count
 
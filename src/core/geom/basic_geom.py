@@ -241,115 +241,26 @@ class BasicGeom(BaseObject):
 
     def update_tangent_space(self, flip_tangent, flip_bitangent):
 
-        vertex_data = self._geom.node().modify_geom(0).modify_vertex_data()
-        vert_indices = self._geom.node().get_geom(0).get_primitive(0).get_vertex_list()
-
-        pos_reader = GeomVertexReader(vertex_data, "vertex")
-        normal_reader = GeomVertexReader(vertex_data, "normal")
-        uv_reader = GeomVertexReader(vertex_data, "texcoord")
-        tan_writer = GeomVertexWriter(vertex_data, "tangent")
-        bitan_writer = GeomVertexWriter(vertex_data, "binormal")
-        vert_handlers = (pos_reader, normal_reader, uv_reader, tan_writer, bitan_writer)
-
-        processed_rows = []
-        epsilon = 1.e-010
-
-        for rows in (vert_indices[i:i + 3] for i in xrange(0, len(vert_indices), 3)):
-
-            for row in rows:
-
-                if row in processed_rows:
-                    continue
-
-                other_rows = list(rows)
-                other_rows.remove(row)
-                row1, row2 = other_rows
-
-                for handler in vert_handlers:
-                    handler.set_row(row)
-
-                pos = pos_reader.get_data3f()
-                normal = normal_reader.get_data3f()
-                uv = uv_reader.get_data2f()
-
-                pos_reader.set_row(row1)
-                pos1 = pos_reader.get_data3f()
-                pos_reader.set_row(row2)
-                pos2 = pos_reader.get_data3f()
-                pos_vec1 = pos1 - pos
-                pos_vec2 = pos2 - pos
-
-                uv_reader.set_row(row1)
-                uv1 = uv_reader.get_data2f()
-                uv_reader.set_row(row2)
-                uv2 = uv_reader.get_data2f()
-                uv_vec1 = uv1 - uv
-                uv_vec2 = uv2 - uv
-
-                # compute a vector pointing in the +U direction, in texture space
-                # and in world space
-
-                if abs(uv_vec1.y) < epsilon:
-                    u_vec_local = uv_vec1
-                    u_vec_world = Vec3(pos_vec1)
-                elif abs(uv_vec2.y) < epsilon:
-                    u_vec_local = uv_vec2
-                    u_vec_world = Vec3(pos_vec2)
-                else:
-                    scale = (uv_vec1.y / uv_vec2.y)
-                    u_vec_local = uv_vec1 - uv_vec2 * scale
-                    # u_vec_local.y will be 0 and thus point in the -/+U direction;
-                    # replacing the texture-space vectors with the corresponding
-                    # world-space vectors will therefore yield a world-space U-vector
-                    u_vec_world = pos_vec1 - pos_vec2 * scale
-
-                if u_vec_local.x < 0.:
-                    u_vec_world *= -1.
-
-                # compute a vector pointing in the +V direction, in texture space
-                # and in world space
-
-                if abs(uv_vec1.x) < epsilon:
-                    v_vec_local = uv_vec1
-                    v_vec_world = Vec3(pos_vec1)
-                elif abs(uv_vec2.x) < epsilon:
-                    v_vec_local = uv_vec2
-                    v_vec_world = Vec3(pos_vec2)
-                else:
-                    scale = (uv_vec1.x / uv_vec2.x)
-                    v_vec_local = uv_vec1 - uv_vec2 * scale
-                    # v_vec_local.x will be 0 and thus point in the -/+V direction;
-                    # replacing the texture-space vectors with the corresponding
-                    # world-space vectors will therefore yield a world-space V-vector
-                    v_vec_world = pos_vec1 - pos_vec2 * scale
-
-                if v_vec_local.y < 0.:
-                    v_vec_world *= -1.
-
-                tangent_plane = Plane(normal, Point3())
-                # the tangent vector is the world-space U-vector projected onto
-                # the tangent plane
-                tangent = Vec3(tangent_plane.project(Point3(u_vec_world)))
-
-                if not tangent.normalize():
-                    continue
-
-                # the bitangent vector is the world-space V-vector projected onto
-                # the tangent plane
-                bitangent = Vec3(tangent_plane.project(Point3(v_vec_world)))
-
-                if not bitangent.normalize():
-                    continue
-
-                if flip_tangent:
-                    tangent *= -1.
-
-                if flip_bitangent:
-                    bitangent *= -1.
+        geom = self._geom.node().modify_geom(0)
+        vertex_data = geom.modify_vertex_data()
+        prim = geom.get_primitive(0)
 
-                tan_writer.set_data3f(tangent)
-                bitan_writer.set_data3f(bitangent)
-                processed_rows.append(row)
+        if prim.is_indexed():
+            typecodes = {Geom.NT_uint8: "B", Geom.NT_uint16: "H", Geom.NT_uint32: "I"}
+            typecode = typecodes[prim.get_index_type()]
+            tri_rows = PyArray(typecode, prim.get_vertices().get_handle().get_data())
+        else:
+            start = prim.get_first_vertex()
+            tri_rows = xrange(start, start + prim.get_num_vertices())
+
+        pos_data = PyArray("f", vertex_data.get_array(0).get_handle().get_data())
+        normal_data = PyArray("f", vertex_data.get_array(2).get_handle().get_data())
+        uv_data = PyArray("f", vertex_data.get_array(4).get_handle().get_data())
+        tan_array = vertex_data.modify_array(3)
+        tan_data = PyArray("f", tan_array.get_handle().get_data())
+        compute_tangent_space(pos_data, normal_data, uv_data, tri_rows, tan_data,
+                              flip_tangent, flip_bitangent)
+        tan_array.modify_handle().set_data(tan_data.tostring())
 
         self._is_tangent_space_initialized = True
 
@@ -622,11 +533,13 @@ class BasicGeom(BaseObject):
     def __define_geom_data(self):
 
         geom_data = []
-        coords = []
+        # coordinates are hashed, so identical vertex positions can be merged
+        # without comparing each new position with all of the previous ones
+        coords = {}
 
         geom = self._geom.node().get_geom(0)
         vertex_data = geom.get_vertex_data()
-        vertex_format = vertex_data.get_format()
+        row_count = vertex_data.get_num_rows()
         pos_reader = GeomVertexReader(vertex_data, "vertex")
         normal_reader = GeomVertexReader(vertex_data, "normal")
         col_reader = GeomVertexReader(vertex_data, "color")
@@ -639,9 +552,32 @@ class BasicGeom(BaseObject):
             uv_reader = GeomVertexReader(vertex_data, uv_set_list[uv_set_id])
             uv_readers.append(uv_reader)
 
+        f = -1. if self.has_flipped_normals() else 1.
+
+        # Read the vertex attribute columns in one sequential pass, instead of
+        # seeking to the row of every triangle vertex separately.
+
+        positions = []
+
+        for i in xrange(row_count):
+
+            pos = pos_reader.get_data3f()
+            pos_key = tuple(pos)
+
+            if pos_key in coords:
+                pos = coords[pos_key]
+            else:
+                pos = coords[pos_key] = Point3(pos)
+
+            positions.append(pos)
+
+        normals = [Vec3(normal_reader.get_data3f()) * f for i in xrange(row_count)]
+        colors = [tuple(col_reader.get_data4f()) for i in xrange(row_count)]
+        uv_columns = [[tuple(reader.get_data2f()) for i in xrange(row_count)]
+                      for reader in uv_readers]
+
         extracted_data = {}
         indices = geom.get_primitive(0).get_vertex_list()
-        f = -1. if self.has_flipped_normals() else 1.
 
         if self.has_flipped_normals():
             indices = indices[::-1]
@@ -659,30 +595,11 @@ class BasicGeom(BaseObject):
                 else:
 
                     vert_data = {}
-                    pos_reader.set_row(row)
-                    pos = Point3(pos_reader.get_data3f())
-
-                    for crd in coords:
-                        if pos == crd:
-                            pos = crd
-                            break
-                    else:
-                        coords.append(pos)
-
-                    vert_data["pos"] = pos
-                    normal_reader.set_row(row)
-                    vert_data["normal"] = Vec3(normal_reader.get_data3f()) * f
-                    col_reader.set_row(row)
-                    vert_data["color"] = tuple(x for x in col_reader.get_data4f())
-
-                    uvs = {}
-
-                    for uv_set_id, uv_reader in enumerate(uv_readers):
-                        uv_reader.set_row(row)
-                        u, v = uv_reader.get_data2f()
-                        uvs[uv_set_id] = (u, v)
-
-                    vert_data["uvs"] = uvs
+                    vert_data["pos"] = positions[row]
+                    vert_data["normal"] = normals[row]
+                    vert_data["color"] = colors[row]
+                    vert_data["uvs"] = dict((uv_set_id, uv_column[row])
+                                            for uv_set_id, uv_column in enumerate(uv_columns))
                     extracted_data[row] = vert_data
 
                 tri_data.append(vert_data)
@@ -186,7 +186,7 @@ class GeomHistoryBase(BaseObject):
 
             obj_id = self.get_toplevel_object().get_id()
             subobj_lvl = GlobalData["active_obj_level"]
-            pos_data = {"prev": {}, "pos": {}}
+            pos_data = {"prev": {}, "pos": VectorMap(Point3)}
             extra_data = {unique_prop_ids["vert_pos__extra__"]: pos_data}
             cur_time_id = Mgr.do("get_history_time")
             prev_time_ids = Mgr.do("load_last_from_history", obj_id, unique_prop_id)
@@ -369,7 +369,7 @@ class GeomHistoryBase(BaseObject):
         elif unique_prop_id == unique_prop_ids["normals"]:
 
             obj_id = self.get_toplevel_object().get_id()
-            normal_data = {"prev": {}, "normals": {}}
+            normal_data = {"prev": {}, "normals": VectorMap(Vec3)}
             extra_data = {unique_prop_ids["normal__extra__"]: normal_data}
             cur_time_id = Mgr.do("get_history_time")
             prev_time_ids = Mgr.do("load_last_from_history", obj_id, unique_prop_id)
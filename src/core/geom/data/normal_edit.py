@@ -533,41 +533,35 @@ class NormalEditBase(BaseObject):
 
         self._normal_change = verts_to_process
 
+        # The normals are summed per shared normal, after which they are written
+        # into a copy of the normal column, which replaces the original column
+        # data in one go.
+
         vertex_data_top = self._toplvl_node.modify_geom(0).modify_vertex_data()
-        normal_writer = GeomVertexWriter(vertex_data_top, "normal")
+        normal_array = vertex_data_top.modify_array(2)
+        normal_data = PyArray("f", normal_array.get_handle().get_data())
         sign = -1. if self._owner.has_flipped_normals() else 1.
-        shared_normals_tmp = [s.difference(locked_normals) for s in
-                              set(shared_normals[v_id] for v_id in verts_to_process)]
 
-        for shared_normal in shared_normals_tmp:
+        for shared_normal in set(shared_normals[v_id] for v_id in verts_to_process):
 
-            vert = verts[shared_normal.pop()]
-            verts_to_update = [vert]
-            poly = polys[vert.get_polygon_id()]
-            normal = Vec3(poly.get_normal())
+            verts_to_update = [verts[v_id] for v_id in shared_normal if v_id not in locked_normals]
+            normal = Vec3()
 
-            for vert_id in shared_normal:
-
-                vert = verts[vert_id]
-                verts_to_update.append(vert)
-                poly = polys[vert.get_polygon_id()]
-                normal += poly.get_normal()
+            for vert in verts_to_update:
+                normal += polys[vert.get_polygon_id()].get_normal()
 
             normal.normalize()
+            x, y, z = normal * sign
 
             for vert in verts_to_update:
-                normal_writer.set_row(vert.get_row_index())
-                normal_writer.set_data3f(normal * sign)
+                row = vert.get_row_index() * 3
+                normal_data[row] = x
+                normal_data[row + 1] = y
+                normal_data[row + 2] = z
                 vert.set_normal(normal)
 
-        normal_array = vertex_data_top.get_array(2)
-        vertex_data_poly = self._vertex_data["poly"]
-        vertex_data_poly.set_array(2, GeomVertexArrayData(normal_array))
-        normal_geoms = self._geoms["normal"]
-
-        for geom_type in ("pickable", "sel_state"):
-            vertex_data = normal_geoms[geom_type].node().modify_geom(0).modify_vertex_data()
-            vertex_data.set_array(2, normal_array)
+        normal_array.modify_handle().set_data(normal_data.tostring())
+        self.__share_normal_array(normal_array)
 
         if update_tangent_space:
 
@@ -696,9 +690,18 @@ class NormalEditBase(BaseObject):
             normal_writer.set_data3f(normal * sign)
             vert.set_normal(normal)
 
-        normal_array = vertex_data_top.get_array(2)
-        vertex_data_poly = self._vertex_data["poly"]
-        vertex_data_poly.set_array(2, GeomVertexArrayData(normal_array))
+        self.__share_normal_array(vertex_data_top.get_array(2))
+
+    def __share_normal_array(self, normal_array):
+        """
+        Make the other vertex datas use the given normal array of the top-level
+        vertex data.
+        Since vertex arrays are copy-on-write, they can simply be shared instead of
+        copied.
+
+        """
+
+        self._vertex_data["poly"].set_array(2, normal_array)
         normal_geoms = self._geoms["normal"]
 
         for geom_type in ("pickable", "sel_state"):
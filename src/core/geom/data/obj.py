@@ -9,6 +9,11 @@ from .normal_edit import NormalEditBase
 from .uv_edit import UVEditBase
 
 
+# TODO: replace the per-subobject Vertex, Edge and Polygon objects with an array-backed
+# topology store (contiguous position, normal, UV, row, vert->poly and edge->vert
+# columns), handing out thin view objects to the tools that need single subobjects;
+# this requires migrating the subobjects pickled in history records and scene files,
+# and benchmarking against the memory and unlocking time of dense meshes.
 class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
                      VertexEditBase, EdgeEditBase, PolygonEditBase,
                      NormalEditBase, UVEditBase):
@@ -210,13 +215,29 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
         edges_by_pos = {}
         polys_by_edge = {}
 
+        # The picking color IDs of all subobjects are allocated in bulk; a polygon
+        # normally has as many edges as it has vertices, and any edge IDs that end
+        # up unused are recovered afterwards.
+
+        vert_count = 0
+
+        for poly_data in data:
+            vert_count += len(set(vert_data["pos"] for tri_data in poly_data["tris"]
+                                  for vert_data in tri_data))
+
+        get_color_ids = lambda subobj_type, count: \
+            iter(Mgr.do("get_next_picking_color_ids", subobj_type, count) or ())
+        vert_color_ids = get_color_ids("vert", vert_count)
+        edge_color_ids = get_color_ids("edge", vert_count)
+        poly_color_ids = get_color_ids("poly", len(data))
+
         if gradual:
             poly_count = 0
 
         for poly_data in data:
 
             row_index = 0
-            tmp_edges = []
+            tmp_edges = set()
             positions = {}
             poly_verts_by_pos = {}
             poly_edges_by_pos = {}
@@ -240,10 +261,10 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
 
                     else:
 
-                        vertex = Mgr.do("create_vert", self, pos)
+                        vertex = Mgr.do("create_vert", self, pos, next(vert_color_ids, None))
                         vertex.set_row_index(row_index)
                         row_index += 1
-                        vertex.set_normal(vert_data["normal"])
+                        vertex.set_normal(Vec3(*vert_data["normal"]))
                         vertex.set_uvs(vert_data["uvs"])
 
                         if "color" in vert_data:
@@ -267,7 +288,7 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
                         # if the edge appears twice, it's actually a diagonal
                         tmp_edges.remove(reversed_vert_ids)
                     else:
-                        tmp_edges.append(edge_vert_ids)
+                        tmp_edges.add(edge_vert_ids)
 
             for edge_vert_ids in tmp_edges:
                 poly_edges_by_vert_id[edge_vert_ids[0]] = edge_vert_ids
@@ -278,7 +299,7 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
             vert1 = verts[vert1_id]
             vert2 = verts[vert2_id]
             poly_verts.append(vert1)
-            edge = Mgr.do("create_edge", self, edge_vert_ids)
+            edge = Mgr.do("create_edge", self, edge_vert_ids, next(edge_color_ids, None))
             edge1_id = edge.get_id()
             vert2.add_edge_id(edge1_id)
             edges[edge1_id] = edge
@@ -293,7 +314,7 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
                 edge_vert_ids = poly_edges_by_vert_id[vert2_id]
                 vert2_id = edge_vert_ids[1]
                 vert2 = verts[vert2_id]
-                edge = Mgr.do("create_edge", self, edge_vert_ids)
+                edge = Mgr.do("create_edge", self, edge_vert_ids, next(edge_color_ids, None))
                 edge_id = edge.get_id()
                 vert1.add_edge_id(edge_id)
                 vert2.add_edge_id(edge_id)
@@ -305,7 +326,8 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
 
             vert2.add_edge_id(edge1_id)
 
-            polygon = Mgr.do("create_poly", self, poly_tris, poly_edges, poly_verts)
+            polygon = Mgr.do("create_poly", self, poly_tris, poly_edges, poly_verts,
+                             next(poly_color_ids, None))
             polygon.update_normal()
             ordered_polys.append(polygon)
             poly_id = polygon.get_id()
@@ -366,6 +388,11 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
                     yield
                     poly_count = 0
 
+        unused_edge_color_ids = list(edge_color_ids)
+
+        if unused_edge_color_ids:
+            Mgr.do("recover_picking_color_ids", "edge", unused_edge_color_ids)
+
         if gradual:
             poly_count = 0
 
@@ -496,7 +523,6 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
         subobjs = self._subobjs
         verts = subobjs["vert"]
         self._data_row_count = count = len(verts)
-        tri_vert_count = sum([len(poly) for poly in self._ordered_polys])
 
         sel_data = self._poly_selection_data["unselected"]
 
@@ -521,13 +547,20 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
         points_prim.reserve_num_vertices(count)
         points_prim.add_next_vertices(count)
         lines_prim = GeomLines(Geom.UH_static)
-        lines_prim.reserve_num_vertices(count * 2)
         tris_prim = GeomTriangles(Geom.UH_static)
-        tris_prim.reserve_num_vertices(tri_vert_count)
+
+        # The vertex attributes and the primitive indices are first gathered into
+        # compact, contiguous arrays, which are then written into the vertex data
+        # and primitives all at once, instead of row by row.
 
         if not restore:
-            pos_writer = GeomVertexWriter(vertex_data_poly, "vertex")
-            normal_writer = GeomVertexWriter(vertex_data_poly, "normal")
+            pos_data = PyArray("f", [0.]) * (count * 3)
+            normal_data = PyArray("f", [0.]) * (count * 3)
+
+        tri_index_type, tri_typecode = get_index_format(count - 1)
+        line_index_type, line_typecode = get_index_format(count * 2 - 1)
+        tri_data = PyArray(tri_typecode)
+        line_data = PyArray(line_typecode)
 
         row_index_offset = 0
 
@@ -536,7 +569,7 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
 
         for poly in self._ordered_polys:
 
-            processed_verts = []
+            processed_vert_ids = set()
 
             for vert_ids in poly:
 
@@ -544,21 +577,22 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
 
                     vert = verts[vert_id]
 
-                    if vert not in processed_verts:
+                    if vert_id not in processed_vert_ids:
 
                         vert.offset_row_index(row_index_offset)
 
                         if not restore:
-                            pos_writer.add_data3f(vert.get_pos())
-                            normal_writer.add_data3f(vert.get_normal())
+                            row = vert.get_row_index() * 3
+                            pos_data[row:row + 3] = PyArray("f", vert.get_pos())
+                            normal_data[row:row + 3] = PyArray("f", vert.get_normal())
 
-                        processed_verts.append(vert)
+                        processed_vert_ids.add(vert_id)
 
-                    tris_prim.add_vertex(vert.get_row_index())
+                    tri_data.append(vert.get_row_index())
 
             for edge in poly.get_edges():
                 row1, row2 = (verts[v_id].get_row_index() for v_id in edge)
-                lines_prim.add_vertices(row1, row2 + count)
+                line_data.extend((row1, row2 + count))
 
             row_index_offset += poly.get_vertex_count()
 
@@ -572,6 +606,20 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
                     yield
                     poly_count = 0
 
+        if not restore:
+            vertex_data_poly.modify_array(0).modify_handle().set_data(pos_data.tostring())
+            vertex_data_poly.modify_array(2).modify_handle().set_data(normal_data.tostring())
+
+        if tri_index_type != tris_prim.get_index_type():
+            tris_prim.set_index_type(tri_index_type)
+
+        tris_prim.modify_vertices().modify_handle().set_data(tri_data.tostring())
+
+        if line_index_type != lines_prim.get_index_type():
+            lines_prim.set_index_type(line_index_type)
+
+        lines_prim.modify_vertices().modify_handle().set_data(line_data.tostring())
+
         pos_array = vertex_data_poly.get_array(0)
         vertex_data_vert.set_array(0, pos_array)
         vertex_data_poly_picking.set_array(0, pos_array)
@@ -680,6 +728,12 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
 
         tris_prim = GeomTriangles(Geom.UH_static)
         tris_prim.reserve_num_vertices(3)
+
+        # the raw index data of both polygon selection state geoms gets exchanged,
+        # so they need to use the same index type
+        if tri_index_type != tris_prim.get_index_type():
+            tris_prim.set_index_type(tri_index_type)
+
         tris_geom = Geom(vertex_data_poly)
         tris_geom.add_primitive(tris_prim)
         geom_node = GeomNode("poly_selected_geom")
@@ -846,29 +900,25 @@ class GeomDataObject(GeomSelectionBase, GeomTransformBase, GeomHistoryBase,
 
     def update_tangent_space(self, tangent_flip, bitangent_flip, poly_ids=None):
 
-        vertex_data = GeomVertexData(self._vertex_data["poly"])
-        tan_writer = GeomVertexWriter(vertex_data, "tangent")
-        bitan_writer = GeomVertexWriter(vertex_data, "binormal")
         polys = self._subobjs["poly"]
+        verts = self._subobjs["vert"]
+        tri_rows = PyArray("I")
 
         for poly_id in (polys if poly_ids is None else poly_ids):
+            for vert_ids in polys[poly_id]:
+                tri_rows.extend(verts[vert_id].get_row_index() for vert_id in vert_ids)
 
-            poly = polys[poly_id]
-            poly.update_tangent_space(tangent_flip, bitangent_flip)
-
-            for vert in poly.get_vertices():
-                row = vert.get_row_index()
-                tan_writer.set_row(row)
-                bitan_writer.set_row(row)
-                tangent, bitangent = vert.get_tangent_space()
-                tan_writer.set_data3f(tangent)
-                bitan_writer.set_data3f(bitangent)
-
-        array = vertex_data.get_array(3)
-        vertex_data_poly = self._vertex_data["poly"]
-        vertex_data_poly.set_array(3, GeomVertexArrayData(array))
         vertex_data_top = self._toplvl_node.modify_geom(0).modify_vertex_data()
-        vertex_data_top.set_array(3, GeomVertexArrayData(array))
+        pos_data = PyArray("f", vertex_data_top.get_array(0).get_handle().get_data())
+        normal_data = PyArray("f", vertex_data_top.get_array(2).get_handle().get_data())
+        uv_data = PyArray("f", vertex_data_top.get_array(4).get_handle().get_data())
+        array = GeomVertexArrayData(vertex_data_top.get_array(3))
+        tan_data = PyArray("f", array.get_handle().get_data())
+        compute_tangent_space(pos_data, normal_data, uv_data, tri_rows, tan_data,
+                              tangent_flip, bitangent_flip)
+        array.modify_handle().set_data(tan_data.tostring())
+        vertex_data_top.set_array(3, array)
+        self._vertex_data["poly"].set_array(3, array)
 
         self._is_tangent_space_initialized = True
 
@@ -21,15 +21,50 @@ class GeomSelectionBase(BaseObject):
         self._sel_subobj_ids_backup = {}
         self._selection_backup = {}
 
+    def __move_poly_rows(self, handle_from, handle_to, data_from, data_to, polys, stride):
+        """
+        Move the triangle rows of the given polygons from one GeomTriangles index
+        buffer to another, rebuilding each buffer only once.
+
+        """
+
+        # Locate all polygons with a single pass over the triangle data,
+        # instead of searching for each polygon separately.
+        tri_indices = dict((tri, i) for i, tri in enumerate(data_from))
+        row_ranges = sorted((tri_indices[poly[0]] * 3, len(poly), poly) for poly in set(polys))
+
+        old_data = handle_from.get_data()
+        subdata_kept = []
+        subdata_moved = []
+        tris_kept = []
+        tris_moved = []
+        prev_end = 0
+
+        for start, size, poly in row_ranges:
+            subdata_kept.append(old_data[prev_end * stride:start * stride])
+            subdata_moved.append(old_data[start * stride:(start + size) * stride])
+            tris_kept.extend(data_from[prev_end // 3:start // 3])
+            tris_moved.extend(poly)
+            prev_end = start + size
+
+        subdata_kept.append(old_data[prev_end * stride:])
+        tris_kept.extend(data_from[prev_end // 3:])
+
+        handle_from.set_data("".join(subdata_kept))
+        handle_to.set_data(handle_to.get_data() + "".join(subdata_moved))
+        data_from[:] = tris_kept
+        data_to.extend(tris_moved)
+
     def update_selection(self, subobj_type, subobjs_to_select, subobjs_to_deselect,
                          update_verts_to_transf=True, selection_colors=None):
 
         selected_subobj_ids = self._selected_subobj_ids[subobj_type]
+        selected_id_set = set(selected_subobj_ids)
         geoms = self._geoms[subobj_type]
         selected_subobjs = [subobj for subobj in subobjs_to_select
-                            if subobj.get_id() not in selected_subobj_ids]
+                            if subobj.get_id() not in selected_id_set]
         deselected_subobjs = [subobj for subobj in subobjs_to_deselect
-                              if subobj.get_id() in selected_subobj_ids]
+                              if subobj.get_id() in selected_id_set]
 
         if not (selected_subobjs or deselected_subobjs):
             return False
@@ -47,49 +82,18 @@ class GeomSelectionBase(BaseObject):
             handle_sel = array.modify_handle()
             prim = geom_unselected.node().modify_geom(0).modify_primitive(0)
             handle_unsel = prim.modify_vertices().modify_handle()
-            row_ranges_sel = []
-            row_ranges_unsel = []
-
-            for poly in selected_subobjs:
-                selected_subobj_ids.append(poly.get_id())
-                start = data_unselected.index(poly[0]) * 3
-                size = len(poly)
-                row_ranges_unsel.append((start, size, poly))
-
-            for poly in deselected_subobjs:
-                selected_subobj_ids.remove(poly.get_id())
-                start = data_selected.index(poly[0]) * 3
-                size = len(poly)
-                row_ranges_sel.append((start, size, poly))
-
-            row_ranges_sel.sort(reverse=True)
-            row_ranges_unsel.sort(reverse=True)
-            subdata_sel = ""
-            subdata_unsel = ""
-
-            for start, size, poly in row_ranges_unsel:
-
-                for vert_ids in poly:
-                    data_unselected.remove(vert_ids)
-
-                data_selected.extend(poly)
-
-                subdata_unsel += handle_unsel.get_subdata(start * stride, size * stride)
-                handle_unsel.set_subdata(start * stride, size * stride, "")
-
-            handle_sel.set_data(handle_sel.get_data() + subdata_unsel)
-
-            for start, size, poly in row_ranges_sel:
-
-                for vert_ids in poly:
-                    data_selected.remove(vert_ids)
-
-                data_unselected.extend(poly)
 
-                subdata_sel += handle_sel.get_subdata(start * stride, size * stride)
-                handle_sel.set_subdata(start * stride, size * stride, "")
+            if deselected_subobjs:
+                deselected_ids = set(poly.get_id() for poly in deselected_subobjs)
+                selected_subobj_ids[:] = [poly_id for poly_id in selected_subobj_ids
+                                          if poly_id not in deselected_ids]
+                self.__move_poly_rows(handle_sel, handle_unsel, data_selected,
+                                      data_unselected, deselected_subobjs, stride)
 
-            handle_unsel.set_data(handle_unsel.get_data() + subdata_sel)
+            if selected_subobjs:
+                selected_subobj_ids.extend(poly.get_id() for poly in selected_subobjs)
+                self.__move_poly_rows(handle_unsel, handle_sel, data_unselected,
+                                      data_selected, selected_subobjs, stride)
 
         else:
 
@@ -123,15 +127,20 @@ class GeomSelectionBase(BaseObject):
                     col_writer.set_row(row_index)
                     col_writer.set_data4f(color_sel)
 
+            deselected_ids = set()
+
             for combined_subobj in deselected_subobjs:
 
-                for subobj_id in combined_subobj:
-                    selected_subobj_ids.remove(subobj_id)
+                deselected_ids.update(combined_subobj)
 
                 for row_index in combined_subobj.get_row_indices():
                     col_writer.set_row(row_index)
                     col_writer.set_data4f(color_unsel)
 
+            if deselected_ids:
+                selected_subobj_ids[:] = [subobj_id for subobj_id in selected_subobj_ids
+                                          if subobj_id not in deselected_ids]
+
             if subobj_type == "normal":
 
                 selected_normal_ids = []
@@ -701,11 +710,28 @@ class Selection(SelectionTransformBase):
         self.update_center_pos()
         self.update_ui()
 
+    def __get_special_selection(self, subobj):
+        """
+        Return the set of subobjects to be selected along with the given subobject,
+        which can also be a list of subobjects (e.g. those inside a selection region).
+
+        """
+
+        if not isinstance(subobj, list):
+            return set(subobj.get_special_selection())
+
+        special_sel = set()
+
+        for obj in subobj:
+            special_sel.update(obj.get_special_selection())
+
+        return special_sel
+
     def add(self, subobj, add_to_hist=True):
 
         sel = self._objs
         old_sel = set(sel)
-        sel_to_add = set(subobj.get_special_selection())
+        sel_to_add = self.__get_special_selection(subobj)
         common = old_sel & sel_to_add
 
         if common:
@@ -750,7 +776,7 @@ class Selection(SelectionTransformBase):
 
         sel = self._objs
         old_sel = set(sel)
-        sel_to_remove = set(subobj.get_special_selection())
+        sel_to_remove = self.__get_special_selection(subobj)
         common = old_sel & sel_to_remove
 
         if not common:
@@ -796,7 +822,7 @@ class Selection(SelectionTransformBase):
 
         sel = self._objs
         old_sel = set(sel)
-        new_sel = set(subobj.get_special_selection())
+        new_sel = self.__get_special_selection(subobj)
         common = old_sel & new_sel
 
         if common:
@@ -992,6 +1018,10 @@ class SelectionManager(BaseObject):
         Mgr.accept("select_single_edge", lambda: self.__select_single("edge"))
         Mgr.accept("select_single_poly", lambda: self.__select_single("poly"))
         Mgr.accept("select_single_normal", lambda: self.__select_single("normal"))
+        Mgr.accept("region_select_vert", lambda *args: self.__region_select("vert", *args))
+        Mgr.accept("region_select_edge", lambda *args: self.__region_select("edge", *args))
+        Mgr.accept("region_select_poly", lambda *args: self.__region_select("poly", *args))
+        Mgr.accept("region_select_normal", lambda *args: self.__region_select("normal", *args))
         Mgr.accept("start_selection_via_poly", self.__start_selection_via_poly)
         Mgr.add_app_updater("active_obj_level", lambda: self.__clear_prev_selection(True))
         Mgr.add_app_updater("picking_via_poly", self.__set_subobj_picking_via_poly)
@@ -1231,6 +1261,64 @@ class SelectionManager(BaseObject):
 
         return False, start_mouse_checking
 
+    def __region_select(self, obj_lvl, picked_objs, add_to_sel):
+
+        subobjs = set()
+        by_border = obj_lvl == "edge" and GlobalData["subobj_edit_options"]["sel_edges_by_border"]
+
+        for picked_obj in picked_objs:
+
+            picked_type = picked_obj.get_type()
+
+            if picked_type == "poly" and obj_lvl != "poly":
+
+                # subobjects are picked via their polygons; select all of the
+                # subobjects of the polygons inside the region
+                geom_data_obj = picked_obj.get_geom_data_object()
+
+                if obj_lvl == "vert":
+                    objs = [geom_data_obj.get_merged_vertex(i) for i in picked_obj.get_vertex_ids()]
+                elif obj_lvl == "edge":
+                    objs = [geom_data_obj.get_merged_edge(i) for i in picked_obj.get_edge_ids()]
+                else:
+                    objs = [geom_data_obj.get_shared_normal(i) for i in picked_obj.get_vertex_ids()]
+
+            elif picked_type != ("vert" if obj_lvl == "normal" else obj_lvl):
+                continue
+            elif obj_lvl == "vert":
+                objs = [picked_obj.get_merged_vertex()]
+            elif obj_lvl == "edge":
+                objs = [picked_obj.get_merged_edge()]
+            elif obj_lvl == "normal":
+                objs = [picked_obj.get_shared_normal()]
+            else:
+                objs = [picked_obj]
+
+            subobjs.update(objs)
+
+        if by_border:
+            subobjs = set(obj for obj in subobjs if len(obj) == 1)
+
+        subobjs.discard(None)
+        selection = self._selections[obj_lvl]
+
+        if add_to_sel:
+            selection.add(list(subobjs))
+        else:
+            selection.replace(list(subobjs))
+
+        if selection:
+
+            cs_type = GlobalData["coord_sys_type"]
+            tc_type = GlobalData["transf_center_type"]
+            toplvl_obj = selection[0].get_toplevel_object()
+
+            if cs_type == "local":
+                Mgr.update_locally("coord_sys", cs_type, toplvl_obj)
+
+            if tc_type == "pivot":
+                Mgr.update_locally("transf_center", tc_type, toplvl_obj)
+
     def __set_subobj_picking_via_poly(self, via_poly=False):
 
         GlobalData["subobj_edit_options"]["pick_via_poly"] = via_poly
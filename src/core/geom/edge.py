@@ -292,10 +292,13 @@ class EdgeManager(ObjectManager, PickingColorIDManager):
         PickableTypes.add("edge")
         Mgr.accept("create_merged_edge", self.__create_merged_edge)
 
-    def __create_edge(self, geom_data_obj, verts):
+    def __create_edge(self, geom_data_obj, verts, picking_col_id=None):
 
         edge_id = self.get_next_id()
-        picking_col_id = self.get_next_picking_color_id()
+
+        if picking_col_id is None:
+            picking_col_id = self.get_next_picking_color_id()
+
         edge = Edge(edge_id, picking_col_id, geom_data_obj, verts)
 
         return edge
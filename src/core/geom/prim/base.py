@@ -98,6 +98,117 @@ FRAG_SHADER = """
 """
 
 
+# the maximum number of generated primitive geometry templates kept in memory
+GEOM_DATA_CACHE_SIZE = 8
+# recently generated unit-size primitive geometry, in least to most recently
+# used order
+_geom_data_cache = OrderedDict()
+
+
+def _get_cached_geom_data(key, create_geom_data):
+
+    if key in _geom_data_cache:
+        geom_data = _geom_data_cache.pop(key)
+    else:
+        geom_data = create_geom_data()
+
+        if len(_geom_data_cache) == GEOM_DATA_CACHE_SIZE:
+            _geom_data_cache.popitem(last=False)
+
+    _geom_data_cache[key] = geom_data
+
+    return geom_data
+
+
+def _get_cache_key(prim_type, segments, args, temp):
+
+    if isinstance(segments, dict):
+        segments = tuple(sorted(segments.iteritems()))
+
+    return (prim_type, segments) + tuple(args) + (temp,)
+
+
+def get_geom_data(prim_type, define_geom_data, segments, *args):
+    """
+    Return the unit-size geometry data generated by the given primitive-specific
+    define_geom_data function for the given segments and additional arguments.
+    Recently generated data is reused, so it must not be modified.
+
+    """
+
+    key = _get_cache_key(prim_type, segments, args, False)
+    create_geom_data = lambda: define_geom_data(segments, *args)
+
+    return _get_cached_geom_data(key, create_geom_data)
+
+
+def _create_temp_geom_arrays(geom_data):
+
+    pos_data = PyArray("f")
+    normal_data = PyArray("f")
+    tri_rows = []
+    line_rows = []
+    vert_count = 0
+
+    for poly_data in geom_data:
+
+        rows_by_pos = {}
+        edge_rows = set()
+
+        for tri_data in poly_data:
+
+            rows = []
+
+            for vert_data in tri_data:
+
+                pos = vert_data["pos"]
+
+                if pos in rows_by_pos:
+                    row = rows_by_pos[pos]
+                else:
+                    pos_data.extend(pos)
+                    normal_data.extend(vert_data["normal"])
+                    row = vert_count
+                    rows_by_pos[pos] = row
+                    vert_count += 1
+
+                rows.append(row)
+
+            for i, j in ((0, 1), (1, 2), (0, 2)):
+
+                edge = (rows[i], rows[j]) if rows[i] < rows[j] else (rows[j], rows[i])
+
+                # an edge shared by two triangles of the same polygon is a diagonal
+                if edge in edge_rows:
+                    edge_rows.remove(edge)
+                else:
+                    edge_rows.add(edge)
+
+            tri_rows.extend(rows)
+
+        for edge in edge_rows:
+            line_rows.extend(edge)
+
+    typecode = get_index_format(vert_count - 1)[1]
+
+    return pos_data, normal_data, PyArray(typecode, tri_rows), PyArray(typecode, line_rows)
+
+
+def get_temp_geom_arrays(prim_type, define_geom_data, segments, *args):
+    """
+    Return a (positions, normals, triangle indices, line indices) tuple of flat
+    arrays defining the unit-size geometry of a temporary primitive, generated
+    from the low-poly geometry data returned by define_geom_data.
+    Recently generated arrays are reused.
+
+    """
+
+    key = _get_cache_key(prim_type, segments, args, True)
+    create_geom_data = lambda: _create_temp_geom_arrays(define_geom_data(segments, *args, temp=True))
+
+    return _get_cached_geom_data(key, create_geom_data)
+
+
 class TemporaryPrimitive(BaseObject):
 
     def __init__(self, prim_type, color, pos):
@@ -155,58 +266,24 @@ class TemporaryPrimitive(BaseObject):
 
         """
 
-    def create_geometry(self, geom_data):
+    def create_geometry(self, geom_arrays):
+        """
+        Create the geometry of this temporary object from the given tuple of
+        flat arrays, as returned by get_temp_geom_arrays().
+
+        """
+
+        pos_data, normal_data, tri_data, line_data = geom_arrays
+        vert_count = len(pos_data) // 3
 
         vertex_format_basic = Mgr.get("vertex_format_basic")
         vertex_format_full = Mgr.get("vertex_format_full")
         vertex_data_poly = GeomVertexData("poly_data", vertex_format_full, Geom.UH_dynamic)
-
-        pos_writer = GeomVertexWriter(vertex_data_poly, "vertex")
-        normal_writer = GeomVertexWriter(vertex_data_poly, "normal")
-
-        polys = []
-        vert_count = 0
-        tri_vert_count = 0
-
-        for poly_data in geom_data:
-
-            verts_by_pos = {}
-            edge_vert_ids = []
-            tri_vert_ids = []
-
-            for tri_data in poly_data:
-
-                tri_vert_count += 3
-                vert_ids = []
-
-                for vert_data in tri_data:
-
-                    pos = vert_data["pos"]
-
-                    if pos in verts_by_pos:
-                        vert_id = verts_by_pos[pos]
-                    else:
-                        pos_writer.add_data3f(*pos)
-                        normal_writer.add_data3f(vert_data["normal"])
-                        vert_id = vert_count
-                        verts_by_pos[pos] = vert_count
-                        vert_count += 1
-
-                    vert_ids.append(vert_id)
-
-                for i, j in ((0, 1), (1, 2), (0, 2)):
-
-                    v_ids = sorted([vert_ids[i], vert_ids[j]])
-
-                    if v_ids in edge_vert_ids:
-                        edge_vert_ids.remove(v_ids)
-                    else:
-                        edge_vert_ids.append(v_ids)
-
-                tri_vert_ids.append(tuple(vert_ids))
-
-            polygon = {"edge_vert_ids": edge_vert_ids, "tri_vert_ids": tri_vert_ids}
-            polys.append(polygon)
+        vertex_data_poly.reserve_num_rows(vert_count)
+        vertex_data_poly.set_num_rows(vert_count)
+        vertex_data_poly.modify_array(0).modify_handle().set_data(pos_data.tostring())
+        vertex_data_poly.modify_array(2).modify_handle().set_data(normal_data.tostring())
+        index_type = get_index_format(vert_count - 1)[0]
 
         origin = self._origin
 
@@ -218,21 +295,13 @@ class TemporaryPrimitive(BaseObject):
 
         if create_wire:
             lines_prim = GeomLines(Geom.UH_static)
-            lines_prim.reserve_num_vertices(vert_count)
+            lines_prim.set_index_type(index_type)
+            lines_prim.modify_vertices().modify_handle().set_data(line_data.tostring())
 
         if create_shaded:
             tris_prim = GeomTriangles(Geom.UH_static)
-            tris_prim.reserve_num_vertices(tri_vert_count)
-
-        for poly in polys:
-
-            if create_wire:
-                for edge_vert_ids in poly["edge_vert_ids"]:
-                    lines_prim.add_vertices(*edge_vert_ids)
-
-            if create_shaded:
-                for tri_vert_ids in poly["tri_vert_ids"]:
-                    tris_prim.add_vertices(*tri_vert_ids)
+            tris_prim.set_index_type(index_type)
+            tris_prim.modify_vertices().modify_handle().set_data(tri_data.tostring())
 
         if create_wire:
 
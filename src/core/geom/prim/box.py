@@ -148,8 +148,8 @@ class TemporaryBox(TemporaryPrimitive):
         TemporaryPrimitive.__init__(self, "box", color, pos)
 
         self._size = {"x": 0., "y": 0., "z": 0.}
-        geom_data = _define_geom_data(segments, True)
-        self.create_geometry(geom_data)
+        geom_arrays = get_temp_geom_arrays("box", _define_geom_data, segments)
+        self.create_geometry(geom_arrays)
         self.get_origin().set_sz(.001)
 
     def update_size(self, x=None, y=None, z=None):
@@ -220,7 +220,7 @@ class Box(Primitive):
 
     def define_geom_data(self):
 
-        return _define_geom_data(self._segments)
+        return get_geom_data("box", _define_geom_data, self._segments)
 
     def create(self, segments):
 
@@ -404,8 +404,8 @@ class TemporaryCone(TemporaryPrimitive):
         self._bottom_radius = 0.
         self._top_radius = 0.
         self._height = 0.
-        geom_data = _define_geom_data(segments, is_smooth, True)
-        self.create_geometry(geom_data)
+        geom_arrays = get_temp_geom_arrays("cone", _define_geom_data, segments, is_smooth)
+        self.create_geometry(geom_arrays)
         origin = self.get_origin()
         shader = Shader.make(Shader.SL_GLSL, VERT_SHADER, FRAG_SHADER)
         origin.set_shader(shader, 1)
@@ -473,7 +473,7 @@ class Cone(Primitive):
 
     def define_geom_data(self):
 
-        return _define_geom_data(self._segments, self._is_smooth)
+        return get_geom_data("cone", _define_geom_data, self._segments, self._is_smooth)
 
     def update(self, data):
 
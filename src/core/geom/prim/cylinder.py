@@ -312,8 +312,8 @@ class TemporaryCylinder(TemporaryPrimitive):
 
         self._radius = 0.
         self._height = 0.
-        geom_data = _define_geom_data(segments, is_smooth, True)
-        self.create_geometry(geom_data)
+        geom_arrays = get_temp_geom_arrays("cylinder", _define_geom_data, segments, is_smooth)
+        self.create_geometry(geom_arrays)
         self.get_origin().set_sz(.001)
 
     def update_size(self, radius=None, height=None):
@@ -365,7 +365,7 @@ class Cylinder(Primitive):
 
     def define_geom_data(self):
 
-        return _define_geom_data(self._segments, self._is_smooth)
+        return get_geom_data("cylinder", _define_geom_data, self._segments, self._is_smooth)
 
     def update(self, data):
 
@@ -80,8 +80,8 @@ class TemporaryPlane(TemporaryPrimitive):
         TemporaryPrimitive.__init__(self, "plane", color, pos)
 
         self._size = {"x": 0., "y": 0.}
-        geom_data = _define_geom_data(segments, True)
-        self.create_geometry(geom_data)
+        geom_arrays = get_temp_geom_arrays("plane", _define_geom_data, segments)
+        self.create_geometry(geom_arrays)
 
     def update_size(self, x=None, y=None):
 
@@ -141,7 +141,7 @@ class Plane(Primitive):
 
     def define_geom_data(self):
 
-        return _define_geom_data(self._segments)
+        return get_geom_data("plane", _define_geom_data, self._segments)
 
     def create(self, segments, force_gradual=False):
 
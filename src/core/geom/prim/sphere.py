@@ -225,8 +225,8 @@ class TemporarySphere(TemporaryPrimitive):
         TemporaryPrimitive.__init__(self, "sphere", color, pos)
 
         self._radius = 0.
-        geom_data = _define_geom_data(segments, is_smooth, True)
-        self.create_geometry(geom_data)
+        geom_arrays = get_temp_geom_arrays("sphere", _define_geom_data, segments, is_smooth)
+        self.create_geometry(geom_arrays)
 
     def update_radius(self, radius):
 
@@ -261,7 +261,7 @@ class Sphere(Primitive):
 
     def define_geom_data(self):
 
-        return _define_geom_data(self._segments, self._is_smooth)
+        return get_geom_data("sphere", _define_geom_data, self._segments, self._is_smooth)
 
     def update(self, data):
 
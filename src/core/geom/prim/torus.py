@@ -191,8 +191,8 @@ class TemporaryTorus(TemporaryPrimitive):
 
         self._ring_radius = 0.
         self._section_radius = 0.
-        geom_data = _define_geom_data(segments, is_smooth, True)
-        self.create_geometry(geom_data)
+        geom_arrays = get_temp_geom_arrays("torus", _define_geom_data, segments, is_smooth)
+        self.create_geometry(geom_arrays)
         origin = self.get_origin()
         shader = Shader.make(Shader.SL_GLSL, VERT_SHADER, FRAG_SHADER)
         origin.set_shader(shader, 1)
@@ -244,7 +244,7 @@ class Torus(Primitive):
 
     def define_geom_data(self):
 
-        return _define_geom_data(self._segments, self._is_smooth)
+        return get_geom_data("torus", _define_geom_data, self._segments, self._is_smooth)
 
     def update(self, data):
 
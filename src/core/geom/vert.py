@@ -34,8 +34,7 @@ class Vertex(BaseObject):
             "row_offset": 0,
             "uvs": {},
             "normal": None,
-            "normal_is_locked": False,
-            "tangent_space": (Vec3(), Vec3())
+            "normal_is_locked": False
         }
 
     def get_type(self):
@@ -217,14 +216,6 @@ class Vertex(BaseObject):
 
         return poly.get_normal() if poly else None
 
-    def set_tangent_space(self, tangent_space):
-
-        self._data["tangent_space"] = tangent_space
-
-    def get_tangent_space(self):
-
-        return self._data["tangent_space"]
-
     def get_point_at_screen_pos(self, screen_pos):
 
         cam = self.cam()
@@ -407,10 +398,13 @@ class VertexManager(ObjectManager, PickingColorIDManager):
         PickableTypes.add("vert")
         Mgr.accept("create_merged_vert", self.__create_merged_vertex)
 
-    def __create_vertex(self, geom_data_obj, pos):
+    def __create_vertex(self, geom_data_obj, pos, picking_col_id=None):
 
         vert_id = self.get_next_id()
-        picking_col_id = self.get_next_picking_color_id()
+
+        if picking_col_id is None:
+            picking_col_id = self.get_next_picking_color_id()
+
         vertex = Vertex(vert_id, picking_col_id, geom_data_obj, pos)
 
         return vertex
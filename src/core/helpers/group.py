@@ -1055,9 +1055,7 @@ class GroupManager(ObjectManager):
             Mgr.do("update_obj_link_viz", obj_ids)
 
             namelist = GlobalData["obj_names"]
-            search_pattern = r"^group\s*(\d+)$"
-            naming_pattern = "group {:04d}"
-            name = get_unique_name("", namelist, search_pattern, naming_pattern)
+            name = namelist.get_unique_name("", "group", "group {:04d}")
             group.set_name(name)
 
             # make undo/redoable
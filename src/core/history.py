@@ -1,7 +1,393 @@
 from __future__ import with_statement
 from .base import *
+from direct.stdpy import threading
 
 COMPRESSION = 9
+# the number of removed records after which the history file gets repacked
+COMPACTION_THRESHOLD = 500
+# the maximum total size (in bytes) of the decompressed records kept in memory
+CACHE_SIZE = 64 << 20
+# the maximum total size (in bytes) of the records written to the history file
+# in a single flush
+WRITE_CHUNK_SIZE = 4 << 20
+
+
+# The following class is a least-recently-used cache of decompressed history
+# records, so loading the same data repeatedly (e.g. when toggling undo/redo)
+# does not require reading and decompressing it from the history file each time.
+# Only the pickled data is cached, since unpickled values are handed over to
+# (and modified by) the objects whose data is restored.
+class HistoryRecordCache(object):
+
+    def __init__(self, max_size=CACHE_SIZE):
+
+        self._records = OrderedDict()
+        self._size = 0
+        self._max_size = max_size
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, name):
+
+        records = self._records
+
+        if name in records:
+            # move the record to the "most recently used" end
+            data_pickled = records.pop(name)
+            records[name] = data_pickled
+            self._hits += 1
+            return data_pickled
+
+        self._misses += 1
+
+    def add(self, name, data_pickled):
+
+        records = self._records
+
+        if name in records:
+            self._size -= len(records.pop(name))
+
+        size = len(data_pickled)
+
+        if size > self._max_size:
+            return
+
+        records[name] = data_pickled
+        self._size += size
+
+        while self._size > self._max_size:
+            old_name, old_data = records.popitem(last=False)
+            self._size -= len(old_data)
+
+    def discard(self, name):
+
+        if name in self._records:
+            self._size -= len(self._records.pop(name))
+
+    def clear(self):
+
+        self._records.clear()
+        self._size = 0
+
+    def get_stats(self):
+
+        return {"hits": self._hits, "misses": self._misses,
+                "record_count": len(self._records), "size": self._size}
+
+    def reset_stats(self):
+
+        self._hits = 0
+        self._misses = 0
+
+
+# The following class keeps the history file open for the entire session and
+# keeps track of the names of the records it contains, so they don't need to be
+# looked up in the file itself.
+# New records are written in batches, through a single flush of the file index,
+# and the space taken up by removed records is only reclaimed periodically.
+# If threading is supported, the batches are compressed and written to disk by
+# a background thread, so storing history never stalls the main thread; records
+# that are still being written can be read back from memory in the meantime.
+class HistoryStore(object):
+
+    def __init__(self, filename="hist.dat"):
+
+        self._filename = filename
+        self._file = None
+        self._record_names = set()
+        self._pending_records = {}
+        self._removed_count = 0
+        self._cache = HistoryRecordCache()
+
+        # the lock protects the Multifile itself, while the condition protects
+        # the queue of batches and the records in flight
+        self._file_lock = threading.Lock()
+        self._queue_cond = threading.Condition()
+        self._batch_queue = []
+        self._records_in_flight = {}
+        self._is_writing = False
+        self._writer = None
+
+    def __start_writer(self):
+
+        if self._writer or not Thread.is_threading_supported():
+            return
+
+        self._writer = threading.Thread(target=self.__write_batches, name="history_writer")
+        self._writer.setDaemon(True)
+        self._writer.start()
+
+    def __write_batches(self):
+
+        cond = self._queue_cond
+
+        while True:
+
+            with cond:
+
+                while not self._batch_queue:
+                    cond.wait()
+
+                batch = self._batch_queue.pop(0)
+                self._is_writing = True
+
+            is_written = False
+
+            try:
+                self.__write_batch(batch)
+                is_written = True
+            except Exception:
+                logging.exception("Couldn't write history records to disk")
+            finally:
+
+                with cond:
+
+                    # records that could not be written are kept in memory, so they
+                    # can still be read back
+                    if is_written:
+
+                        records_in_flight = self._records_in_flight
+
+                        for name, data_pickled in batch.iteritems():
+                            # only forget about the record if it wasn't replaced in the meantime
+                            if records_in_flight.get(name) is data_pickled:
+                                del records_in_flight[name]
+
+                    self._is_writing = False
+                    cond.notify_all()
+
+    def __write_chunk(self, chunk):
+
+        streams = []
+
+        with self._file_lock:
+
+            hist_file = self._file
+
+            for name, data_pickled in chunk:
+                # the streams need to stay alive until the file is flushed
+                streams.append(StringStream(data_pickled))
+                hist_file.add_subfile(name, streams[-1], COMPRESSION)
+
+            hist_file.flush()
+
+    def __write_batch(self, batch):
+
+        # The records are compressed and written in chunks of limited size, with the
+        # file lock released in between, so reading a record that is already in the
+        # file never has to wait until an entire batch has been written.
+
+        chunk = []
+        chunk_size = 0
+
+        for name, data_pickled in batch.iteritems():
+
+            chunk.append((name, data_pickled))
+            chunk_size += len(data_pickled)
+
+            if chunk_size >= WRITE_CHUNK_SIZE:
+                self.__write_chunk(chunk)
+                chunk = []
+                chunk_size = 0
+
+        # an empty batch still needs a flush, to write removals to disk
+        if chunk or not batch:
+            self.__write_chunk(chunk)
+
+    def wait(self):
+        """ Wait until all batches of records have been written to disk """
+
+        if not self._writer:
+            return
+
+        cond = self._queue_cond
+
+        with cond:
+            while self._batch_queue or self._is_writing:
+                cond.wait()
+
+    def open(self, new=False):
+        """
+        Open the history file for the rest of the session.
+        If "new" is True, any existing file is overwritten.
+
+        """
+
+        if self._file:
+            self.close()
+
+        hist_file = Multifile()
+
+        if new:
+            # a Multifile opened for writing only cannot be read from (nor repacked),
+            # so the new file is just created here and reopened for reading as well
+            hist_file.open_write(self._filename)
+            hist_file.close()
+
+        hist_file.open_read_write(self._filename)
+
+        self._file = hist_file
+        self._record_names = set(hist_file.get_subfile_name(i)
+                                 for i in xrange(hist_file.get_num_subfiles()))
+        self._removed_count = 0
+        self._cache.clear()
+        self.__start_writer()
+
+    def close(self):
+
+        if not self._file:
+            return
+
+        self.flush()
+        self.wait()
+        self._file.close()
+        self._file = None
+        self._record_names = set()
+        self._records_in_flight = {}
+        self._cache.clear()
+
+    def get_cache(self):
+
+        return self._cache
+
+    def get_record_names(self):
+
+        return self._record_names
+
+    def has_record(self, name):
+
+        return name in self._record_names
+
+    def write(self, name, data_pickled):
+        """
+        Add a record with the given name, containing already pickled data.
+        The record will only be written to the file on the next flush().
+
+        """
+
+        self._pending_records[name] = data_pickled
+        self._record_names.add(name)
+        self._cache.discard(name)
+
+    def store(self, name, value):
+        """
+        Pickle the given value and add it as a record with the given name.
+        Pickling happens right away, so later changes to the value do not affect
+        the stored record.
+
+        """
+
+        self.write(name, cPickle.dumps(value, -1))
+
+    def read(self, name):
+        """ Return the pickled data of the record with the given name, or None """
+
+        if name in self._pending_records:
+            return self._pending_records[name]
+
+        if name not in self._record_names:
+            return
+
+        with self._queue_cond:
+            data_pickled = self._records_in_flight.get(name)
+
+        if data_pickled is not None:
+            return data_pickled
+
+        data_pickled = self._cache.get(name)
+
+        if data_pickled is None:
+
+            with self._file_lock:
+                hist_file = self._file
+                data_pickled = hist_file.read_subfile(hist_file.find_subfile(name))
+
+            self._cache.add(name, data_pickled)
+
+        return data_pickled
+
+    def load(self, name):
+        """ Return the unpickled data of the record with the given name """
+
+        data_pickled = self.read(name)
+
+        if data_pickled is None:
+            msg = "Couldn't load history record '{}'".format(name)
+            logging.critical(msg)
+            raise RuntimeError(msg)
+
+        return cPickle.loads(data_pickled)
+
+    def remove(self, name):
+
+        if name not in self._record_names:
+            return
+
+        self._record_names.remove(name)
+        self._cache.discard(name)
+
+        if name in self._pending_records:
+            del self._pending_records[name]
+
+        cond = self._queue_cond
+
+        with cond:
+
+            # only wait for the writer if the record is still on its way to the file
+            while name in self._records_in_flight and (self._batch_queue or self._is_writing):
+                cond.wait()
+
+            self._records_in_flight.pop(name, None)
+
+        with self._file_lock:
+
+            hist_file = self._file
+            subfile_index = hist_file.find_subfile(name)
+
+            if subfile_index != -1:
+                hist_file.remove_subfile(subfile_index)
+                self._removed_count += 1
+
+    def flush(self):
+        """
+        Write pending records and removals to disk, in a background thread if
+        possible.
+
+        """
+
+        batch = self._pending_records
+        self._pending_records = {}
+        cache = self._cache
+
+        for name, data_pickled in batch.iteritems():
+            # recently stored data is likely to be needed soon (e.g. to undo it)
+            cache.add(name, data_pickled)
+
+        if self._writer:
+            with self._queue_cond:
+                self._records_in_flight.update(batch)
+                self._batch_queue.append(batch)
+                self._queue_cond.notify_all()
+        else:
+            self.__write_batch(batch)
+
+    def compact(self, force=False):
+        """
+        Repack the history file if enough records have been removed since the last
+        time it was repacked, or if "force" is True.
+
+        """
+
+        self.flush()
+        self.wait()
+
+        if force or self._removed_count >= COMPACTION_THRESHOLD:
+
+            with self._file_lock:
+                if self._file.needs_repack():
+                    self._file.repack()
+
+            self._removed_count = 0
 
 
 class TimeIDRef(object):
@@ -305,6 +691,7 @@ class HistoryManager(BaseObject):
         self._hist_events = {}
         self._prev_time_id = self._next_time_id = self._saved_time_id = (0, 0)
         self._backup_file_index = 1
+        self._hist_store = HistoryStore("hist.dat")
 
         self._clocks = {"automerge": ClockObject(), "autobackup": ClockObject()}
 
@@ -317,6 +704,7 @@ class HistoryManager(BaseObject):
         GlobalData.set_default("autobackup_defaults", autobackup_defaults, copier)
 
         Mgr.expose("history_event", lambda time_id: self._hist_events.get(time_id))
+        Mgr.expose("history_cache_stats", lambda: self._hist_store.get_cache().get_stats())
         Mgr.accept("require_scene_save", self.__require_scene_save)
         Mgr.accept("reset_history", self.__reset_history)
         Mgr.accept("load_from_history", self.__load_from_history)
@@ -366,17 +754,12 @@ class HistoryManager(BaseObject):
         self._hist_events = {(0, 0): root_event, "root": root_event}
         self._prev_time_id = self._saved_time_id = (0, 0)
 
-        hist_file = Multifile()
-        hist_file.open_write("hist.dat")
-        time_id_stream = StringStream(cPickle.dumps(self._prev_time_id, -1))
-        hist_file.add_subfile("time_id", time_id_stream, COMPRESSION)
-        hist_event_stream = StringStream(cPickle.dumps(self._hist_events, -1))
-        hist_file.add_subfile("events", hist_event_stream, COMPRESSION)
-        object_ids_stream = StringStream(cPickle.dumps(set(), -1))
-        hist_file.add_subfile("{}/object_ids".format(self._prev_time_id), object_ids_stream, COMPRESSION)
-
-        hist_file.repack()
-        hist_file.close()
+        hist_store = self._hist_store
+        hist_store.open(new=True)
+        hist_store.store("time_id", self._prev_time_id)
+        hist_store.store("events", self._hist_events)
+        hist_store.store("{}/object_ids".format(self._prev_time_id), set())
+        hist_store.flush()
 
         GlobalData["history_to_undo"] = False
         GlobalData["history_to_redo"] = False
@@ -390,15 +773,9 @@ class HistoryManager(BaseObject):
         if not time_id:
             time_id = self._prev_time_id
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
         subfile_name = "{}/{}/{}".format(time_id, obj_id, data_id)
-        data_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
 
-        hist_file.close()
-
-        return cPickle.loads(data_pickled)
+        return self._hist_store.load(subfile_name)
 
     def __get_last_time_id(self, obj_id, prop_id, time_id=None):
 
@@ -423,12 +800,7 @@ class HistoryManager(BaseObject):
         if last_time_id is None:
             return
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
-        value = self.__load_property_value(hist_file, last_time_id, obj_id, prop_id)
-
-        hist_file.close()
+        value = self.__load_property_value(last_time_id, obj_id, prop_id)
 
         if return_last_time_id:
             return value, last_time_id
@@ -522,10 +894,7 @@ class HistoryManager(BaseObject):
         event = HistoryEvent(time_id, data, self._prev_time_id, self._event_descr_to_store)
         self._hist_events[time_id] = event
 
-        hist_file = Multifile()
-        hist_file.open_read_write("hist.dat")
-
-        streams = []
+        hist_store = self._hist_store
 
         for obj_id in obj_data:
 
@@ -535,23 +904,19 @@ class HistoryManager(BaseObject):
             for prop_id, prop_val_data in obj_data[obj_id].iteritems():
 
                 subfile_name = "{}/{}/{}".format(time_id, obj_id, prop_id)
-                prop_val = prop_val_data["main"]
-                streams.append(StringStream(cPickle.dumps(prop_val, -1)))
-                hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+                hist_store.store(subfile_name, prop_val_data["main"])
 
                 if "extra" in prop_val_data:
                     for data_id, data in prop_val_data["extra"].iteritems():
                         subfile_name = "{}/{}/{}".format(time_id, obj_id, data_id)
-                        streams.append(StringStream(cPickle.dumps(data, -1)))
-                        hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+                        hist_store.store(subfile_name, data)
 
         if obj_ids is not None:
             subfile_name = "{}/object_ids".format(time_id)
-            streams.append(StringStream(cPickle.dumps(obj_ids, -1)))
-            hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+            hist_store.store(subfile_name, obj_ids)
 
-        hist_file.flush()
-        hist_file.close()
+        # all records of this event are written to the file at once
+        hist_store.flush()
 
         self._event_data_to_store = {"objects": {}}
         self._event_descr_to_store = ""
@@ -650,19 +1015,17 @@ class HistoryManager(BaseObject):
         if end_events:
             self.__update_history(None, None, events_to_delete, end_events, None, False, True)
 
-    def __load_property_value(self, hist_file, time_id, obj_id, prop_id):
+    def __load_property_value(self, time_id, obj_id, prop_id):
 
         subfile_name = "{}/{}/{}".format(time_id, obj_id, prop_id)
-        subfile_index = hist_file.find_subfile(subfile_name)
+        hist_store = self._hist_store
 
-        if subfile_index == -1:
+        if not hist_store.has_record(subfile_name):
             msg = "Couldn't load '{}' property of '{}' for time ID {}".format(prop_id, obj_id, time_id)
             logging.critical(msg)
             raise RuntimeError(msg)
 
-        prop_val_pickled = hist_file.read_subfile(subfile_index)
-
-        return cPickle.loads(prop_val_pickled)
+        return hist_store.load(subfile_name)
 
     def __get_undo_description(self):
 
@@ -709,9 +1072,6 @@ class HistoryManager(BaseObject):
 
         props_to_restore = {}
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
         for obj_id in time_ids:
 
             obj_time_ids = time_ids[obj_id]
@@ -720,7 +1080,7 @@ class HistoryManager(BaseObject):
             # to undo this, it has to be restored by unpickling it
             if "object" in obj_time_ids:
                 time_id = obj_time_ids["object"]
-                obj = self.__load_property_value(hist_file, time_id, obj_id, "object")
+                obj = self.__load_property_value(time_id, obj_id, "object")
                 # the entire object will be restored
                 obj_time_ids = {"self": None}
             else:
@@ -728,8 +1088,6 @@ class HistoryManager(BaseObject):
 
             props_to_restore[obj] = obj_time_ids.keys()
 
-        hist_file.close()
-
         old_time_id = self._prev_time_id
         new_time_id = prev_event.get_time_id()
         logging.debug('Undoing event with time ID {} and restoring event with time ID {}'.format(
@@ -782,23 +1140,18 @@ class HistoryManager(BaseObject):
 
         props_to_restore = {}
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
         for obj_id, prop_ids in obj_data.iteritems():
 
             # if "object" is in prop_ids, it means that the object was created;
             # to redo this, it has to be restored by unpickling it
             if "object" in prop_ids:
-                obj = self.__load_property_value(hist_file, new_time_id, obj_id, "object")
+                obj = self.__load_property_value(new_time_id, obj_id, "object")
                 prop_ids = ["self"]
             else:
                 obj = Mgr.get("object", obj_id)
 
             props_to_restore[obj] = prop_ids
 
-        hist_file.close()
-
         for obj, data_ids in props_to_restore.iteritems():
             obj.restore_data(data_ids, restore_type="redo", old_time_id=old_time_id,
                              new_time_id=new_time_id)
@@ -818,18 +1171,10 @@ class HistoryManager(BaseObject):
 
     def __save_history(self, scene_file, set_saved_state=True):
 
-        hist_file = Multifile()
-        hist_file.open_read_write("hist.dat")
-        time_id_stream = StringStream(cPickle.dumps(self._prev_time_id, -1))
-        hist_file.add_subfile("time_id", time_id_stream, COMPRESSION)
-        hist_event_stream = StringStream(cPickle.dumps(self._hist_events, -1))
-        hist_file.add_subfile("events", hist_event_stream, COMPRESSION)
-
-        if hist_file.needs_repack():
-            hist_file.repack()
-
-        hist_file.flush()
-        hist_file.close()
+        hist_store = self._hist_store
+        hist_store.store("time_id", self._prev_time_id)
+        hist_store.store("events", self._hist_events)
+        hist_store.compact(force=True)
 
         scene_file.add_subfile("hist.dat", Filename.binary_filename("hist.dat"), 0)
 
@@ -843,32 +1188,29 @@ class HistoryManager(BaseObject):
 
         Mgr.update_remotely("screenshot", "create")
 
+        # the history file is about to be overwritten, so it needs to be closed first
+        hist_store = self._hist_store
+        hist_store.close()
         scene_file.extract_subfile(scene_file.find_subfile("hist.dat"), Filename("hist.dat"))
+        hist_store.open()
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
-        time_id_pickled = hist_file.read_subfile(hist_file.find_subfile("time_id"))
-        self._prev_time_id = self._next_time_id = self._saved_time_id = cPickle.loads(time_id_pickled)
-        events_pickled = hist_file.read_subfile(hist_file.find_subfile("events"))
-        self._hist_events = cPickle.loads(events_pickled)
+        time_id = hist_store.load("time_id")
+        self._prev_time_id = self._next_time_id = self._saved_time_id = time_id
+        self._hist_events = hist_store.load("events")
         event = self._hist_events[self._prev_time_id]
 
         obj_ids_time_id = event.get_last_object_ids().get_time_id()
         subfile_name = "{}/object_ids".format(obj_ids_time_id)
-        obj_ids_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
-        obj_ids = cPickle.loads(obj_ids_pickled)
+        obj_ids = hist_store.load(subfile_name)
 
         objs_to_restore = []
 
         for obj_id in obj_ids:
 
             time_id = event.get_last_object_prop_change(obj_id, "creation")
-            obj = self.__load_property_value(hist_file, time_id, obj_id, "object")
+            obj = self.__load_property_value(time_id, obj_id, "object")
             objs_to_restore.append(obj)
 
-        hist_file.close()
-
         for obj in objs_to_restore:
             obj.restore_data(["self"], restore_type="redo", old_time_id=(-1, 0),
                              new_time_id=self._prev_time_id)
@@ -888,7 +1230,9 @@ class HistoryManager(BaseObject):
             past = self._hist_events[self._prev_time_id].get_past()
             Mgr.update_app("history", "show", self._hist_events, self._prev_time_id, past)
 
-    def __merge_history(self, end_event, subfile_names, subfiles_to_remove, hist_file, comment=""):
+    def __merge_history(self, end_event, subfile_names, subfiles_to_remove, comment=""):
+
+        hist_store = self._hist_store
 
         to_merge = [end_event]
         prev_event = end_event.get_previous_event()
@@ -922,8 +1266,7 @@ class HistoryManager(BaseObject):
             prev_time_id = prev_event.get_time_id()
             prev_obj_ids_time_id = prev_event.get_last_object_ids().get_time_id()
             subfile_name = "{}/object_ids".format(prev_obj_ids_time_id)
-            data_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
-            obj_ids_before = cPickle.loads(data_pickled)
+            obj_ids_before = hist_store.load(subfile_name)
         else:
             prev_time_id = None
             prev_obj_ids_time_id = None
@@ -933,8 +1276,7 @@ class HistoryManager(BaseObject):
         end_obj_ids = end_event.get_last_object_ids()
         end_obj_ids_time_id = end_obj_ids.get_time_id()
         subfile_name = "{}/object_ids".format(end_obj_ids_time_id)
-        data_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
-        obj_ids_after = cPickle.loads(data_pickled)
+        obj_ids_after = hist_store.load(subfile_name)
         obsolete_obj_ids = set()
         obj_ids_time_id = prev_obj_ids_time_id
 
@@ -944,8 +1286,7 @@ class HistoryManager(BaseObject):
 
             if time_id != obj_ids_time_id:
                 subfile_name = "{}/object_ids".format(time_id)
-                data_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
-                obsolete_obj_ids.update(cPickle.loads(data_pickled))
+                obsolete_obj_ids.update(hist_store.load(subfile_name))
                 obj_ids_time_id = time_id
 
         obsolete_obj_ids -= obj_ids_before | obj_ids_after
@@ -987,12 +1328,10 @@ class HistoryManager(BaseObject):
 
                         subfile_name = "{}/{}/{}".format(time_id, obj_id, "object"
                                                          if prop_id == "creation" else prop_id)
-                        data_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
+                        data_pickled = hist_store.read(subfile_name)
                         subfile_name = "{}/{}/{}".format(end_time_id, obj_id, "object"
                                                          if prop_id == "creation" else prop_id)
-                        data_stream = StringStream(data_pickled)
-                        hist_file.add_subfile(subfile_name, data_stream, COMPRESSION)
-                        hist_file.flush()
+                        hist_store.write(subfile_name, data_pickled)
 
             start_event.update_object_data(obj_data)
 
@@ -1007,11 +1346,11 @@ class HistoryManager(BaseObject):
 
         if obj_ids_subfile_to_move:
             end_obj_ids.set_time_id(end_time_id)
-            data_pickled = hist_file.read_subfile(hist_file.find_subfile(obj_ids_subfile_to_move))
+            data_pickled = hist_store.read(obj_ids_subfile_to_move)
             subfile_name = "{}/object_ids".format(end_time_id)
-            data_stream = StringStream(data_pickled)
-            hist_file.add_subfile(subfile_name, data_stream, COMPRESSION)
-            hist_file.flush()
+            hist_store.write(subfile_name, data_pickled)
+
+        hist_store.flush()
 
     def __update_history(self, to_undo, to_redo, to_delete, to_merge, to_restore,
                          set_unsaved, automerge=False):
@@ -1032,17 +1371,14 @@ class HistoryManager(BaseObject):
 
         time_to_restore = to_restore if to_restore else self._prev_time_id
         event_to_restore = self._hist_events[time_to_restore]
-
-        hist_file = Multifile()
-        hist_file.open_read_write("hist.dat")
+        hist_store = self._hist_store
 
         if to_undo or to_redo:
 
             obj_ids_before = set(Mgr.get("object_ids"))
             obj_ids_time_id = event_to_restore.get_last_object_ids().get_time_id()
             subfile_name = "{}/object_ids".format(obj_ids_time_id)
-            obj_ids_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
-            obj_ids_after = cPickle.loads(obj_ids_pickled)
+            obj_ids_after = hist_store.load(subfile_name)
             objects_to_destroy = [Mgr.get("object", obj_id) for obj_id in
                                   obj_ids_before - obj_ids_after]
             objects_to_create = obj_ids_after - obj_ids_before
@@ -1056,7 +1392,7 @@ class HistoryManager(BaseObject):
             for obj_id in objects_to_create:
 
                 time_id = event_to_restore.get_last_object_prop_change(obj_id, "creation")
-                obj = self.__load_property_value(hist_file, time_id, obj_id, "object")
+                obj = self.__load_property_value(time_id, obj_id, "object")
                 props_to_restore[obj] = ["self"]
 
             for obj_id in objects_to_update:
@@ -1069,8 +1405,6 @@ class HistoryManager(BaseObject):
                 obj = Mgr.get("object", obj_id)
                 props_to_restore[obj] = prop_ids
 
-        hist_file.close()
-
         old_time_id = self._prev_time_id
 
         if to_undo or to_redo:
@@ -1085,9 +1419,6 @@ class HistoryManager(BaseObject):
 
         Mgr.do("update_picking_col_id_ranges")
 
-        hist_file = Multifile()
-        hist_file.open_read_write("hist.dat")
-
         def get_future_events(event):
 
             future_events = []
@@ -1118,10 +1449,8 @@ class HistoryManager(BaseObject):
         events_to_remove = set(to_delete)
         events_to_merge = set()
         subfiles_to_remove = set()
-        subfile_names = [hist_file.get_subfile_name(i)
-                         for i in xrange(hist_file.get_num_subfiles())]
-        subfile_names.remove("events")
-        subfile_names.remove("time_id")
+        subfile_names = [name for name in hist_store.get_record_names()
+                         if name not in ("events", "time_id")]
 
         for event in to_delete:
             events_to_remove.update(get_future_events(event))
@@ -1137,8 +1466,7 @@ class HistoryManager(BaseObject):
         comment = "Automerged" if automerge else "Merged"
 
         for event in to_merge:
-            self.__merge_history(event, subfile_names, subfiles_to_remove,
-                                 hist_file, comment=comment)
+            self.__merge_history(event, subfile_names, subfiles_to_remove, comment=comment)
 
         for event in events_to_merge:
             add_subfiles_to_remove(event, subfile_names, subfiles_to_remove,
@@ -1160,12 +1488,10 @@ class HistoryManager(BaseObject):
                 prev_event.remove_next_event(event.get_time_id(), update_milestone_count=True)
 
         for name in subfiles_to_remove:
-            hist_file.remove_subfile(hist_file.find_subfile(name))
+            hist_store.remove(name)
 
-        if to_delete or to_merge:
-            hist_file.repack()
-
-        hist_file.close()
+        # the file only gets repacked once enough records have been removed
+        hist_store.compact()
 
         if automerge:
 
@@ -1217,14 +1543,11 @@ class HistoryManager(BaseObject):
         merge_time_ids = tuple(merge_time_ids)
         subfiles_to_remove = set()
 
-        hist_file = Multifile()
-        hist_file.open_read_write("hist.dat")
-        subfile_names = [hist_file.get_subfile_name(i)
-                         for i in xrange(hist_file.get_num_subfiles())]
-        subfile_names.remove("events")
-        subfile_names.remove("time_id")
+        hist_store = self._hist_store
+        subfile_names = [name for name in hist_store.get_record_names()
+                         if name not in ("events", "time_id")]
 
-        self.__merge_history(event, subfile_names, subfiles_to_remove, hist_file)
+        self.__merge_history(event, subfile_names, subfiles_to_remove)
 
         root_event = self._hist_events["root"]
         time_id = root_event.get_time_id()
@@ -1236,10 +1559,9 @@ class HistoryManager(BaseObject):
                     subfiles_to_remove.add(subfile_name)
 
         for subfile_name in subfiles_to_remove:
-            hist_file.remove_subfile(hist_file.find_subfile(subfile_name))
+            hist_store.remove(subfile_name)
 
-        hist_file.repack()
-        hist_file.close()
+        hist_store.compact(force=True)
 
         self._prev_time_id = time_id
 
@@ -1,5 +1,165 @@
 from .base import *
 from .geom.material import render_state_to_material
+import hashlib
+
+
+IMPORT_CACHE_DIR = "import_cache"
+# the default maximum size (in bytes) of all cached model files combined
+IMPORT_CACHE_SIZE = 1 << 30
+# the number of bytes of a source file hashed per frame
+IMPORT_HASH_CHUNK_SIZE = 1 << 23
+# the arguments passed to Geom.unify() when preprocessing imported geometry
+IMPORT_UNIFY_ARGS = (1000000, False)
+# the patterns matching references to other files (material libraries, textures,
+# external models) within source files of the given types
+IMPORT_REFERENCE_PATTERNS = {
+    "egg": re.compile(r'<(?:Texture|File)>[^{]*\{\s*(?:"([^"]+)"|([^\s}]+))'),
+    "obj": re.compile(r'^[ \t]*mtllib[ \t]+([^\r\n]+)', re.M),
+    "mtl": re.compile(r'^[ \t]*(?:map_\w+|bump|disp|decal|refl)[ \t]+([^\r\n]+)', re.M)
+}
+# the number of bytes at the end of a hashed chunk that is searched for file
+# references again along with the next chunk, as references can straddle chunks
+IMPORT_REFERENCE_OVERLAP = 1024
+
+
+# The following class manages an on-disk cache of preprocessed imported models,
+# each written to a BAM file whose name is derived from a hash of the contents
+# of the source file and of the import options.
+# The least recently used files are removed when the size of the cache exceeds
+# its maximum.
+class ImportCache(object):
+
+    def __init__(self, cache_dir=IMPORT_CACHE_DIR, max_size=IMPORT_CACHE_SIZE):
+
+        self._cache_dir = cache_dir
+        self._index_path = os.path.join(cache_dir, "index")
+        self._max_size = max_size
+        # maps each key to the size of its cached file, in least to most
+        # recently used order
+        self._entries = None
+
+    def __load_index(self):
+
+        if self._entries is not None:
+            return
+
+        try:
+            with open(self._index_path, "rb") as index_file:
+                self._entries = cPickle.load(index_file)
+        except:
+            self._entries = OrderedDict()
+
+    def __save_index(self):
+
+        if not os.path.isdir(self._cache_dir):
+            os.makedirs(self._cache_dir)
+
+        with open(self._index_path, "wb") as index_file:
+            cPickle.dump(self._entries, index_file, -1)
+
+    def __get_path(self, key):
+
+        return os.path.join(self._cache_dir, key + ".bam")
+
+    def set_max_size(self, max_size):
+
+        self._max_size = max_size
+
+    def is_enabled(self):
+
+        return self._max_size > 0
+
+    def create_hasher(self, file_type):
+        """
+        Return a hash object that already includes the import options; the
+        contents of the source file are expected to be fed into it.
+
+        """
+
+        options = "{};{};{};{}".format(PandaSystem.get_version_string(), file_type.lower(),
+                                       LoaderOptions.LF_no_cache, IMPORT_UNIFY_ARGS)
+        hasher = hashlib.sha1()
+        hasher.update(options)
+
+        return hasher
+
+    def get_path(self, key):
+        """
+        Return the path to the cached model file associated with the given key,
+        or None if that file does not exist.
+
+        """
+
+        self.__load_index()
+        entries = self._entries
+
+        if key not in entries:
+            return
+
+        path = self.__get_path(key)
+
+        if not os.path.isfile(path):
+            del entries[key]
+            self.__save_index()
+            return
+
+        entries[key] = entries.pop(key)
+        self.__save_index()
+
+        return path
+
+    def discard(self, key):
+
+        self.__load_index()
+
+        if key not in self._entries:
+            return
+
+        del self._entries[key]
+        path = self.__get_path(key)
+
+        if os.path.isfile(path):
+            os.remove(path)
+
+        self.__save_index()
+
+    def store(self, key, model_root):
+        """
+        Write the given model to the cache, evicting least recently used models
+        as needed to keep the size of the cache within bounds.
+
+        """
+
+        self.__load_index()
+        entries = self._entries
+
+        if not os.path.isdir(self._cache_dir):
+            os.makedirs(self._cache_dir)
+
+        path = self.__get_path(key)
+
+        if not model_root.write_bam_file(Filename.from_os_specific(path)):
+            return
+
+        size = os.path.getsize(path)
+        entries.pop(key, None)
+        entries[key] = size
+        total_size = sum(entries.itervalues())
+
+        while total_size > self._max_size and len(entries) > 1:
+
+            old_key, old_size = entries.popitem(last=False)
+            old_path = self.__get_path(old_key)
+            total_size -= old_size
+
+            if os.path.isfile(old_path):
+                os.remove(old_path)
+
+        if total_size > self._max_size:
+            entries.clear()
+            os.remove(path)
+
+        self.__save_index()
 
 
 class ImportManager(BaseObject):
@@ -7,6 +167,12 @@ class ImportManager(BaseObject):
     def __init__(self):
 
         self._model_root = None
+        self._cache = ImportCache()
+        self._cache_key = ""
+        self._load_request = None
+        self._load_result = []
+        # the number of nodes traversed per frame while preparing the import
+        self._node_chunk_size = 200
         self._hierarchy = {}
         self._obj_index = 0
         self._coll_obj_indices = []
@@ -20,25 +186,199 @@ class ImportManager(BaseObject):
 
     def __prepare_import(self, filename):
 
+        # The model file is loaded asynchronously by the loader thread, after
+        # which its hierarchy is traversed in chunks of nodes; all stages are
+        # handled as a single cancellable long process, so the application remains
+        # responsive while preparing to import large files.
+
         self._imported_file = filename
+        self._imported_file_type = Filename.from_os_specific(filename).get_extension()
+        cache_size = GlobalData["config"].get("import_cache_size", IMPORT_CACHE_SIZE)
+        self._cache.set_max_size(cache_size)
+        process = self.__prepare_hierarchy()
+        descr = "Preparing import..."
+
+        handler = self.__cancel_import_preparation
+        Mgr.add_notification_handler("long_process_cancelled", "import_mgr", handler, once=True)
+        task = lambda: Mgr.remove_notification_handler("long_process_cancelled", "import_mgr")
+        task_id = "remove_notification_handler"
+        PendingTasks.add(task, task_id, "object", id_prefix="import_mgr", sort=100)
+        Mgr.do_gradually(process, "import_preparation", descr, cancellable=True)
+
+    def __request_model(self, filename):
+
         path = Filename.from_os_specific(filename)
         loader_options = LoaderOptions(LoaderOptions.LF_no_cache)
-        model_root = Mgr.load_model(path, okMissing=True, loaderOptions=loader_options)
+        self._load_result = []
+        callback = self._load_result.append
+        self._load_request = Mgr.load_model(path, okMissing=True, loaderOptions=loader_options,
+                                            callback=callback)
+
+    def __get_file_references(self, file_type, text):
+
+        for match in IMPORT_REFERENCE_PATTERNS[file_type].finditer(text):
+            if file_type == "egg":
+                yield match.group(1) or match.group(2)
+            elif file_type == "obj":
+                for name in match.group(1).split():
+                    yield name
+            elif match.group(1).split():
+                # any options precede the texture file name
+                yield match.group(1).split()[-1]
+
+    def __get_dependency_paths(self, file_type, names, ref_dir):
+
+        paths = set()
+
+        for name in names:
+
+            path = os.path.normpath(os.path.join(ref_dir, Filename(name).to_os_specific()))
+            paths.add(path)
+
+            if file_type == "obj" and os.path.isfile(path):
+
+                # also include the textures referenced by the material library
+
+                try:
+                    with open(path, "rb") as mtl_file:
+                        mtl_names = set(self.__get_file_references("mtl", mtl_file.read()))
+                except IOError:
+                    continue
+
+                paths.update(self.__get_dependency_paths("mtl", mtl_names,
+                                                         os.path.dirname(path)))
+
+        return paths
+
+    def __hash_imported_file(self):
+
+        # Besides the contents of the source file, the paths, modification times and
+        # sizes of the files it references (if its type allows finding these) are
+        # hashed, so changing e.g. the material library of an .obj file or a texture
+        # used by an .egg file invalidates the cached model.
+
+        hasher = self._cache.create_hasher(self._imported_file_type)
+        file_type = self._imported_file_type.lower()
+        has_references = file_type in IMPORT_REFERENCE_PATTERNS
+        ref_names = set()
+        tail = ""
+
+        with open(self._imported_file, "rb") as source_file:
+
+            chunk = source_file.read(IMPORT_HASH_CHUNK_SIZE)
+
+            while chunk:
+
+                hasher.update(chunk)
+
+                if has_references:
+                    text = tail + chunk
+                    ref_names.update(self.__get_file_references(file_type, text))
+                    tail = text[-IMPORT_REFERENCE_OVERLAP:]
+
+                yield
+                chunk = source_file.read(IMPORT_HASH_CHUNK_SIZE)
+
+        source_dir = os.path.dirname(self._imported_file)
+
+        for path in sorted(self.__get_dependency_paths(file_type, ref_names, source_dir)):
+            if os.path.isfile(path):
+                hasher.update("{};{!r};{:d}".format(path, os.path.getmtime(path),
+                                                    os.path.getsize(path)))
+            else:
+                hasher.update("{};missing".format(path))
+
+        self._cache_key = hasher.hexdigest()
+
+    def __preprocess_geometry(self, model_root):
+        """
+        Decompose and unify all polygon geoms of the given model, such that it
+        can be stored in the import cache in the state needed for import.
+
+        """
+
+        for node_path in model_root.find_all_matches("**/+GeomNode"):
+
+            node = node_path.node()
+
+            for i in range(node.get_num_geoms()):
+                if node.get_geom(i).get_primitive_type() == Geom.PT_polygons:
+                    node.set_geom(i, node.get_geom(i).decompose().unify(*IMPORT_UNIFY_ARGS))
+
+            yield
+
+    def __prepare_hierarchy(self):
+
+        cache = self._cache
+        cached_path = None
+
+        if cache.is_enabled():
+
+            try:
+                for step in self.__hash_imported_file():
+                    yield True
+            except IOError:
+                self._cache_key = ""
+
+            if self._cache_key:
+                cached_path = cache.get_path(self._cache_key)
+
+        self.__request_model(cached_path if cached_path else self._imported_file)
+
+        # wait for the loader thread to finish loading the model file
+        while not self._load_result:
+            yield WAIT_FOR_NEXT_FRAME
+
+        model_root = self._load_result.pop()
+        self._load_request = None
+
+        if cached_path and not (model_root and model_root.get_children()):
+
+            # the cached model file is unusable; load the source file instead
+            cache.discard(self._cache_key)
+            cached_path = None
+            self.__request_model(self._imported_file)
+
+            while not self._load_result:
+                yield WAIT_FOR_NEXT_FRAME
+
+            model_root = self._load_result.pop()
+            self._load_request = None
 
         if not (model_root and model_root.get_children()):
-            return
+            self._cache_key = ""
+            self._imported_file = ""
+            self._imported_file_type = ""
+            yield False
 
-        self._imported_file_type = path.get_extension()
+        if not cached_path:
+
+            for step in self.__preprocess_geometry(model_root):
+                yield True
+
+            if self._cache_key:
+                cache.store(self._cache_key, model_root)
+
+        self._cache_key = ""
         self._model_root = model_root
         hierarchy = self._hierarchy
+        chunk_size = self._node_chunk_size
+        GlobalData["progress_steps"] = model_root.count_num_descendants() // chunk_size + 1
 
-        obj_names = GlobalData["obj_names"]
+        obj_names = GlobalData["obj_names"].copy()
         self._obj_names = new_obj_names = []
         coll_indices = self._coll_obj_indices
         node_paths = [(model_root, 0, None)]
+        node_count = 0
 
         while node_paths:
 
+            node_count += 1
+
+            if node_count == chunk_size:
+                node_count = 0
+                yield True
+
             node_path, index, parent_index = node_paths.pop()
 
             if node_path.is_empty():
@@ -64,7 +404,7 @@ class ImportManager(BaseObject):
             if not new_name:
                 new_name = "object 0001"
 
-            new_name = get_unique_name(new_name, obj_names + new_obj_names)
+            new_name = get_unique_name(new_name, obj_names)
 
             if not old_name:
                 old_name = "<Unnamed>"
@@ -80,7 +420,7 @@ class ImportManager(BaseObject):
                 node_data["geom_type"] = "regular"
             elif node_type == "CollisionNode":
                 new_name = obj_name if obj_name else "collision object 0001"
-                new_name = get_unique_name(new_name, obj_names + new_obj_names)
+                new_name = get_unique_name(new_name, obj_names)
                 node_data["new_name"] = new_name
                 node_data["geom_type"] = "collision"
                 coll_indices.append(index)
@@ -88,9 +428,33 @@ class ImportManager(BaseObject):
                 node_data["geom_type"] = "none"
 
             new_obj_names.append(new_name)
+            obj_names.add(new_name)
 
         Mgr.update_remotely("import", hierarchy, new_obj_names)
 
+        yield False
+
+    def __cancel_import_preparation(self, info):
+
+        if info == "import_preparation":
+
+            if self._load_request:
+                Mgr.get("base").loader.cancel_request(self._load_request)
+                self._load_request = None
+
+            if self._model_root:
+                self._model_root.remove_node()
+                self._model_root = None
+
+            self._load_result = []
+            self._cache_key = ""
+            self._hierarchy = {}
+            self._obj_index = 0
+            self._coll_obj_indices = []
+            self._obj_names = []
+            self._imported_file = ""
+            self._imported_file_type = ""
+
     def __cancel_import(self):
 
         self._model_root.remove_node()
@@ -365,6 +729,8 @@ class ImportManager(BaseObject):
         model_root = self._model_root
         hierarchy = self._hierarchy
         data = [(hierarchy[0], None)]
+        # the names of existing objects and of those yet to be imported
+        obj_names = GlobalData["obj_names"] + self._obj_names
 
         while data:
 
@@ -394,8 +760,6 @@ class ImportManager(BaseObject):
                     if geom_count > 1:
 
                         obj = self.__create_model_group(obj_name, node_path.get_transform())
-                        obj_names = GlobalData["obj_names"] + self._obj_names
-                        obj_names.remove(obj_name)
 
                         for i in geom_indices:
                             state = node.get_geom_state(i)
@@ -404,7 +768,7 @@ class ImportManager(BaseObject):
                             state = tmp_np.get_net_state()
                             tmp_np.remove_node()
                             new_node = GeomNode("basic_geom")
-                            new_node.add_geom(node.modify_geom(i).decompose().unify(1000000, False))
+                            new_node.add_geom(node.modify_geom(i))
                             new_geom = NodePath(new_node)
                             new_geom.set_state(state)
                             member_name = "object 0001"
@@ -434,9 +798,6 @@ class ImportManager(BaseObject):
                         new_geom.set_state(state)
                         new_geom.set_transform(node_path.get_transform())
                         bounds_node = new_geom
-
-                        new_node.decompose()
-                        new_node.unify(1000000, False)
                         obj = Mgr.do("create_basic_geom", new_geom, obj_name, materials).get_model()
                         obj.register(restore=False)
                         material = obj.get_material()
@@ -449,7 +810,6 @@ class ImportManager(BaseObject):
                     coll_objs = []
                     coll_polys = []
                     coll_planes = []
-                    obj_names = GlobalData["obj_names"] + self._obj_names
 
                     for solid in node.get_solids():
 
@@ -355,6 +355,21 @@ class SelectionManager(BaseObject):
         self._mouse_start_pos = ()
         self._picked_point = None
         self._can_select_single = False
+        self._region_start_pos = None
+        self._region_end_pos = None
+        self._region_add_to_sel = False
+
+        # the frame drawn around the selection region is a unit square, scaled to
+        # the size of the region while dragging
+        lines = LineSegs("selection_region_frame")
+        lines.set_color(1., 1., 1., 1.)
+        lines.move_to(0., 0., 0.)
+
+        for x, z in ((1., 0.), (1., 1.), (0., 1.), (0., 0.)):
+            lines.draw_to(x, 0., z)
+
+        self._region_frame = self.viewport.attach_new_node(lines.create())
+        self._region_frame.hide()
 
         self._obj_id = None
         self._selection = Selection()
@@ -367,6 +382,7 @@ class SelectionManager(BaseObject):
         Mgr.expose("selection_top", lambda: self._selection)
         Mgr.accept("select_top", self.__select_toplvl_obj)
         Mgr.accept("select_single_top", self.__select_single)
+        Mgr.accept("region_select_top", self.__region_select_toplvl_objs)
 
         def force_cursor_update(transf_type):
 
@@ -384,6 +400,8 @@ class SelectionManager(BaseObject):
         add_state("selection_mode", 0, self.__enter_selection_mode,
                   self.__exit_selection_mode)
         add_state("checking_mouse_offset", -1, self.__start_mouse_check)
+        add_state("region_selection_mode", -1, self.__enter_region_selection_mode,
+                  self.__exit_region_selection_mode)
 
         bind = Mgr.bind_state
         bind("selection_mode", "select -> navigate", "space",
@@ -405,6 +423,10 @@ class SelectionManager(BaseObject):
 
         bind("checking_mouse_offset", "cancel mouse check",
              "mouse1-up", cancel_mouse_check)
+        bind("region_selection_mode", "select region",
+             "mouse1-up", self.__select_region)
+        bind("region_selection_mode", "cancel region select",
+             "mouse3-up", lambda: Mgr.enter_state("selection_mode"))
 
         GlobalData["status_data"]["select"] = status_data = {}
         info_start = "<Space> to navigate; (<Ctrl>-)LMB to (toggle-)select; <Del> to delete selection; "
@@ -420,6 +442,9 @@ class SelectionManager(BaseObject):
             status_data[transf_type]["idle"] = {"mode": mode_text, "info": info_idle}
             status_data[transf_type]["in_progress"] = {"mode": mode_text, "info": info_text}
 
+        info_text = "LMB-drag to draw selection region; <Ctrl> to add to selection; RMB to cancel"
+        status_data["region"] = {"mode": "Select region", "info": info_text}
+
     def __get_selection(self, obj_lvl=""):
 
         lvl = obj_lvl if obj_lvl else GlobalData["active_obj_level"]
@@ -640,6 +665,14 @@ class SelectionManager(BaseObject):
             Mgr.enter_state("checking_mouse_offset")
             return
 
+        if not picked_obj:
+            # Dragging the mouse from an empty spot draws a selection region; if the
+            # mouse is released without being moved, the click is handled as usual.
+            self._region_start_pos = self._region_end_pos = screen_pos
+            self._region_add_to_sel = toggle
+            Mgr.enter_state("region_selection_mode")
+            return
+
         can_select_single, start_mouse_checking = Mgr.do("select_" + obj_lvl, picked_obj, toggle)
 
         self._can_select_single = can_select_single
@@ -647,6 +680,98 @@ class SelectionManager(BaseObject):
         if start_mouse_checking:
             Mgr.enter_state("checking_mouse_offset")
 
+    def __enter_region_selection_mode(self, prev_state_id, is_active):
+
+        Mgr.add_task(self.__draw_selection_region, "draw_selection_region")
+        Mgr.update_app("status", ["select", "region"])
+
+    def __exit_region_selection_mode(self, next_state_id, is_active):
+
+        Mgr.remove_task("draw_selection_region")
+        self._region_frame.hide()
+
+    def __draw_selection_region(self, task):
+
+        if self.mouse_watcher.has_mouse():
+            self._region_end_pos = Point2(self.mouse_watcher.get_mouse())
+
+        w, h = GlobalData["viewport"]["size_aux" if GlobalData["viewport"][2] == "main" else "size"]
+        x1, y1 = self._region_start_pos
+        x2, y2 = self._region_end_pos
+        sx = (x2 - x1) * .5 * w
+        sz = (y2 - y1) * .5 * h
+
+        if min(abs(sx), abs(sz)) < 1.:
+            self._region_frame.hide()
+            return task.cont
+
+        self._region_frame.set_pos(x1 * .5 * w, 0., y1 * .5 * h)
+        self._region_frame.set_scale(sx, 1., sz)
+        self._region_frame.show()
+
+        return task.cont
+
+    def __select_region(self):
+
+        Mgr.enter_state("selection_mode")
+
+        obj_lvl = GlobalData["active_obj_level"]
+        add_to_sel = self._region_add_to_sel
+        start_pos = self._region_start_pos
+        end_pos = self._region_end_pos
+        self._region_start_pos = self._region_end_pos = None
+        self._region_add_to_sel = False
+        mouse_pointer = Mgr.get("mouse_pointer", 0)
+        mouse_x = mouse_pointer.get_x()
+        mouse_y = mouse_pointer.get_y()
+        mouse_start_x, mouse_start_y = self._mouse_start_pos
+
+        if max(abs(mouse_x - mouse_start_x), abs(mouse_y - mouse_start_y)) <= 3:
+            # the mouse was clicked without being dragged, so there is no region
+            Mgr.do("select_" + obj_lvl, None, add_to_sel)
+            return
+
+        picked_objs = []
+
+        for obj_type_id, color_ids in Mgr.get("region_color_ids", start_pos, end_pos).iteritems():
+
+            pickable_type = PickableTypes.get(obj_type_id)
+
+            if not pickable_type or pickable_type == "transf_gizmo":
+                continue
+
+            for color_id in color_ids:
+
+                picked_obj = Mgr.get(pickable_type, color_id)
+
+                if picked_obj:
+                    picked_objs.append(picked_obj)
+
+        Mgr.do("region_select_" + obj_lvl, picked_objs, add_to_sel)
+
+    def __region_select_toplvl_objs(self, picked_objs, add_to_sel):
+
+        objs = set(obj.get_toplevel_object(get_group=True) for obj in picked_objs)
+        objs.discard(None)
+        selection = self._selection
+
+        if add_to_sel:
+            selection.add(objs)
+        else:
+            selection.replace(objs)
+
+        if selection:
+
+            obj = selection[0]
+            cs_type = GlobalData["coord_sys_type"]
+            tc_type = GlobalData["transf_center_type"]
+
+            if cs_type == "local":
+                Mgr.update_locally("coord_sys", cs_type, obj)
+
+            if tc_type == "pivot":
+                Mgr.update_locally("transf_center", tc_type, obj)
+
     def __select_toplvl_obj(self, picked_obj, toggle):
 
         obj = picked_obj.get_toplevel_object(get_group=True) if picked_obj else None
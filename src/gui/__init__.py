@@ -16,6 +16,16 @@ class GUI(object):
         Mgr.accept("set_scene_label", self.__set_scene_label)
         Mgr.add_app_updater("pending_tasks", PendingTasks.handle)
 
+        def update_dirty_textures(task):
+
+            WidgetCard.update_dirty_textures()
+
+            return task.cont
+
+        # update the textures of the GUI right before the frame gets rendered (by
+        # the "igLoop" task, with sort 50)
+        Mgr.add_task(update_dirty_textures, "update_dirty_gui_textures", sort=49)
+
         gui_cam_root = NodePath("gui_cam_root")
         self._gui_root = gui_root = gui_cam_root.attach_new_node("gui_root")
         CullBinManager.get_global_ptr().add_bin("gui", CullBinManager.BT_fixed, 41)
@@ -1,5 +1,6 @@
 from panda3d.core import *
-from ...base import logging, re, cPickle, GlobalData, get_unique_name, DirectObject
+from ...base import logging, re, cPickle, GlobalData, get_unique_name, PendingTaskQueue, FrameProfiler, \
+    DirectObject
 import platform
 import math
 import os
@@ -23,6 +24,82 @@ Skin = {
 }
 
 
+# The following class is a least-recently-used cache of images, e.g. of text
+# rendered by the fonts of the GUI or of skin graphics stretched to the size of
+# a widget. The total size of the cached images (in bytes) is bounded by
+# max_size.
+# The cached images are shared, so they must not be modified; a copy should be
+# made instead.
+class ImageCache(object):
+
+    def __init__(self, max_size):
+
+        self.max_size = max_size
+        self._images = collections.OrderedDict()
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+
+        images = self._images
+        image = images.pop(key, None)
+
+        if image is None:
+            self._stats["misses"] += 1
+            return
+
+        images[key] = image
+        self._stats["hits"] += 1
+
+        return image
+
+    def add(self, key, image):
+
+        images = self._images
+
+        if key in images:
+            self._size -= self.__get_image_size(images.pop(key))
+
+        images[key] = image
+        self._size += self.__get_image_size(image)
+
+        while self._size > self.max_size and len(images) > 1:
+            key, image = images.popitem(last=False)
+            self._size -= self.__get_image_size(image)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def __get_image_size(image):
+
+        return image.get_x_size() * image.get_y_size() * image.get_num_channels()
+
+    def clear(self):
+
+        self._images.clear()
+        self._size = 0
+
+    def get_stats(self):
+        """
+        Return a dict with the number of cache hits, misses and evictions, as well
+        as the number of cached images and their total size in bytes.
+
+        """
+
+        stats = self._stats.copy()
+        stats["count"] = len(self._images)
+        stats["size"] = self._size
+
+        return stats
+
+
+# text images are keyed by (font, text, text color, background color);
+# note that the rasterized glyphs themselves are already cached by the
+# PNMTextMaker of each font
+TextImageCache = ImageCache(1 << 24)
+# skin images are keyed by (graphics parts, stretch direction, width, height)
+SkinImageCache = ImageCache(1 << 25)
+
+
 class Font(object):
 
     def __init__(self, path, pixel_size, height, y, line_spacing):
@@ -46,8 +123,58 @@ class Font(object):
 
         return self._text_maker.calc_width(text)
 
+    def get_image(self, text, text_color=(0., 0., 0., 1.), back_color=None):
+        """
+        Return the (cached) image of the given single line of text.
+        The returned image is shared and must not be modified; use create_image()
+        to obtain an image that can be changed.
+
+        """
+
+        key = (self, text, tuple(text_color), None if back_color is None else tuple(back_color))
+        image = TextImageCache.get(key)
+
+        if image is None:
+            image = self.__render_text(text, text_color, back_color)
+            TextImageCache.add(key, image)
+
+        return image
+
     def create_image(self, text, text_color=(0., 0., 0., 1.), back_color=None):
 
+        return PNMImage(self.get_image(text, text_color, back_color))
+
+    def create_multiline_image(self, text, text_color=(0., 0., 0., 1.)):
+        """
+        Return a new image of the given text, which can consist of multiple lines.
+
+        """
+
+        lines = text.split("\n")
+        line_count = len(lines)
+
+        if line_count == 1:
+            return self.create_image(text, text_color)
+
+        key = (self, text, tuple(text_color), "multiline")
+        image = TextImageCache.get(key)
+
+        if image is None:
+
+            line_imgs = [self.get_image(line, text_color) for line in lines]
+            width = max(line_img.get_x_size() for line_img in line_imgs)
+            line_spacing = self._line_spacing
+            image = PNMImage(width, line_spacing * (line_count - 1) + self._height, 4)
+
+            for i, line_img in enumerate(line_imgs):
+                image.copy_sub_image(line_img, 0, i * line_spacing, 0, 0)
+
+            TextImageCache.add(key, image)
+
+        return PNMImage(image)
+
+    def __render_text(self, text, text_color, back_color):
+
         text_maker = self._text_maker
         w = text_maker.calc_width(text)
         h = self._height
@@ -69,6 +196,8 @@ def load_skin(skin_id):
 
     skin_path = os.path.join("skins", skin_id)
 
+    TextImageCache.clear()
+    SkinImageCache.clear()
     tex_atlas = PNMImage()
     tex_atlas.read(Filename.from_os_specific(os.path.join(skin_path, "atlas.png")))
     TextureAtlas["image"] = tex_atlas
@@ -220,14 +349,14 @@ class PendingTaskBatch(object):
 
     def __init__(self, sort=0):
 
-        self._tasks = {}
+        self._queue = PendingTaskQueue()
         self._task_ids = {}
         self._is_handling_tasks = False
         self._sort = sort
 
     def is_empty(self):
 
-        return not self._tasks
+        return not self._queue
 
     def add(self, task, task_id, task_type="", sort=None, id_prefix=None):
         """
@@ -252,10 +381,12 @@ class PendingTaskBatch(object):
             else:
                 sort = 0
 
+        stat_id = task_id
+
         if id_prefix:
             task_id = "{}_{}".format(id_prefix, task_id)
 
-        self._tasks.setdefault(task_type, {}).setdefault(sort, {})[task_id] = task
+        self._queue.add(task, task_id, task_type, sort, stat_id)
 
         return True
 
@@ -278,16 +409,7 @@ class PendingTaskBatch(object):
             else:
                 sort = 0
 
-            task = self._tasks.get(task_type, {}).get(sort, {}).pop(task_id, None)
-
-            if task and not self._tasks[task_type][sort]:
-
-                del self._tasks[task_type][sort]
-
-                if not self._tasks[task_type]:
-                    del self._tasks[task_type]
-
-        return task
+        return self._queue.remove(task_id, task_type, sort)
 
     def clear(self, task_type=None):
         """
@@ -299,10 +421,7 @@ class PendingTaskBatch(object):
         if self._is_handling_tasks:
             return
 
-        (self._tasks if task_type is None else self._tasks.get(task_type, {})).clear()
-
-        if task_type in self._tasks and not self._tasks[task_type]:
-            del self._tasks[task_type]
+        self._queue.clear(task_type)
 
     def handle(self, task_types=None, sort_by_type=False):
         """
@@ -322,23 +441,10 @@ class PendingTaskBatch(object):
             return
 
         self._is_handling_tasks = True
+        handle_next = self._queue.handle_next
 
-        pending_tasks = self._tasks
-
-        if task_types is None:
-            task_types = pending_tasks.keys()
-
-        if sort_by_type:
-            sorted_tasks = [task for task_type in task_types for sort, tasks in
-                            sorted(pending_tasks.pop(task_type, {}).iteritems())
-                            for task in tasks.itervalues()]
-        else:
-            sorted_tasks = [task for sort, tasks in sorted([i for task_type in task_types
-                            for i in pending_tasks.pop(task_type, {}).iteritems()])
-                            for task in tasks.itervalues()]
-
-        for task in sorted_tasks:
-            task()
+        while handle_next(task_types, sort_by_type) is not None:
+            pass
 
         self._is_handling_tasks = False
 
@@ -385,7 +491,7 @@ class PendingTasks(object):
     @classmethod
     def remove(cls, task_id, task_type="", sort=None, batch_id=""):
 
-        return cls._batches[batch_id].remove(cls, task_id, task_type, sort)
+        return cls._batches[batch_id].remove(task_id, task_type, sort)
 
     @classmethod
     def clear(cls, task_type=None, batch_id=""):
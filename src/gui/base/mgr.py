@@ -51,7 +51,15 @@ class GUIManager(object):
 
         task_handler = cls._task_handlers.get(task_id, cls._default_task_handler)
 
-        return task_handler(*args, **kwargs)
+        if not FrameProfiler.enabled:
+            return task_handler(*args, **kwargs)
+
+        FrameProfiler.begin("do " + task_id, "GUI")
+
+        try:
+            return task_handler(*args, **kwargs)
+        finally:
+            FrameProfiler.end()
 
     @classmethod
     def expose(cls, data_id, retriever):
@@ -182,6 +190,16 @@ class GUIManager(object):
 
         """
 
+        # profiling spans are named after the task, since many unrelated task
+        # functions share the same name
+        if isinstance(args[0], (int, float)):
+            delay, func = args[:2]
+            task_name = args[2] if len(args) > 2 else kwargs.get("name")
+            args = (delay, FrameProfiler.wrap_task(func, "GUI", task_name)) + args[2:]
+        else:
+            task_name = args[1] if len(args) > 1 else kwargs.get("name")
+            args = (FrameProfiler.wrap_task(args[0], "GUI", task_name),) + args[1:]
+
         if isinstance(args[0], (int, float)) or "delayTime" in kwargs:
             cls._task_mgr.do_method_later(*args, **kwargs)
         else:
@@ -191,7 +209,9 @@ class GUIManager(object):
     def do_next_frame(cls, *args, **kwargs):
         """ Convenience wrapper around ShowBase.task_mgr.do_method_later(0., ...) """
 
-        cls._task_mgr.do_method_later(0., *args, **kwargs)
+        task_name = args[1] if len(args) > 1 else kwargs.get("name")
+        func = FrameProfiler.wrap_task(args[0], "GUI", task_name)
+        cls._task_mgr.do_method_later(0., func, *args[1:], **kwargs)
 
     @classmethod
     def remove_task(cls, task_name):
@@ -305,15 +305,50 @@ class Widget(object):
         return self._sizer.get_size() if self._sizer else self._size
 
     def update_images(self, recurse=True, size=None):
+        """
+        Update the images of all states of this widget, using the given size or
+        the current size.
+        These images are shared with other widgets with the same graphics and
+        size, so they should not be modified directly; use get_writable_image()
+        to obtain a private copy.
+
+        """
 
         width, height = self.get_size() if size is None else size
 
         if not (width and height):
             return
 
+        images = self._images
+        stretch_dir = self._stretch_dir
+
+        for state, part_rows in self._gfx_data.iteritems():
+
+            if not part_rows:
+                images[state] = None
+                continue
+
+            # the inner borders are part of the key, as these are derived from the
+            # graphics of just one of the states, not necessarily the current one
+            key = (tuple(tuple(part_row) for part_row in part_rows), stretch_dir,
+                   self._gfx_inner_borders, width, height)
+            img = SkinImageCache.get(key)
+
+            if img is None:
+                img = self.__create_image(part_rows, width, height)
+                SkinImageCache.add(key, img)
+
+            images[state] = img
+
+        if self._sizer and recurse:
+            self._sizer.update_images()
+
+        return images
+
+    def __create_image(self, part_rows, width, height):
+
         tex_atlas = TextureAtlas["image"]
         tex_atlas_regions = TextureAtlas["regions"]
-        images = self._images
         l, r, b, t = self._gfx_inner_borders
         borders_h = l + r
         borders_v = b + t
@@ -337,55 +372,55 @@ class Widget(object):
 
             return scaled_img
 
-        for state, part_rows in self._gfx_data.iteritems():
+        img = PNMImage(width, height, 4)
+        offset_y = 0
+        i_middle = len(part_rows) // 2
 
-            if not part_rows:
-                images[state] = None
-                continue
+        for i, part_row in enumerate(part_rows):
 
-            img = PNMImage(width, height, 4)
-            images[state] = img
+            j_middle = len(part_row) // 2
+            offset_x = 0
 
-            offset_y = 0
-            i_middle = len(part_rows) // 2
+            for j, part_id in enumerate(part_row):
 
-            for i, part_row in enumerate(part_rows):
+                x, y, w, h = tex_atlas_regions[part_id]
 
-                j_middle = len(part_row) // 2
-                offset_x = 0
+                if stretch_dir == "both" and i == i_middle and j == j_middle:
+                    scaled_w = width - borders_h
+                    scaled_h = height - borders_v
+                    center_img = create_center_image(x, y, w, h, scaled_w, scaled_h)
+                    img.copy_sub_image(center_img, offset_x, offset_y, 0, 0)
+                    w = scaled_w
+                    h = scaled_h
+                elif stretch_dir in ("both", "horizontal") and j == j_middle:
+                    scaled_w = width - borders_h
+                    center_img = create_center_image(x, y, w, h, scaled_w, h)
+                    img.copy_sub_image(center_img, offset_x, offset_y, 0, 0)
+                    w = scaled_w
+                elif stretch_dir in ("both", "vertical") and i == i_middle:
+                    scaled_h = height - borders_v
+                    center_img = create_center_image(x, y, w, h, w, scaled_h)
+                    img.copy_sub_image(center_img, offset_x, offset_y, 0, 0)
+                    h = scaled_h
+                else:
+                    img.copy_sub_image(tex_atlas, offset_x, offset_y, x, y, w, h)
 
-                for j, part_id in enumerate(part_row):
+                offset_x += w
 
-                    x, y, w, h = tex_atlas_regions[part_id]
+            offset_y += h
 
-                    if stretch_dir == "both" and i == i_middle and j == j_middle:
-                        scaled_w = width - borders_h
-                        scaled_h = height - borders_v
-                        center_img = create_center_image(x, y, w, h, scaled_w, scaled_h)
-                        img.copy_sub_image(center_img, offset_x, offset_y, 0, 0)
-                        w = scaled_w
-                        h = scaled_h
-                    elif stretch_dir in ("both", "horizontal") and j == j_middle:
-                        scaled_w = width - borders_h
-                        center_img = create_center_image(x, y, w, h, scaled_w, h)
-                        img.copy_sub_image(center_img, offset_x, offset_y, 0, 0)
-                        w = scaled_w
-                    elif stretch_dir in ("both", "vertical") and i == i_middle:
-                        scaled_h = height - borders_v
-                        center_img = create_center_image(x, y, w, h, w, scaled_h)
-                        img.copy_sub_image(center_img, offset_x, offset_y, 0, 0)
-                        h = scaled_h
-                    else:
-                        img.copy_sub_image(tex_atlas, offset_x, offset_y, x, y, w, h)
-
-                    offset_x += w
-
-                offset_y += h
+        return img
 
-        if self._sizer and recurse:
-            self._sizer.update_images()
+    def get_writable_image(self, state):
+        """
+        Replace the (possibly shared) image for the given state with a private copy
+        and return it, so it can be modified.
 
-        return images
+        """
+
+        self._images[state] = image = PNMImage(self._images[state])
+
+        return image
 
     def get_image(self, state=None, composed=True):
 
@@ -566,8 +601,16 @@ class Widget(object):
     def on_right_up(self): pass
 
 
+# A WidgetCard composes the images of its widgets into a single image that is
+# loaded into the texture of a quad. When the image of a widget changes, only
+# the corresponding region of the composed image is replaced and marked as
+# dirty; just before the next frame is rendered, the dirty regions of all cards
+# are written into their textures, instead of reloading the entire image.
 class WidgetCard(object):
 
+    # cards with dirty texture regions
+    _dirty_cards = set()
+
     def __init__(self, widget_type, parent=None, stretch_dir=""):
 
         self._type = "widget"
@@ -585,11 +628,16 @@ class WidgetCard(object):
         tex.set_minfilter(SamplerState.FT_nearest)
         tex.set_magfilter(SamplerState.FT_nearest)
         self._image = None
+        # list of (left, top, right, bottom) tuples, in image coordinates
+        self._dirty_rects = []
         self._mouse_region = None
         self._outer_borders = (0, 0, 0, 0)
 
     def destroy(self):
 
+        WidgetCard._dirty_cards.discard(self)
+        self._dirty_rects = []
+
         if self._node:
             self._node.remove_node()
             self._node = None
@@ -781,10 +829,111 @@ class WidgetCard(object):
         x += offset_x
         y += offset_y
         img.copy_sub_image(sub_image, x, y, 0, 0, width, height)
-        self._tex.load(img)
+        self.add_dirty_region(x, y, width, height)
 
         return True
 
+    def add_dirty_region(self, x, y, width, height):
+        """
+        Mark the given region of the composed image as changed, so the texture can
+        be updated accordingly before the next frame is rendered.
+        Overlapping or adjacent regions are merged.
+
+        """
+
+        l, t, r, b = x, y, x + width, y + height
+        rects = self._dirty_rects
+        merged = True
+
+        while merged:
+
+            merged = False
+
+            for rect in rects:
+
+                l2, t2, r2, b2 = rect
+
+                if l <= r2 and l2 <= r and t <= b2 and t2 <= b:
+                    rects.remove(rect)
+                    l, t, r, b = min(l, l2), min(t, t2), max(r, r2), max(b, b2)
+                    merged = True
+                    break
+
+        rects.append((l, t, r, b))
+        WidgetCard._dirty_cards.add(self)
+
+    def get_texture_offset(self):
+        """
+        Return the position within the composed image of the part that is loaded
+        into the texture.
+
+        """
+
+        return (0, 0)
+
+    def update_texture(self):
+        """
+        Write the dirty regions of the composed image into the texture.
+        If those regions cover at least half of the texture, the entire image is
+        reloaded instead.
+
+        """
+
+        rects = self._dirty_rects
+
+        if not rects:
+            return
+
+        self._dirty_rects = []
+        img = self._image
+        tex = self._tex
+
+        if not (img and tex.has_ram_image()):
+            return
+
+        w_img = img.get_x_size()
+        h_img = img.get_y_size()
+        w_tex = tex.get_x_size()
+        h_tex = tex.get_y_size()
+        x_min, y_min = self.get_texture_offset()
+        x_max = min(x_min + w_tex, w_img)
+        y_max = min(y_min + h_tex, h_img)
+        regions = []
+        area = 0
+
+        for l, t, r, b in rects:
+
+            l = max(l, x_min)
+            t = max(t, y_min)
+            r = min(r, x_max)
+            b = min(b, y_max)
+
+            if l < r and t < b:
+                regions.append((l, t, r - l, b - t))
+                area += (r - l) * (b - t)
+
+        if (x_min, y_min) == (0, 0) and (w_img, h_img) == (w_tex, h_tex) and area * 2 >= w_tex * h_tex:
+            tex.load(img)
+            return
+
+        for x, y, w, h in regions:
+            sub_image = PNMImage(w, h, img.get_num_channels())
+            sub_image.copy_sub_image(img, 0, 0, x, y, w, h)
+            tex.load_sub_image(sub_image, x - x_min, y - y_min)
+
+    @staticmethod
+    def update_dirty_textures():
+
+        cards = WidgetCard._dirty_cards
+
+        if not cards:
+            return
+
+        WidgetCard._dirty_cards = set()
+
+        for card in cards:
+            card.update_texture()
+
     def get_texture(self):
 
         return self._tex
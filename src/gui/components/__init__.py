@@ -626,7 +626,7 @@ class Components(object):
         elif update_type == "set_rate":
             self._progress_dialog.set_rate(arg1)
         elif update_type == "advance":
-            self._progress_dialog.advance()
+            self._progress_dialog.advance(1 if arg1 is None else arg1)
         elif update_type == "end":
             self._progress_dialog.close(answer="yes")
 
@@ -644,6 +644,7 @@ class Components(object):
             Dialog.hide_dialogs()
             fps_meter_display_region = GlobalData["fps_meter_display_region"]
             fps_meter_display_region.set_active(False)
+            WidgetCard.update_dirty_textures()
             base = Mgr.get("base")
             base.graphicsEngine.render_frame()
             tex = base.win.get_screenshot()
@@ -2,6 +2,7 @@ from ..dialog import *
 from ..button import Button
 from ..menu import Menu
 from ..icon import LayeredIcon
+from bisect import bisect_left, bisect_right
 
 
 class ExpandButton(Button):
@@ -43,7 +44,7 @@ class TimelineButton(Button):
 
         cls._ref_node.set_pos(pos)
 
-    def __init__(self, parent, entries, commands):
+    def __init__(self, parent, entries, commands, checked_entry):
 
         Button.__init__(self, parent, self._gfx, "", "", "Choose timeline", self.__show_menu)
 
@@ -59,7 +60,7 @@ class TimelineButton(Button):
             text = timestamp + "  |  " + descr_start
             menu.add(entry, text, command, item_type="radio")
 
-        menu.check_radio_item(entries[0])
+        menu.check_radio_item(checked_entry)
         menu.update()
 
         if not self._menu_offsets:
@@ -88,7 +89,7 @@ class TimelineButton(Button):
     def __show_menu(self):
 
         pane = self.get_ancestor("history_pane")
-        pane.set_clicked_entry(self.get_parent())
+        pane.set_clicked_entry(self.get_parent().get_entry())
         self.set_active()
         x, y = self.get_pos(ref_node=self._ref_node)
         offset_x, offset_y = self._menu_offsets["bottom"]
@@ -99,95 +100,55 @@ class TimelineButton(Button):
         self._menu.show(pos, alt_pos)
 
 
-class HistoryEntry(Widget):
+# The following class holds the state of a history event as shown in the history pane.
+# Only the entries within the currently laid out part of the pane are represented by
+# a widget (a HistoryEntryWidget), which is reused for other entries as the pane is
+# scrolled; any change to the state of an entry is passed on to its widget, if any.
+class HistoryEntry(object):
 
-    def __init__(self, parent, event, index, is_on):
-
-        Widget.__init__(self, "hist_entry", parent, gfx_data={}, stretch_dir="both")
-
-        sort = parent.get_sort() + 1
-        self._sort = sort
-        self.get_mouse_region().set_sort(sort)
+    def __init__(self, pane, panel, event, index, is_on):
 
+        self._pane = pane
+        self._panel = panel
         self._event = event
         self._index = index
         self._is_on = is_on
         self._has_event_to_del = False
         self._has_event_to_merge = False
-        self._image = None
         self._is_selected = False
-        colors = Skin["colors"]
-        self._colors = {
-            "unselected": colors["history_entry_unselected{}".format("_alt" if index % 2 else "")][:3],
-            "selected": colors["history_entry_selected{}".format("_alt" if index % 2 else "")][:3]
-        }
-        timestamp = event.get_timestamp()
-        sizer = Sizer("horizontal")
-        self.set_sizer(sizer)
-        self._subsizer = subsizer = Sizer("horizontal")
-        subsizer.set_default_size((260, 0))
-        sizer.add(subsizer)
-        icon_ids = ["icon_hist_entry_off", "icon_hist_entry_on", "icon_hist_entry_merge",
-                    "icon_hist_entry_delete"]
-        self._icon = icon = LayeredIcon(self, icon_ids)
+        self._is_expanded = False
+        self._widget = None
 
-        if is_on:
-            icon.show_icon("icon_hist_entry_on", True)
-            icon.show_icon("icon_hist_entry_off", False, update=True)
-
-        borders = (10, 0, 6, 6)
-        subsizer.add(icon, alignment="center_v", borders=borders)
-        text = DialogText(self, timestamp)
-        borders = (10, 0, 6, 6)
-        subsizer.add(text, alignment="center_v", borders=borders)
-        subsizer.add((0, 0), proportion=1.)
-        self._expand_btn = btn = ExpandButton(self)
-        btn.enable(event.get_description_line_count() > 1)
-        d = max(0, icon.get_size()[1] - btn.get_size()[1]) // 2
-        borders = (10, 0, 6 + d, 6 + d)
-        sizer.add(btn, borders=borders)
-        descr = event.get_description_start()
-        self._description = text = DialogText(self, descr)
-        milestone_text = Skin["text"]["milestone"]
-        self._text_attribs = {
-            "dialog": {"font": text.get_font(), "color": text.get_color()},
-            "milestone": {"font": milestone_text["font"], "color": milestone_text["color"]}
-        }
-
-        if event.is_milestone():
-            text_attr = self._text_attribs["milestone"]
-            text = self._description
-            text.set_font(text_attr["font"], update=False)
-            text.set_color(text_attr["color"])
+    def destroy(self):
 
-        borders = (10, 10, 6, 6)
-        sizer.add(text, alignment="center_v", borders=borders)
+        self._pane = None
+        self._panel = None
+        self._widget = None
 
-    def get_sort(self):
+    def get_parent(self):
 
-        return self._sort
+        return self._panel
 
     def get_event(self):
 
         return self._event
 
-    def get_expand_button(self):
+    def get_index(self):
 
-        return self._expand_btn
+        return self._index
 
-    def add_timeline_button(self, entries, commands):
+    def set_widget(self, widget):
 
-        btn = TimelineButton(self, entries, commands)
-        self._subsizer.add(btn, alignment="center_v")
+        self._widget = widget
 
-    def add_timeline_item(self, item):
+    def get_widget(self):
 
-        self._subsizer.add_item(item)
-        item.get_object().set_parent(self)
+        return self._widget
 
-    def pop_timeline_item(self):
+    def __update_widget(self):
 
-        return self._subsizer.pop_item()
+        if self._widget:
+            self._widget.update_state()
 
     def set_selected(self, is_selected=True):
 
@@ -200,19 +161,12 @@ class HistoryEntry(Widget):
         if is_on and self._has_event_to_del:
 
             self._has_event_to_del = False
-            self._icon.show_icon("icon_hist_entry_delete", False)
-            menu = self.get_ancestor("dialog").get_rejected_history_button().get_menu()
+            menu = self._pane.get_dialog().get_rejected_history_button().get_menu()
 
             if self in menu.get_items():
                 menu.remove(self, destroy=True, update=True)
 
-        self._icon.show_icon("icon_hist_entry_on", is_on)
-        self._icon.show_icon("icon_hist_entry_off", not is_on, update=True)
-        self.update_images()
-        w, h = self.get_size()
-
-        if not self.is_hidden():
-            self.get_card().copy_sub_image(self, self.get_image(), w, h, 0, 0)
+        self.__update_widget()
 
     def is_selected(self):
 
@@ -228,17 +182,10 @@ class HistoryEntry(Widget):
             return False
 
         if reject and self._has_event_to_merge:
-            self._icon.show_icon("icon_hist_entry_merge", False)
             self._has_event_to_merge = False
 
         self._has_event_to_del = reject
-        self._icon.show_icon("icon_hist_entry_delete", reject)
-        self._icon.update()
-        self.update_images()
-        w, h = self.get_size()
-
-        if not self.is_hidden():
-            self.get_card().copy_sub_image(self, self.get_image(), w, h, 0, 0)
+        self.__update_widget()
 
         return True
 
@@ -252,12 +199,7 @@ class HistoryEntry(Widget):
             return False
 
         self._has_event_to_merge = merge
-        self._icon.show_icon("icon_hist_entry_merge", merge, update=True)
-        self.update_images()
-        w, h = self.get_size()
-
-        if not self.is_hidden():
-            self.get_card().copy_sub_image(self, self.get_image(), w, h, 0, 0)
+        self.__update_widget()
 
         return True
 
@@ -265,59 +207,163 @@ class HistoryEntry(Widget):
 
         return self._has_event_to_merge
 
-    def update_description(self):
+    def is_expanded(self):
 
-        event = self._event
-        self._expand_btn.enable(event.get_description_line_count() > 1)
-        expand = self._expand_btn.is_active()
-        text = event.get_full_description() if expand else event.get_description_start()
-        descr = self._description
+        return self._is_expanded
 
-        if descr.set_text(text):
+    def update_description(self):
 
-            descr.get_sizer_item().get_sizer().set_min_size_stale()
-            self.get_ancestor("dialog").update_layout()
-            item = self._subsizer.get_items()[-1]
+        if self._event.get_description_line_count() == 1:
+            self._is_expanded = False
 
-            if item.get_type() == "widget":
-                menu = item.get_object().get_menu()
-                timestamp = event.get_timestamp()
-                text = timestamp + "  |  " + event.get_description_start()
-                menu.set_item_text(self, text, update=True)
+        self._pane.update_entry_layout(self)
 
     def expand_description(self, expand=True, update=True):
 
-        event = self._event
-        text = event.get_full_description() if expand else event.get_description_start()
-        descr = self._description
-
-        if descr.set_text(text):
+        if self._is_expanded == expand:
+            return
 
-            descr.get_sizer_item().get_sizer().set_min_size_stale()
+        self._is_expanded = expand
 
-            if update:
-                self.get_ancestor("dialog").update_layout()
+        if update:
+            self._pane.update_entry_layout(self)
 
     def toggle_milestone(self):
 
         is_milestone = not self._event.is_milestone()
         self._event.set_as_milestone(is_milestone)
-        text_attr = self._text_attribs["milestone" if is_milestone else "dialog"]
+        self._pane.update_entry_layout(self)
+
+
+class HistoryEntryWidget(Widget):
+
+    def __init__(self, pane):
+
+        Widget.__init__(self, "hist_entry", pane, gfx_data={}, stretch_dir="both", hidden=True)
+
+        self.get_node().reparent_to(pane.get_widget_root_node())
+
+        sort = pane.get_sort() + 1
+        self._sort = sort
+        self.get_mouse_region().set_sort(sort)
+
+        self._entry = None
+        self._image = None
+        sizer = Sizer("horizontal")
+        self.set_sizer(sizer)
+        self._subsizer = subsizer = Sizer("horizontal")
+        subsizer.set_default_size((260, 0))
+        sizer.add(subsizer)
+        icon_ids = ["icon_hist_entry_off", "icon_hist_entry_on", "icon_hist_entry_merge",
+                    "icon_hist_entry_delete"]
+        self._icon = icon = LayeredIcon(self, icon_ids)
+        borders = (10, 0, 6, 6)
+        subsizer.add(icon, alignment="center_v", borders=borders)
+        self._timestamp = text = DialogText(self, " ")
+        borders = (10, 0, 6, 6)
+        subsizer.add(text, alignment="center_v", borders=borders)
+        subsizer.add((0, 0), proportion=1.)
+        self._timeline_btn = None
+        self._expand_btn = btn = ExpandButton(self)
+        d = max(0, icon.get_size()[1] - btn.get_size()[1]) // 2
+        borders = (10, 0, 6 + d, 6 + d)
+        sizer.add(btn, borders=borders)
+        self._description = text = DialogText(self, " ")
+        milestone_text = Skin["text"]["milestone"]
+        self._text_attribs = {
+            "dialog": {"font": text.get_font(), "color": text.get_color()},
+            "milestone": {"font": milestone_text["font"], "color": milestone_text["color"]}
+        }
+        borders = (10, 10, 6, 6)
+        sizer.add(text, alignment="center_v", borders=borders)
+
+    def destroy(self):
+
+        Widget.destroy(self)
+
+        self._entry = None
+        self._timeline_btn = None
+
+    def get_sort(self):
+
+        return self._sort
+
+    def set_entry(self, entry):
+
+        self._entry = entry
+
+        if not entry:
+            return
+
+        event = entry.get_event()
+        self._timestamp.set_text(event.get_timestamp())
+        text_attr = self._text_attribs["milestone" if event.is_milestone() else "dialog"]
         descr = self._description
         descr.set_font(text_attr["font"], update=False)
-        descr.set_color(text_attr["color"])
-        descr.get_sizer_item().get_sizer().set_min_size_stale()
-        self.get_ancestor("dialog").update_layout()
+        descr.set_color(text_attr["color"], update=False)
+        expand = entry.is_expanded()
+        text = event.get_full_description() if expand else event.get_description_start()
+        descr.set_text(text if text else " ", force=True)
+        btn = self._expand_btn
+        btn.enable(event.get_description_line_count() > 1)
+        btn.set_active(expand)
+        subsizer = self._subsizer
+
+        if self._timeline_btn:
+            subsizer.remove_item(self._timeline_btn.get_sizer_item(), destroy=True)
+            self._timeline_btn = None
+
+        timeline_data = self.get_parent().get_timeline_data(entry)
+
+        if timeline_data:
+            entries, commands = timeline_data
+            self._timeline_btn = btn = TimelineButton(self, entries, commands, entry)
+            subsizer.add(btn, alignment="center_v")
+
+        self.__update_icon()
+        subsizer.set_min_size_stale()
+        self.get_sizer().set_min_size_stale()
+
+    def get_entry(self):
+
+        return self._entry
+
+    def __update_icon(self):
+
+        entry = self._entry
+        icon = self._icon
+        is_on = entry.is_on()
+        icon.show_icon("icon_hist_entry_on", is_on)
+        icon.show_icon("icon_hist_entry_off", not is_on)
+        icon.show_icon("icon_hist_entry_merge", entry.has_event_to_merge())
+        icon.show_icon("icon_hist_entry_delete", entry.has_rejected_event())
+        icon.update()
+
+    def update_state(self):
+
+        self.__update_icon()
+        self.update_images()
+        w, h = self.get_size()
+
+        if not self.is_hidden():
+            self.get_card().copy_sub_image(self, self.get_image(), w, h, 0, 0)
+
+    def expand_description(self, expand=True):
+
+        self._entry.expand_description(expand)
 
     def update_images(self, recurse=True, size=None):
 
         w, h = self.get_size()
+        entry = self._entry
         self._image = image = PNMImage(w, h, 4)
-        image.fill(*self._colors["selected" if self._is_selected else "unselected"])
+        state = "selected" if entry.is_selected() else "unselected"
+        color_id = "history_entry_{}{}".format(state, "_alt" if entry.get_index() % 2 else "")
+        image.fill(*Skin["colors"][color_id][:3])
         image.alpha_fill(1.)
-        pane = self.get_ancestor("history_pane")
+        pane = self.get_parent()
 
-        if pane.get_current_entry() is self:
+        if pane.get_current_entry() is entry:
             painter = PNMPainter(image)
             pen = PNMBrush.make_pixel((0., 0., 0., 1.))
             fill = PNMBrush.make_transparent()
@@ -339,8 +385,8 @@ class HistoryEntry(Widget):
 
     def on_left_down(self):
 
-        pane = self.get_ancestor("history_pane")
-        pane.set_clicked_entry(self)
+        pane = self.get_parent()
+        pane.set_clicked_entry(self._entry)
         ctrl_down = Mgr.get("mouse_watcher").is_button_down(KeyboardButton.control())
         shift_down = Mgr.get("mouse_watcher").is_button_down(KeyboardButton.shift())
 
@@ -354,9 +400,9 @@ class HistoryEntry(Widget):
 
     def on_right_down(self):
 
-        pane = self.get_ancestor("history_pane")
-        pane.set_clicked_entry(self)
-        pane.show_menu(self)
+        pane = self.get_parent()
+        pane.set_clicked_entry(self._entry)
+        pane.show_menu(self._entry)
 
 
 class StartPanel(object):
@@ -395,46 +441,35 @@ class StartPanel(object):
 
         return []
 
-    def show(self): pass
-
-    def hide(self): pass
-
-
-class HistoryPanel(Widget):
 
-    def __init__(self, parent, prev_panel, events, entry_offset, past):
+class HistoryPanel(object):
 
-        Widget.__init__(self, "history_panel", parent, gfx_data={}, stretch_dir="both",
-                        has_mouse_region=False, hidden=True)
-
-        self.get_node().reparent_to(parent.get_widget_root_node())
+    def __init__(self, pane, prev_panel, events, entry_offset, past):
 
         self._prev_panel = prev_panel
         self._prev_panels = prev_panel.get_previous_panels() + [prev_panel] if prev_panel else []
         self._next_panel = None
         self._next_panels = []
         self._entries = entries = []
-
-        sizer = Sizer("vertical")
-        self.set_sizer(sizer)
+        current_time_id = pane.get_current_time_id()
 
         for i, event in enumerate(events):
 
-            is_current_entry = event.get_time_id() == parent.get_current_time_id()
+            is_current_entry = event.get_time_id() == current_time_id
             is_on = is_current_entry or event in past
-            entry = HistoryEntry(self, event, i + entry_offset, is_on)
+            entry = HistoryEntry(pane, self, event, i + entry_offset, is_on)
             entries.append(entry)
-            sizer.add(entry, expand=True, index=0)
 
             if event.is_milestone():
-                parent.add_milestone(entry)
+                pane.add_milestone(entry, update=False)
 
             if is_current_entry:
-                parent.set_current_entry(entry)
+                pane.set_current_entry(entry)
 
     def destroy(self):
 
-        Widget.destroy(self)
+        for entry in self._entries:
+            entry.destroy()
 
         self._prev_panel = None
         self._prev_panels = []
@@ -442,40 +477,6 @@ class HistoryPanel(Widget):
         self._next_panels = []
         self._entries = []
 
-    def add_timeline_button(self, entries, commands):
-
-        entry = self.get_sizer().get_items()[-1].get_object()
-        entry.add_timeline_button(entries, commands)
-
-    def add_timeline_item(self, item):
-
-        entry = self.get_sizer().get_items()[-1].get_object()
-        entry.add_timeline_item(item)
-
-    def pop_timeline_item(self):
-
-        entry = self.get_sizer().get_items()[-1].get_object()
-        return entry.pop_timeline_item()
-
-    def get_sort(self):
-
-        return self.get_parent().get_sort()
-
-    def update_images(self, recurse=True, size=None):
-
-        if recurse:
-            self.get_sizer().update_images()
-
-    def get_image(self, state=None, composed=True):
-
-        w, h = self.get_size()
-        image = PNMImage(w, h, 4)
-
-        if composed:
-            image = self.get_sizer().get_composed_image(image)
-
-        return image
-
     def get_previous_panel(self):
 
         return self._prev_panel
@@ -505,6 +506,22 @@ class HistoryPane(DialogScrollPane):
 
     def __init__(self, dialog, history, past, current_time_id):
 
+        # Only the entries within (and around) the visible part of the pane are laid out;
+        # these are the entries in the "window" of rows, whose top lies at a virtual
+        # position equal to the contents offset.
+        # The window is frozen while the layout of the dialog is being updated, as well
+        # as until the dialog has been finalized.
+        self._rows = []
+        self._row_offsets = [0]
+        self._row_indices = {}
+        self._row_heights = {}
+        self._window = (0, 0)
+        self._contents_offset = 0
+        self._is_window_frozen = True
+        self._entry_widgets = []
+        self._free_entry_widgets = []
+        self._ref_entry_widget = None
+
         DialogScrollPane.__init__(self, dialog, "history_pane", "vertical", (700, 300), "both")
         mouse_watcher = self.get_mouse_watcher()
         mouse_watcher.remove_region(DialogInputField.get_mouse_region_mask())
@@ -522,6 +539,7 @@ class HistoryPane(DialogScrollPane):
         self._start_panel = start_panel = StartPanel()
         panel_data = [(None, history, 0)]
         self._panels = panels = []
+        past = set(past)
 
         while panel_data:
             prev_panel, event, event_index = panel_data.pop()
@@ -530,52 +548,20 @@ class HistoryPane(DialogScrollPane):
         if not panels:
             return
 
+        self.get_dialog().get_milestone_button().get_menu().update()
+
         for panel in panels:
             for entry in panel.get_entries():
                 entries[entry.get_event()] = entry
 
-        def get_command(panel):
-
-            def command():
-
-                clicked_panel = self._clicked_entry.get_parent()
-
-                if panel is not clicked_panel:
-                    item = clicked_panel.pop_timeline_item()
-                    self.__show_panel(clicked_panel, False)
-                    prev_panel = panel.get_previous_panel()
-                    prev_panel.set_next_panel(panel)
-                    self.__show_panel(panel)
-                    panel.add_timeline_item(item)
-                    scrollthumb = self.get_scrollthumb()
-                    h = self.get_sizer().get_virtual_size()[1] - scrollthumb.get_offset()
-                    self.get_dialog().update_layout()
-                    scrollthumb.set_offset(self.get_sizer().get_virtual_size()[1] - h)
-
-            return command
-
         for panel in [start_panel] + panels:
 
             next_panels = panel.get_next_panels()
 
             if next_panels:
+                panel.set_next_panel(next_panels[0])
 
-                panel0 = next_panels[0]
-                panel.set_next_panel(panel0)
-
-                if len(next_panels) > 1:
-
-                    entries = []
-                    commands = []
-
-                    for next_panel in next_panels:
-                        start_entry = next_panel.get_entries()[0]
-                        entries.append(start_entry)
-                        commands.append(get_command(next_panel))
-
-                    panel0.add_timeline_button(entries, commands)
-
-        self.__show_panel(start_panel)
+        self.__update_rows()
 
         if not self._start_entry:
             self._start_entry = start_panel.get_next_panel().get_entries()[0]
@@ -632,7 +618,6 @@ class HistoryPane(DialogScrollPane):
         if prev_panel:
             panel = HistoryPanel(self, prev_panel, events, event_index % 2, past)
             self._panels.append(panel)
-            self.get_sizer().add(panel, expand=True, index=0)
             next_panels = prev_panel.get_next_panels()
             next_panels.append(panel)
         else:
@@ -648,52 +633,266 @@ class HistoryPane(DialogScrollPane):
 
         root_node = self.get_widget_root_node()
 
-        for panel in self._panels:
-            if not panel.is_hidden():
-                x, y = panel.get_pos(ref_node=root_node)
-                offset_x, offset_y = panel.get_image_offset()
-                pane_image.copy_sub_image(panel.get_image(), x + offset_x, y + offset_y, 0, 0)
+        for widget in self._entry_widgets:
+            x, y = widget.get_pos(ref_node=root_node)
+            offset_x, offset_y = widget.get_image_offset()
+            pane_image.copy_sub_image(widget.get_image(), x + offset_x, y + offset_y, 0, 0)
+
+    def _get_contents_offset(self):
+
+        return self._contents_offset
+
+    def get_virtual_size(self):
+
+        w, h = self.get_sizer().get_virtual_size()
+
+        return (w, max(h, self._row_offsets[-1]))
 
     def destroy(self):
 
+        for widget in self._free_entry_widgets:
+            widget.destroy()
+
+        if self._ref_entry_widget:
+            self._ref_entry_widget.destroy()
+
         DialogScrollPane.destroy(self)
 
+        self._rows = []
+        self._row_offsets = [0]
+        self._row_indices = {}
+        self._entry_widgets = []
+        self._free_entry_widgets = []
+        self._ref_entry_widget = None
         self._current_entry = None
+        self._start_entry = None
         self._clicked_entry = None
         self._selected_entry = None
         self._merge_start_entry = None
         self._entries = {}
         self._start_panel.destroy()
         self._start_panel = None
+
+        for panel in self._panels:
+            panel.destroy()
+
         self._panels = []
         self._menu.destroy()
         self._menu = None
 
+    def __create_entry_widget(self):
+
+        return HistoryEntryWidget(self)
+
+    def __get_row_height(self, entry):
+
+        # The height of an entry only depends on the number of lines of its description,
+        # the font of that description and the presence of a timeline button, so it can
+        # be computed once for every combination of these, using a reference widget.
+
+        event = entry.get_event()
+        line_count = event.get_description_line_count() if entry.is_expanded() else 1
+        key = (line_count, event.is_milestone(), self.__has_timeline_button(entry))
+        heights = self._row_heights
+
+        if key not in heights:
+
+            widget = self._ref_entry_widget
+
+            if not widget:
+                self._ref_entry_widget = widget = self.__create_entry_widget()
+
+            widget.set_entry(entry)
+            heights[key] = widget.get_sizer().update_min_size()[1]
+            widget.set_entry(None)
+
+        return heights[key]
+
+    def __update_rows(self):
+
+        # The rows of the pane are the entries of the current timeline, from top to bottom,
+        # i.e. from the most recent event to the oldest one.
+
+        rows = []
+        panel = self._start_panel.get_next_panel()
+
+        while panel:
+            rows.extend(panel.get_entries())
+            panel = panel.get_next_panel()
+
+        rows.reverse()
+        self._rows = rows
+        self._row_indices = dict((entry, i) for i, entry in enumerate(rows))
+        self._row_offsets = offsets = [0]
+        offset = 0
+
+        for entry in rows:
+            offset += self.__get_row_height(entry)
+            offsets.append(offset)
+
+    def __update_window(self, scroll_offset):
+
+        # Assign widgets to the entries in the rows around the given scroll offset, such that
+        # at least one page above and two pages below that offset are covered; widgets of
+        # entries that fall outside of this new window are reused for the entries that have
+        # come into view.
+        # The virtual position of the top of the window is returned.
+
+        page_size = self.get_scrollthumb().get_page_size()
+        offsets = self._row_offsets
+        rows = self._rows
+        start = max(0, bisect_right(offsets, scroll_offset - page_size) - 1)
+        end = bisect_left(offsets, scroll_offset + 2 * page_size)
+        end = min(len(rows), max(start + 1, end))
+        window_entries = rows[start:end]
+        sizer = self.get_sizer()
+        free_widgets = self._free_entry_widgets
+        widgets = {}
+
+        for widget in self._entry_widgets:
+            sizer.remove_item(widget.get_sizer_item())
+            widgets[widget.get_entry()] = widget
+
+        for entry in set(widgets).difference(window_entries):
+            widget = widgets.pop(entry)
+            widget.hide()
+            widget.set_entry(None)
+            entry.set_widget(None)
+            free_widgets.append(widget)
+
+        self._entry_widgets = entry_widgets = []
+
+        for entry in window_entries:
+
+            widget = widgets.get(entry)
+
+            if not widget:
+                widget = free_widgets.pop() if free_widgets else self.__create_entry_widget()
+                widget.set_entry(entry)
+                entry.set_widget(widget)
+                widget.show()
+
+            item = widget.get_sizer_item()
+
+            if item:
+                sizer.add_item(item)
+            else:
+                sizer.add(widget, expand=True)
+
+            entry_widgets.append(widget)
+
+        self._window = (start, end)
+        self._contents_offset = offsets[start]
+
+        return self._contents_offset
+
+    def __is_in_window(self, scroll_offset):
+
+        start, end = self._window
+        offsets = self._row_offsets
+        page_size = self.get_scrollthumb().get_page_size()
+
+        if scroll_offset < offsets[start]:
+            return False
+
+        return end == len(self._rows) or scroll_offset + page_size <= offsets[end]
+
+    def freeze_window(self, freeze=True):
+
+        self._is_window_frozen = freeze
+
+    def update_scroll_offset(self, scroll_offset):
+
+        if not (self._is_window_frozen or self.__is_in_window(scroll_offset)):
+
+            contents_offset = self._contents_offset
+            d_offset = self.__update_window(scroll_offset) - contents_offset
+            self.update_contents_layout()
+            root_node = self.get_widget_root_node()
+            root_node.set_z(root_node.get_z() - d_offset)
+
+        DialogScrollPane.update_scroll_offset(self, scroll_offset)
+
+    def __update_layout(self, scroll_offset=None):
+
+        scrollthumb = self.get_scrollthumb()
+
+        if scroll_offset is None:
+            scroll_offset = scrollthumb.get_offset()
+
+        page_size = scrollthumb.get_page_size()
+        h_virt = self._row_offsets[-1]
+        scroll_offset = max(0, min(scroll_offset, h_virt - min(h_virt, page_size)))
+        self.__update_window(scroll_offset)
+        self.get_dialog().update_layout()
+        scrollthumb.set_offset(scroll_offset)
+
+    def update_entry_layout(self, entry):
+
+        widget = entry.get_widget()
+
+        if widget:
+            widget.set_entry(entry)
+
+        self.__update_rows()
+        self.__update_layout()
+
+    def __has_timeline_button(self, entry):
+
+        panel = entry.get_parent()
+
+        if entry is not panel.get_entries()[0]:
+            return False
+
+        return len(panel.get_previous_panel().get_next_panels()) > 1
+
+    def __get_timeline_command(self, panel):
+
+        def command():
+
+            clicked_panel = self._clicked_entry.get_parent()
+
+            if panel is not clicked_panel:
+                panel.get_previous_panel().set_next_panel(panel)
+                h = self._row_offsets[-1] - self.get_scrollthumb().get_offset()
+                self.__update_rows()
+                self.__update_layout(self._row_offsets[-1] - h)
+
+        return command
+
+    def get_timeline_data(self, entry):
+
+        if not self.__has_timeline_button(entry):
+            return
+
+        next_panels = entry.get_parent().get_previous_panel().get_next_panels()
+        entries = [panel.get_entries()[0] for panel in next_panels]
+        commands = [self.__get_timeline_command(panel) for panel in next_panels]
+
+        return entries, commands
+
     def __jump_to_entry(self, entry):
 
-        self.__show_panel(self._start_panel, False)
         panel = entry.get_parent()
-        layout_stale = False
+        rows_stale = False
 
         for prev_panel in reversed(panel.get_previous_panels()):
 
             if prev_panel.get_next_panel() is not panel:
-                item = prev_panel.get_next_panel().pop_timeline_item()
-                panel.add_timeline_item(item)
                 prev_panel.set_next_panel(panel)
-                menu = item.get_object().get_menu()
-                menu.check_radio_item(panel.get_entries()[0])
-                layout_stale = True
+                rows_stale = True
 
             panel = prev_panel
 
-        self.__show_panel(self._start_panel)
+        if rows_stale:
+            self.__update_rows()
 
-        if layout_stale:
-            self.get_dialog().update_layout()
+        offset = self._row_offsets[self._row_indices[entry]]
 
-        offset = entry.get_pos(from_root=True)[1]
-        self.get_scrollthumb().set_offset(offset)
+        if rows_stale:
+            self.__update_layout(offset)
+        else:
+            self.get_scrollthumb().set_offset(offset)
 
     def __add_to_menu(self, menu, entry, update=True):
 
@@ -704,18 +903,6 @@ class HistoryPane(DialogScrollPane):
         command = lambda: self.__jump_to_entry(entry)
         menu.add(entry, text, command, update=update)
 
-    def __show_panel(self, panel, show=True):
-
-        panels = [panel]
-        next_panel = panel.get_next_panel()
-
-        while next_panel:
-            panels.append(next_panel)
-            next_panel = next_panel.get_next_panel()
-
-        for panel in panels:
-            panel.show() if show else panel.hide()
-
     def show_menu(self, entry):
 
         can_merge = self.__can_merge_event(entry)
@@ -844,10 +1031,10 @@ class HistoryPane(DialogScrollPane):
 
         self._misc_change = True
 
-    def add_milestone(self, entry):
+    def add_milestone(self, entry, update=True):
 
         menu = self.get_dialog().get_milestone_button().get_menu()
-        self.__add_to_menu(menu, entry)
+        self.__add_to_menu(menu, entry, update)
 
     def __toggle_milestone(self):
 
@@ -1263,17 +1450,14 @@ class HistoryPane(DialogScrollPane):
 
     def __expand_all_entries(self, expand=True):
 
-        panel = self._start_panel.get_next_panel()
-
-        while panel:
-
-            for entry in panel.get_entries():
-                entry.expand_description(expand, update=False)
-                entry.get_expand_button().set_active(expand)
+        for entry in self._rows:
+            entry.expand_description(expand, update=False)
 
-            panel = panel.get_next_panel()
+        for widget in self._entry_widgets:
+            widget.set_entry(widget.get_entry())
 
-        self.get_dialog().update_layout()
+        self.__update_rows()
+        self.__update_layout()
 
     def get_history_to_undo_redo(self):
 
@@ -1398,6 +1582,7 @@ class HistoryDialog(Dialog):
 
         self.finalize()
 
+        pane.freeze_window(False)
         pane.jump_to_current_entry()
 
     def __archive_history(self):
@@ -1451,8 +1636,11 @@ class HistoryDialog(Dialog):
 
     def update_layout(self):
 
-        self._hist_pane.reset_sub_image_index()
+        pane = self._hist_pane
+        pane.reset_sub_image_index()
+        pane.freeze_window()
         Dialog.update_layout(self)
+        pane.freeze_window(False)
 
     def update_widget_positions(self):
 
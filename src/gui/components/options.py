@@ -1,5 +1,6 @@
 from ..base import *
 from ..dialog import *
+from .profiler import FrameProfilerDisplay
 
 
 class OptionManager(object):
@@ -22,6 +23,13 @@ class OptionManager(object):
         command = self.__set_right_dock_side
         item = layout_menu.add("panels_left", "Control panels left", command, item_type="check")
         self._menu_items = {"ctrl_panels_side": item}
+        item = main_menu.add("profiler", "Frame profiler", item_type="submenu")
+        menu = item.get_submenu()
+        command = self.__toggle_frame_profiler
+        item = menu.add("profiler_show", "Show", command, item_type="check")
+        self._menu_items["profiler_show"] = item
+        menu.add("profiler_export", "Export trace...", self.__export_profiler_trace)
+        self._profiler_display = FrameProfilerDisplay()
 
     def setup(self):
 
@@ -34,6 +42,21 @@ class OptionManager(object):
         side = "right" if layout["right_dock"] == "left" else "left"
         Mgr.do("set_right_dock_side", side)
 
+    def __toggle_frame_profiler(self):
+
+        self._profiler_display.show(self._menu_items["profiler_show"].is_checked())
+
+    def __export_profiler_trace(self):
+
+        def on_yes(filename):
+
+            self._profiler_display.export_trace(filename)
+
+        FileDialog(title="Export frame profiler trace",
+                   ok_alias="Export", on_yes=on_yes, file_op="write",
+                   incr_filename=True, file_types=("Chrome traces|json", "All types|*"),
+                   default_filename="")
+
     def __reset_gui_layout(self):
 
         interface_id = GlobalData["active_interface"]
@@ -0,0 +1,92 @@
+from ..base import *
+
+
+# The following class shows a summary of the frame profiling data (kept by the
+# FrameProfiler) in the top left corner of the viewport, using a display region
+# of its own, on top of the GUI.
+class FrameProfilerDisplay(object):
+
+    _region_size = (400, 220)
+    _refresh_interval = .25
+
+    def __init__(self):
+
+        self._region = None
+        self._text_node = None
+        self._text_np = None
+        self._refresh_time = 0.
+
+    def __create_region(self):
+
+        base = Mgr.get("base")
+        w, h = self._region_size
+        cam_root = NodePath("profiler_cam_root")
+        cam = cam_root.attach_new_node(Camera("profiler_cam"))
+        lens = OrthographicLens()
+        lens.set_near(-10.)
+        lens.set_film_size(w, h)
+        lens.set_film_offset(w * .5, -h * .5)
+        cam.node().set_lens(lens)
+        cam.node().set_cull_bounds(OmniBoundingVolume())
+
+        self._text_node = text_node = TextNode("profiler_text")
+        text_node.set_text_color(1., 1., 1., 1.)
+        text_node.set_card_color(0., 0., 0., .6)
+        text_node.set_card_as_margin(4., 4., 4., 4.)
+        self._text_np = text_np = cam_root.attach_new_node(text_node)
+        text_np.set_pos(4., 0., -16.)
+        text_np.set_scale(12.)
+        text_np.set_depth_test(False)
+        text_np.set_depth_write(False)
+
+        self._region = region = base.win.make_display_region(0., 1., 0., 1.)
+        region.set_sort(10001)
+        region.set_clear_depth(1000.)
+        region.set_clear_depth_active(True)
+        region.set_camera(cam)
+
+    def __update_region(self):
+
+        w, h = Mgr.get("window_size")
+        w_r, h_r = self._region_size
+        l, r, b, t = GlobalData["viewport"]["frame"]
+        self._region.set_dimensions(l, min(r, l + 1. * w_r / w), max(b, t - 1. * h_r / h), t)
+
+    def __mark_frame(self, task):
+
+        FrameProfiler.start_frame()
+
+        if task.time >= self._refresh_time:
+            self._refresh_time = task.time + self._refresh_interval
+            self.__update_region()
+            self._text_node.set_text(FrameProfiler.get_frame_summary())
+
+        return task.cont
+
+    def show(self, show=True):
+
+        base = Mgr.get("base")
+
+        if show:
+
+            if not self._region:
+                self.__create_region()
+
+            self._refresh_time = 0.
+            self._text_node.set_text("")
+            self.__update_region()
+            self._region.set_active(True)
+            FrameProfiler.enable()
+            base.task_mgr.add(self.__mark_frame, "mark_profiler_frame", sort=-1000)
+
+        else:
+
+            base.task_mgr.remove("mark_profiler_frame")
+            FrameProfiler.enable(False)
+
+            if self._region:
+                self._region.set_active(False)
+
+    def export_trace(self, filename):
+
+        FrameProfiler.export_trace(filename)
@@ -2,7 +2,9 @@ from .dialog import *
 from .message_dialog import MessageDialog
 from ..menu import Menu
 from direct.stdpy.file import *
-from direct.stdpy.glob import *
+from direct.stdpy import threading
+from bisect import bisect_left, bisect_right
+from fnmatch import fnmatch
 
 
 def get_incremented_filename(filename, namestring):
@@ -371,11 +373,204 @@ class FileButtonInputField(DialogInputField):
         return self._field_borders
 
 
+# The following class lists the contents of a directory in a background thread (if
+# threading is supported), passing the names of the subdirectories and files on to
+# the main thread in batches, such that these can be shown while the scan is still
+# in progress.
+# Complete listings are cached per directory, for as long as the modification time
+# of the directory remains unchanged.
+class DirectoryScanner(object):
+
+    _batch_size = 256
+    _max_cache_size = 32
+    _cache = collections.OrderedDict()
+    _cache_lock = threading.Lock()
+    _count = 0
+
+    @classmethod
+    def __get_timestamp(cls, path):
+
+        vfile = VirtualFileSystem.get_global_ptr().get_file(Filename(path))
+
+        return vfile.get_timestamp() if vfile else None
+
+    @classmethod
+    def __get_cached_listing(cls, path, timestamp):
+
+        with cls._cache_lock:
+
+            listing = cls._cache.get(path)
+
+            if not listing:
+                return
+
+            if listing[0] != timestamp:
+                del cls._cache[path]
+                return
+
+            # move the listing to the end of the cache, marking it as most recently used
+            del cls._cache[path]
+            cls._cache[path] = listing
+
+        return listing[1:]
+
+    @classmethod
+    def __cache_listing(cls, path, timestamp, dir_names, file_names):
+
+        with cls._cache_lock:
+
+            cache = cls._cache
+            cache.pop(path, None)
+            cache[path] = (timestamp, dir_names, file_names)
+
+            while len(cache) > cls._max_cache_size:
+                cache.popitem(last=False)
+
+    @classmethod
+    def invalidate(cls, path):
+
+        with cls._cache_lock:
+            cls._cache.pop(path, None)
+
+    def __init__(self):
+
+        DirectoryScanner._count += 1
+        self._task_name = "process_directory_batches_{:d}".format(self._count)
+        self._lock = threading.Lock()
+        self._scan_id = 0
+        self._batches = []
+        self._on_batch = None
+
+    def __add_batch(self, scan_id, dir_names, file_names, is_complete=False):
+
+        with self._lock:
+
+            if scan_id != self._scan_id:
+                return False
+
+            self._batches.append((dir_names, file_names, is_complete))
+
+        return True
+
+    def __scan(self, path, scan_id, timestamp):
+
+        dirlist = VirtualFileSystem.get_global_ptr().scan_directory(Filename(path))
+        batch_size = self._batch_size
+        dir_names = []
+        file_names = []
+        batch_dir_names = []
+        batch_file_names = []
+
+        for item in (dirlist if dirlist else ()):
+
+            name = item.get_filename().get_basename()
+
+            if item.is_directory():
+                batch_dir_names.append(name)
+            else:
+                batch_file_names.append(name)
+
+            if len(batch_dir_names) + len(batch_file_names) == batch_size:
+
+                if not self.__add_batch(scan_id, batch_dir_names, batch_file_names):
+                    return
+
+                dir_names.extend(batch_dir_names)
+                file_names.extend(batch_file_names)
+                batch_dir_names = []
+                batch_file_names = []
+
+        dir_names.extend(batch_dir_names)
+        file_names.extend(batch_file_names)
+
+        if self.__add_batch(scan_id, batch_dir_names, batch_file_names, True):
+            self.__cache_listing(path, timestamp, dir_names, file_names)
+
+    def __process_batches(self, task=None):
+
+        with self._lock:
+            batches = self._batches
+            self._batches = []
+
+        dir_names = []
+        file_names = []
+        is_complete = False
+
+        for batch_dir_names, batch_file_names, is_complete in batches:
+            dir_names.extend(batch_dir_names)
+            file_names.extend(batch_file_names)
+
+        if batches:
+            self._on_batch(dir_names, file_names, is_complete)
+
+        if task:
+            return task.done if is_complete else task.cont
+
+    def scan(self, path, on_batch):
+        """
+        Start listing the contents of the directory with the given path.
+        The given callback is called with a list of subdirectory names, a list of
+        file names and a boolean indicating whether the scan is complete, every time
+        a new batch of names is available.
+
+        """
+
+        self.cancel()
+        self._on_batch = on_batch
+        timestamp = self.__get_timestamp(path)
+        listing = self.__get_cached_listing(path, timestamp)
+
+        if listing:
+            dir_names, file_names = listing
+            on_batch(dir_names, file_names, True)
+            return
+
+        scan_id = self._scan_id
+
+        if Thread.is_threading_supported():
+            thread = threading.Thread(target=self.__scan, args=(path, scan_id, timestamp),
+                                      name="directory_scanner")
+            thread.setDaemon(True)
+            thread.start()
+            Mgr.add_task(self.__process_batches, self._task_name)
+        else:
+            self.__scan(path, scan_id, timestamp)
+            self.__process_batches()
+
+    def cancel(self):
+
+        Mgr.remove_task(self._task_name)
+
+        with self._lock:
+            self._scan_id += 1
+            self._batches = []
+
+        self._on_batch = None
+
+
 class FilePane(DialogScrollPane):
 
     def __init__(self, dialog, path_handler, file_selection_handler, file_command, extensions,
                  default_filename):
 
+        # Only the file buttons within (and around) the visible part of the pane are
+        # created and laid out; these are the buttons in the "window" of columns, whose
+        # left side lies at a virtual position equal to the contents offset.
+        # The window is frozen while the layout of the pane is being updated, as well as
+        # until the dialog has been finalized.
+        self._dir_names = []
+        self._file_names = []
+        self._names = []
+        self._name_set = set()
+        self._btn_widths = {}
+        self._column_offsets = [0]
+        self._window = (0, 0)
+        self._contents_offset = 0
+        self._is_window_frozen = True
+        self._btns = {}
+        self._window_btns = []
+        self._scanner = DirectoryScanner()
+
         x, y, w, h = TextureAtlas["regions"]["file_button_normal_left"]
         height = h * Skin["options"]["file_row_count"]
         frame_client_size = (700, height)
@@ -392,8 +587,6 @@ class FilePane(DialogScrollPane):
         else:
             self._current_path = file_sys.get_cwd().get_fullpath()
 
-        self._btns = []
-
         def handler(value_id, value):
 
             if not self._filename_field.get_parent().is_directory():
@@ -405,13 +598,13 @@ class FilePane(DialogScrollPane):
         field.show_value("filename")
         field.set_scissor_effect(self.get_scissor_effect())
 
-        self.__update_directory_list(update_layout=False)
+        self.__update_directory_list()
 
     def _copy_widget_images(self, pane_image): 
 
         root_node = self.get_widget_root_node()
 
-        for btn in self._btns:
+        for btn in self._window_btns:
             x, y = btn.get_pos(ref_node=root_node)
             offset_x, offset_y = btn.get_image_offset()
             pane_image.copy_sub_image(btn.get_image(), x + offset_x, y + offset_y, 0, 0)
@@ -423,8 +616,24 @@ class FilePane(DialogScrollPane):
 
         return True
 
+    def _get_contents_offset(self):
+
+        return self._contents_offset
+
+    def get_virtual_size(self):
+
+        w, h = self.get_sizer().get_virtual_size()
+
+        return (max(w, self._column_offsets[-1]), h)
+
     def destroy(self):
 
+        self._scanner.cancel()
+        self.__clear_window()
+
+        for btn in self._btns.itervalues():
+            btn.destroy()
+
         DialogScrollPane.destroy(self)
 
         Mgr.remove_task("check_candidate_filebutton")
@@ -434,7 +643,8 @@ class FilePane(DialogScrollPane):
         self._file_command = None
         self._filename_field.destroy()
         self._filename_field = None
-        self._btns = None
+        self._btns = {}
+        self._window_btns = []
 
         FileButton.set_selected_filebutton(None)
 
@@ -442,59 +652,210 @@ class FilePane(DialogScrollPane):
 
         return self._filename_field
 
-    def __update_directory_list(self, update_layout=True):
+    def __get_button_width(self, name):
 
-        directory_path = self._current_path
-        filenames = []
+        widths = self._btn_widths
 
-        for ext in self._extensions.split(";"):
-            pattern = "*" if ext == "*" else "*.{}".format(ext)
-            names = glob(Filename(join(directory_path, pattern)).to_os_specific_w())
-            filenames.extend(Filename.from_os_specific_w(name).get_basename() for name in names
-                             if not Filename(name).is_directory())
+        if name not in widths:
+            font = Skin["text"]["file_button"]["font"]
+            regions = TextureAtlas["regions"]
+            x, y, w_l, h = regions["file_button_normal_left"]
+            x, y, w_r, h = regions["file_button_normal_right"]
+            widths[name] = font.calc_width(name) + w_l + w_r
 
-        dirlist = self._file_sys.scan_directory(directory_path)
+        return widths[name]
 
-        self._path_handler(directory_path)
-        subdirnames = []
+    def __update_columns(self):
 
-        if dirlist:
-            for item in dirlist:
-                if item.is_directory():
-                    subdirnames.append(item.get_filename().get_basename())
+        # The buttons are laid out in columns of a fixed number of rows, from left to
+        # right; the virtual position of the left side of each column is computed from
+        # the width of the longest name in the preceding columns, without the need to
+        # create any buttons.
 
-        self._btns = btns = []
-        sizer = self.get_sizer()
-        sizer.clear()
+        names = self._names = [(name, True) for name in self._dir_names]
+        names.extend((name, False) for name in self._file_names)
+        row_count = Skin["options"]["file_row_count"]
+        get_width = self.__get_button_width
+        self._column_offsets = offsets = [0]
+        offset = 0
 
-        FileButton.set_selected_filebutton(None)
+        for i in xrange(0, len(names), row_count):
+            offset += max(get_width(name) for name, is_dir in names[i:i+row_count])
+            offsets.append(offset)
 
-        f = lambda x, y: cmp(x.lower(), y.lower())
+    def __create_button(self, name, is_dir):
 
-        def get_command(dir_path):
+        if is_dir:
+            dir_path = join(self._current_path, name)
+            command = lambda: self.set_directory(dir_path)
+            return FileButton(self, name, command=command, is_dir=True)
 
-            return lambda: self.set_directory(dir_path)
+        return FileButton(self, name, self._file_selection_handler, self._file_command)
 
-        for name in sorted(subdirnames, cmp=f):
-            path = join(directory_path, name)
-            command = get_command(path)
-            btns.append(FileButton(self, name, command=command, is_dir=True))
+    def __clear_window(self):
 
-        for name in sorted(filenames, cmp=f):
-            btns.append(FileButton(self, name, self._file_selection_handler, self._file_command))
+        sizer = self.get_sizer()
 
-        count = Skin["options"]["file_row_count"]
+        for column_sizer_item in sizer.get_items():
+            column_sizer = column_sizer_item.get_object()
+            for item in column_sizer.get_items()[:]:
+                column_sizer.remove_item(item)
 
-        for column in (btns[i:i+count] for i in range(0, len(btns), count)):
+        sizer.clear()
+
+    def __update_window(self, scroll_offset):
+
+        # Lay out the buttons in the columns around the given scroll offset, such that
+        # at least one page to the left and two pages to the right of that offset are
+        # covered; buttons that have not come into view before are created now, while
+        # those that fall outside of this new window are hidden.
+        # The virtual position of the left side of the window is returned.
+
+        page_size = self.get_scrollthumb().get_page_size()
+        offsets = self._column_offsets
+        column_count = len(offsets) - 1
+        start = max(0, bisect_right(offsets, scroll_offset - page_size) - 1)
+        end = bisect_left(offsets, scroll_offset + 2 * page_size)
+        end = min(column_count, max(start + 1, end))
+        row_count = Skin["options"]["file_row_count"]
+        names = self._names[start * row_count:end * row_count]
+        sizer = self.get_sizer()
+        btns = self._btns
+        prev_window_btns = set(self._window_btns)
+        self._window_btns = window_btns = []
+        self.__clear_window()
+
+        for i in xrange(0, len(names), row_count):
 
             column_sizer = Sizer("vertical")
             sizer.add(column_sizer)
 
-            for btn in column:
+            for name, is_dir in names[i:i+row_count]:
+
+                btn = btns.get((name, is_dir))
+
+                if btn:
+                    if btn not in prev_window_btns:
+                        btn.show()
+                else:
+                    btn = btns[(name, is_dir)] = self.__create_button(name, is_dir)
+
                 column_sizer.add(btn, expand=True)
+                window_btns.append(btn)
+
+        for btn in prev_window_btns.difference(window_btns):
+            btn.hide()
+
+        self._window = (start, end)
+        self._contents_offset = offsets[start]
+
+        return self._contents_offset
+
+    def __is_in_window(self, scroll_offset):
 
-        if update_layout:
-            self.update_layout()
+        start, end = self._window
+        offsets = self._column_offsets
+        page_size = self.get_scrollthumb().get_page_size()
+
+        if scroll_offset < offsets[start]:
+            return False
+
+        return end == len(offsets) - 1 or scroll_offset + page_size <= offsets[end]
+
+    def freeze_window(self, freeze=True):
+
+        self._is_window_frozen = freeze
+
+        if not freeze:
+            scrollthumb = self.get_scrollthumb()
+            scrollthumb.set_offset(scrollthumb.get_offset())
+
+    def update_scroll_offset(self, scroll_offset):
+
+        if not (self._is_window_frozen or self.__is_in_window(scroll_offset)):
+
+            contents_offset = self._contents_offset
+            d_offset = self.__update_window(scroll_offset) - contents_offset
+            self.update_contents_layout()
+            root_node = self.get_widget_root_node()
+            root_node.set_x(root_node.get_x() + d_offset)
+
+        DialogScrollPane.update_scroll_offset(self, scroll_offset)
+
+    def __update_layout(self, scroll_offset=None):
+
+        scrollthumb = self.get_scrollthumb()
+
+        if scroll_offset is None:
+            scroll_offset = scrollthumb.get_offset()
+
+        page_size = scrollthumb.get_page_size()
+        w_virt = self._column_offsets[-1]
+        scroll_offset = max(0, min(scroll_offset, w_virt - min(w_virt, page_size)))
+        self.__update_window(scroll_offset)
+
+        if self._is_window_frozen:
+            return
+
+        self._is_window_frozen = True
+        self.update_layout()
+        self._is_window_frozen = False
+        scrollthumb.set_offset(scroll_offset)
+
+    def __filter_file_names(self, file_names):
+
+        # like glob, skip hidden files and match the names against the patterns derived
+        # from the current extensions
+
+        patterns = ["*" if ext == "*" else "*.{}".format(ext)
+                    for ext in self._extensions.split(";")]
+
+        return [name for name in file_names if not name.startswith(".")
+                and any(fnmatch(name, pattern) for pattern in patterns)]
+
+    def __add_names(self, dir_names, file_names, is_complete):
+
+        name_set = self._name_set
+        dir_names = [name for name in dir_names if (name, True) not in name_set]
+        file_names = [name for name in self.__filter_file_names(file_names)
+                      if (name, False) not in name_set]
+        name_set.update((name, True) for name in dir_names)
+        name_set.update((name, False) for name in file_names)
+        key = lambda name: name.lower()
+
+        if dir_names:
+            self._dir_names = sorted(self._dir_names + dir_names, key=key)
+
+        if file_names:
+            self._file_names = sorted(self._file_names + file_names, key=key)
+
+        if dir_names or file_names:
+            self.__update_columns()
+            self.__update_layout()
+
+    def __update_directory_list(self):
+
+        # The contents of the directory are scanned asynchronously; the buttons are laid
+        # out as the names of the subdirectories and files come in.
+
+        directory_path = self._current_path
+        self._path_handler(directory_path)
+
+        FileButton.set_selected_filebutton(None)
+
+        self.__clear_window()
+
+        for btn in self._btns.itervalues():
+            btn.destroy()
+
+        self._btns = {}
+        self._window_btns = []
+        self._dir_names = []
+        self._file_names = []
+        self._name_set = set()
+        self.__update_columns()
+        self.__update_layout(0)
+        self._scanner.scan(directory_path, self.__add_names)
 
     def set_extensions(self, extensions):
 
@@ -541,12 +902,21 @@ class FilePane(DialogScrollPane):
             return
 
         button.set_filename(filename)
+        is_dir = button.is_directory()
+        names = self._dir_names if is_dir else self._file_names
+        names[names.index(old_name)] = filename
+        self._name_set.discard((old_name, is_dir))
+        self._name_set.add((filename, is_dir))
+        del self._btns[(old_name, is_dir)]
+        self._btns[(filename, is_dir)] = button
 
         if file_type == "folder":
             dir_path = join(self._current_path, filename)
             button.set_command(lambda: self.set_directory(dir_path))
 
-        self.update_layout()
+        self._scanner.invalidate(self._current_path)
+        self.__update_columns()
+        self.__update_layout()
 
         return filename
 
@@ -566,25 +936,15 @@ class FilePane(DialogScrollPane):
                           icon_id="icon_exclamation")
             return False
 
-        sizer = self.get_sizer()
-        sizer_item = button.get_sizer_item()
-        column_sizer = sizer_item.get_sizer()
-        column_sizer.remove_item(sizer_item)
-        prev_cs = column_sizer
-        index = sizer.get_item_index(column_sizer.get_sizer_item())
-
-        for column_sizer_item in sizer.get_items()[index + 1:]:
-            column_sizer = column_sizer_item.get_object()
-            sizer_item = column_sizer.pop_item(0)
-            prev_cs.add_item(sizer_item)
-            prev_cs = column_sizer
-
-        if column_sizer.get_item_count() == 0:
-            sizer.remove_item(column_sizer.get_sizer_item(), destroy=True)
-
-        self._btns.remove(button)
+        is_dir = button.is_directory()
+        names = self._dir_names if is_dir else self._file_names
+        names.remove(filename)
+        self._name_set.discard((filename, is_dir))
+        del self._btns[(filename, is_dir)]
+        self._scanner.invalidate(self._current_path)
+        self.__update_columns()
+        self.__update_layout()
         button.destroy()
-        self.update_layout()
 
         return True
 
@@ -613,26 +973,13 @@ class FilePane(DialogScrollPane):
                           icon_id="icon_exclamation")
             return
 
-        command = lambda: self.set_directory(dir_path)
-        btn = FileButton(self, dir_name, command=command, is_dir=True)
-        self._btns.append(btn)
-        sizer = self.get_sizer()
-
-        if sizer.get_item_count() == 0:
-            column_sizer = Sizer("vertical")
-            sizer.add(column_sizer)
-        else:
-            column_sizer = sizer.get_items()[-1].get_object()
-
-        if column_sizer.get_item_count() == Skin["options"]["file_row_count"]:
-            column_sizer = Sizer("vertical")
-            sizer.add(column_sizer)
-
-        column_sizer.add(btn, expand=True)
-        self.update_layout()
-        w_virt = sizer.get_virtual_size()[0]
-        self.get_scrollthumb().set_offset(w_virt)
-        btn.show_name_field()
+        self._dir_names = sorted(self._dir_names + [dir_name], key=lambda name: name.lower())
+        self._name_set.add((dir_name, True))
+        self._scanner.invalidate(self._current_path)
+        self.__update_columns()
+        column = self._dir_names.index(dir_name) // Skin["options"]["file_row_count"]
+        self.__update_layout(self._column_offsets[column])
+        self._btns[(dir_name, True)].show_name_field()
 
 
 class FileDialog(Dialog):
@@ -793,6 +1140,7 @@ class FileDialog(Dialog):
         file_sizer.add(type_combobox, borders=borders, proportion=.5, alignment="center_v")
 
         self.finalize()
+        pane.freeze_window(False)
 
         def task():
 
@@ -64,10 +64,10 @@ class ProgressBar(Widget):
         img.blend_sub_image(image, 0, 0, 0, 0)
         self.get_card().copy_sub_image(self, img, w, h)
 
-    def advance(self):
+    def advance(self, steps=1):
 
         if self._rate:
-            self._progress = min(1., self._progress + self._rate)
+            self._progress = min(1., self._progress + self._rate * steps)
             sizer_item = self.get_sizer_item()
             sizer_item.set_proportion(self._progress)
             sizer = sizer_item.get_sizer()
@@ -110,6 +110,6 @@ class ProgressDialog(Dialog):
 
         self._progress_bar.set_rate(rate)
 
-    def advance(self):
+    def advance(self, steps=1):
 
-        self._progress_bar.advance()
+        self._progress_bar.advance(steps)
@@ -105,7 +105,7 @@ class PanelBottom(Button):
                 x, y, w, h = tex_atlas_regions["expanded_panel_arrow_{}".format(state)]
                 img = PNMImage(w, h, 4)
                 img.copy_sub_image(tex_atlas, 0, 0, x, y, w, h)
-                image = self._images[state]
+                image = self.get_writable_image(state)
                 x = (width - w) // 2
                 y = height - h
                 image.blend_sub_image(img, x, y, 0, 0, w, h)
@@ -211,7 +211,7 @@ class CollapsedPanelBottom(Button):
                 x, y, w, h = tex_atlas_regions["collapsed_panel_arrow_{}".format(state)]
                 img = PNMImage(w, h, 4)
                 img.copy_sub_image(tex_atlas, 0, 0, x, y, w, h)
-                image = self._images[state]
+                image = self.get_writable_image(state)
                 x = (width - w) // 2
                 y = height - h
                 image.blend_sub_image(img, x, y, 0, 0, w, h)
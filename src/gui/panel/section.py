@@ -168,7 +168,7 @@ class SectionHeader(Widget):
             self._images = self.images
         else:
             images = Widget.update_images(self)
-            image = images[""]
+            image = self.get_writable_image("")
             x, y, w, h = TextureAtlas["regions"]["section_header_minus"]
             l = self.get_gfx_inner_borders()[0]
             height = self.get_size()[1]
@@ -225,7 +225,7 @@ class CollapsedSectionHeader(Widget):
             self._images = self.images
         else:
             images = Widget.update_images(self)
-            image = images[""]
+            image = self.get_writable_image("")
             x, y, w, h = TextureAtlas["regions"]["section_header_plus"]
             l = self.get_gfx_inner_borders()[0]
             height = self.get_size()[1]
@@ -62,7 +62,7 @@ class ScrollThumb(Widget):
         d = self._dir
         dim = 0 if d == "horizontal" else 1
         size = pane.get_size()[dim]
-        size_virt = pane.get_sizer().get_virtual_size()[dim]
+        size_virt = pane.get_virtual_size()[dim]
         l, r, b, t = self.get_gfx_inner_borders()
 
         if d == "horizontal":
@@ -95,7 +95,7 @@ class ScrollThumb(Widget):
         d = self._dir
         dim = 0 if d == "horizontal" else 1
         size = pane.get_size()[dim]
-        size_virt = pane.get_sizer().get_virtual_size()[dim]
+        size_virt = pane.get_virtual_size()[dim]
         self._scroll_offset = offset = max(0, min(self._scroll_offset, size_virt - min(size_virt, size)))
         pane.update_scroll_offset(offset)
 
@@ -135,7 +135,7 @@ class ScrollThumb(Widget):
         pane = self._pane
         d = self._dir
         dim = 0 if d == "horizontal" else 1
-        size_virt = pane.get_sizer().get_virtual_size()[dim]
+        size_virt = pane.get_virtual_size()[dim]
         incr = int((1. * self._scroll_offset / size_virt) * self._scroll_size)
 
         if d == "horizontal":
@@ -162,7 +162,7 @@ class ScrollThumb(Widget):
         pane = self._pane
         d = self._dir
         dim = 0 if d == "horizontal" else 1
-        size_virt = pane.get_sizer().get_virtual_size()[dim]
+        size_virt = pane.get_virtual_size()[dim]
         offset = int((1. * self._scroll_offset / size_virt) * self._scroll_size)
         # temporarily update the thumb position with the scroll offset
         self.set_pos((x + offset, y) if d == "horizontal" else (x, y + offset))
@@ -199,7 +199,7 @@ class ScrollThumb(Widget):
         d_crd = mouse_crd - self._start_mouse_crd
         pane = self._pane
         dim = 0 if d == "horizontal" else 1
-        size_virt = pane.get_sizer().get_virtual_size()[dim]
+        size_virt = pane.get_virtual_size()[dim]
         offset = int(1. * size_virt * d_crd / self._scroll_size)
         self._scroll_offset = self._start_scroll_offset + offset
         self.update_offset()
@@ -526,6 +526,26 @@ class ScrollPane(WidgetCard):
 
         pass
 
+    def _get_contents_offset(self):
+        """
+        Return the virtual position of the widget contents of this pane.
+        Override in derived class that only lays out part of its virtual contents
+        at any time.
+
+        """
+
+        return 0
+
+    def get_virtual_size(self):
+        """
+        Return the size of the entire scrollable contents of this pane.
+        Override in derived class that only lays out part of its virtual contents
+        at any time.
+
+        """
+
+        return self.get_sizer().get_virtual_size()
+
     def setup(self):
 
         base = Mgr.get("base")
@@ -600,6 +620,7 @@ class ScrollPane(WidgetCard):
 
     def update_scroll_offset(self, scroll_offset):
 
+        scroll_offset -= self._get_contents_offset()
         width, height = self.get_size()
         sizer = self.get_sizer()
         w_virt, h_virt = w_subimg, h_subimg = sizer.get_virtual_size()
@@ -761,19 +782,14 @@ class ScrollPane(WidgetCard):
         x += offset_x
         y += offset_y
         img.copy_sub_image(sub_image, x, y, 0, 0, width, height)
+        self.add_dirty_region(x, y, width, height)
+
+    def get_texture_offset(self):
 
         if self._subimg_index > -1:
-            width, height = self.get_size()
-            scroll_dir = self.get_sizer().get_stretch_dir()
-            w = self._subimg_w if scroll_dir == "horizontal" else width
-            h = height if scroll_dir == "horizontal" else self._subimg_h
-            x = self._subimg_x if scroll_dir == "horizontal" else 0
-            y = 0 if scroll_dir == "horizontal" else self._subimg_y
-            sub_image = PNMImage(w, h, 4)
-            sub_image.copy_sub_image(img, 0, 0, x, y, w, h)
-            self._tex.load(sub_image)
-        else:
-            self._tex.load(img)
+            return (self._subimg_x, self._subimg_y)
+
+        return (0, 0)
 
     def update_mouse_region_frames(self, exclude="", recurse=True):
 
@@ -823,12 +839,14 @@ class ScrollPane(WidgetCard):
         w_virt, h_virt = sizer.get_virtual_size()
         width, height = self.get_size()
 
+        offset = self._scrollthumb.get_offset() - self._get_contents_offset()
+
         if scroll_dir == "horizontal":
-            l = self._scrollthumb.get_offset()
+            l = offset
             r = l + min(width, w_virt)
             self._mouse_watcher.set_frame(l, r, -height, 0)
         else:
-            t = -self._scrollthumb.get_offset()
+            t = -offset
             b = t - min(height, h_virt)
             self._mouse_watcher.set_frame(0, width, b, t)
 
@@ -847,11 +865,12 @@ class ScrollPane(WidgetCard):
     def update_widget_root_node(self):
 
         scroll_dir = self.get_sizer().get_stretch_dir()
+        offset = self._scrollthumb.get_offset() - self._get_contents_offset()
 
         if scroll_dir == "horizontal":
-            self._widget_root_node.set_x(-self._scrollthumb.get_offset())
+            self._widget_root_node.set_x(-offset)
         else:
-            self._widget_root_node.set_z(self._scrollthumb.get_offset())
+            self._widget_root_node.set_z(offset)
 
     def update_layout(self):
 
@@ -865,6 +884,21 @@ class ScrollPane(WidgetCard):
         sizer.update_mouse_region_frames()
         self.update_widget_root_node()
 
+    def update_contents_layout(self):
+        """
+        Update the layout of the widgets in this pane only, without affecting the
+        size of the pane itself.
+
+        """
+
+        self.reset_sub_image_index()
+        sizer = self.get_sizer()
+        sizer.update_min_size()
+        sizer.set_size(self.get_size())
+        sizer.calculate_positions()
+        self.update_images()
+        self.update_mouse_region_frames()
+
     def __on_left_down(self):
 
         region = self._mouse_watcher.get_over_region()
@@ -961,7 +995,6 @@ class ScrollPane(WidgetCard):
         ctrl_down = self.get_mouse_watcher().is_button_down(KeyboardButton.control())
 
         if ctrl_down and self._can_scroll():
-            sizer = self.get_sizer()
-            scroll_dir = sizer.get_stretch_dir()
-            offset = sizer.get_virtual_size()[0 if scroll_dir == "horizontal" else 1]
+            scroll_dir = self.get_sizer().get_stretch_dir()
+            offset = self.get_virtual_size()[0 if scroll_dir == "horizontal" else 1]
             self._scrollthumb.set_offset(offset)
@@ -1,4 +1,4 @@
-from .base import logging, GlobalData, EventBinder, StateManager, StateBinder, DirectObject
+from .base import logging, GlobalData, FrameProfiler, EventBinder, StateManager, StateBinder, DirectObject
 from panda3d.core import loadPrcFileData, MouseWatcherRegion, WindowProperties, Filename
 from direct.showbase.ShowBase import ShowBase
 
@@ -226,6 +226,18 @@ class AppManager(object):
         self._updaters.setdefault(interface_id, {}).setdefault(
             component_id, {}).setdefault(update_id, []).append(data)
 
+    def __call_updaters(self, local_updaters, remote_updaters, locally, remotely, args, kwargs):
+
+        if locally:
+            for updater, param_ids in local_updaters:
+                _kwargs = dict((k, v) for k, v in kwargs.iteritems() if k in param_ids)
+                updater(*args, **_kwargs)
+
+        if remotely:
+            for updater, param_ids in remote_updaters:
+                _kwargs = dict((k, v) for k, v in kwargs.iteritems() if k in param_ids)
+                updater(*args, **_kwargs)
+
     def update(self, component_id, locally, remotely, update_id, *args, **kwargs):
         """
         Call all updaters defined for the property with the given update_id.
@@ -248,15 +260,16 @@ class AppManager(object):
         for updaters in self._updaters.itervalues():
             remote_updaters.extend(updaters.get(dest, {}).get(update_id, []))
 
-        if locally:
-            for updater, param_ids in local_updaters:
-                _kwargs = dict((k, v) for k, v in kwargs.iteritems() if k in param_ids)
-                updater(*args, **_kwargs)
+        if not FrameProfiler.enabled:
+            self.__call_updaters(local_updaters, remote_updaters, locally, remotely, args, kwargs)
+            return
 
-        if remotely:
-            for updater, param_ids in remote_updaters:
-                _kwargs = dict((k, v) for k, v in kwargs.iteritems() if k in param_ids)
-                updater(*args, **_kwargs)
+        FrameProfiler.begin("update " + update_id, component_id)
+
+        try:
+            self.__call_updaters(local_updaters, remote_updaters, locally, remotely, args, kwargs)
+        finally:
+            FrameProfiler.end()
 
     def update_interface(self, interface_id, component_id, locally, remotely,
                          update_id, *args, **kwargs):
@@ -269,15 +282,16 @@ class AppManager(object):
         local_updaters = self._updaters.get(interface_id, {}).get(component_id, {}).get(update_id, [])
         remote_updaters = self._updaters.get(interface_id, {}).get(dest, {}).get(update_id, [])
 
-        if locally:
-            for updater, param_ids in local_updaters:
-                _kwargs = dict((k, v) for k, v in kwargs.iteritems() if k in param_ids)
-                updater(*args, **_kwargs)
+        if not FrameProfiler.enabled:
+            self.__call_updaters(local_updaters, remote_updaters, locally, remotely, args, kwargs)
+            return
 
-        if remotely:
-            for updater, param_ids in remote_updaters:
-                _kwargs = dict((k, v) for k, v in kwargs.iteritems() if k in param_ids)
-                updater(*args, **_kwargs)
+        FrameProfiler.begin("update " + update_id, component_id)
+
+        try:
+            self.__call_updaters(local_updaters, remote_updaters, locally, remotely, args, kwargs)
+        finally:
+            FrameProfiler.end()
 
     def remove_updaters(self, interface_id):
         """